@@ -0,0 +1,62 @@
+# Porovnání časové náročnosti přiřazení intervalů (např. členství v klubu) podle data:
+# původní maskování po jednotlivých intervalech (O(řádky * intervaly)) vs. interval_join (O(n log n)).
+#
+# Spuštění: python -m benchmarks.bench_interval_join
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from snemovna.utility import interval_join
+
+
+def vytvor_data(n_radku, n_osob, intervalu_na_osobu=3, seed=0):
+    rng = np.random.default_rng(seed)
+    zacatek = pd.Timestamp('2017-10-21', tz='Europe/Prague')
+    hranice = np.sort(rng.integers(1, 4 * 365, size=(n_osob, intervalu_na_osobu - 1)), axis=1)
+
+    od, do, id_osoba = [], [], []
+    for i in range(n_osob):
+        dny = [0] + list(hranice[i]) + [None]
+        for j in range(intervalu_na_osobu):
+            id_osoba.append(i)
+            od.append(zacatek + pd.Timedelta(days=int(dny[j])))
+            do.append(pd.NaT if dny[j + 1] is None else zacatek + pd.Timedelta(days=int(dny[j + 1]) - 1))
+    intervaly = pd.DataFrame({'id_osoba': id_osoba, 'od': od, 'do': do})
+    intervaly['klub'] = np.arange(len(intervaly)) % 7
+
+    df = pd.DataFrame({
+        'id_osoba': rng.integers(0, n_osob, size=n_radku),
+        'den': zacatek + pd.to_timedelta(rng.integers(0, 4 * 365, size=n_radku), unit='D')
+    })
+    return df, intervaly
+
+
+def maskovani(df, intervaly):
+    ret = pd.Series(np.nan, index=df.index)
+    for _, row in intervaly.iterrows():
+        ret.mask((df.id_osoba == row.id_osoba) & (df.den >= row.od) & ((df.den <= row['do']) | pd.isna(row['do'])), row.klub, inplace=True)
+    return ret
+
+
+def zmer(fce, *args):
+    t = time.perf_counter()
+    ret = fce(*args)
+    return ret, time.perf_counter() - t
+
+
+if __name__ == '__main__':
+    print(f"{'řádků':>10} {'intervalů':>10} {'maskování [s]':>15} {'interval_join [s]':>18}")
+    for n_radku, n_osob in [(10_000, 50), (100_000, 200), (1_000_000, 800)]:
+        df, intervaly = vytvor_data(n_radku, n_osob)
+        ret, t_join = zmer(lambda: interval_join(df, intervaly, on='den', by='id_osoba', start='od', end='do', columns=['klub']))
+
+        # Maskování je pro velké tabulky příliš pomalé
+        if n_radku * len(intervaly) <= 10 ** 9:
+            ref, t_mask = zmer(maskovani, df, intervaly)
+            assert (ref.values == ret.klub.values).all()
+            t_mask = f"{t_mask:.3f}"
+        else:
+            t_mask = '-'
+        print(f"{n_radku:>10} {len(intervaly):>10} {t_mask:>15} {t_join:>18.3f}")
@@ -0,0 +1,120 @@
+# Čas vytvoření a paměťová špička hlavních tabulek (Organy, Poslanci, HlasovaniPoslanci, Omluvy, StenoRecnici, Stenotexty)
+# nad syntetickými daty (viz benchmarks.synteticka_data), bez přístupu k síti.
+# Čas se měří bez cache načtených .unl souborů ('studená') a s ní ('teplá'), paměťová špička (tracemalloc) s cache.
+# Před každým měřením se vyprázdní registr tabulek sdílených v procesu (viz RegistrTabulek), tabulka se tedy vždy sestavuje.
+# Texty stenozáznamů se předem zpracují do úložiště (viz priprav_steno_texty), Stenotexty je pak jen načítá a propojuje.
+#
+# Výsledky lze uložit (--uloz) a porovnat s dřívějším během (--porovnej), zpomalení nad toleranci se označí '!'.
+#
+# Spuštění: python -m benchmarks.bench_konstrukce [--poslancu N] [--schuzi N] [--hlasovani N] [--uloz soubor.json] [--porovnej soubor.json]
+
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import tracemalloc
+
+import pandas as pd
+import pytz
+
+from snemovna.PoslanciOsoby import Organy, Poslanci
+from snemovna.Hlasovani import HlasovaniPoslanci, Omluvy
+from snemovna.Stenozaznamy import StenoRecnici
+from snemovna.Stenotexty import Stenotexty
+from snemovna.TabulkyStenotexty import TabulkaStenotextyMixin
+from snemovna.Registr import registr_tabulek
+from benchmarks.synteticka_data import vytvor_data, VOLEBNI_OBDOBI
+
+TRIDY = [Organy, Poslanci, HlasovaniPoslanci, Omluvy, StenoRecnici, Stenotexty]
+
+
+def priprav_steno_texty(data_dir):
+    """Zpracuje vygenerované html stenozáznamy do úložiště textů (jako stahni_steno_texty, ale bez stahování)."""
+    steno = pd.read_csv(f"{data_dir}/steno.unl", sep='|', header=None, usecols=[2, 3], names=['schuze', 'turn'])
+    parser = TabulkaStenotextyMixin()
+    parser.volebni_obdobi = VOLEBNI_OBDOBI
+    parser.tzn = pytz.timezone('Europe/Prague')
+    parser.parameters = {'data_dir': data_dir, 'soubezne_zpracovani_max': -1, 'html_parser': 'lxml'}
+    parser.tbl = {'steno': steno}
+    df = parser.results2df(*parser.zpracuj_steno_texty())
+    uloziste = parser.uloziste_steno_textu()
+    for schuze, oddil in df.groupby('schuze'):
+        parser.zapis_oddil(uloziste, schuze, oddil)
+
+
+def vytvor(trida, data_dir):
+    registr_tabulek.zneplatni()
+    return trida(volebni_obdobi=VOLEBNI_OBDOBI, data_dir=data_dir, stahni=False)
+
+
+def zmer(trida, data_dir):
+    shutil.rmtree(f"{data_dir}/cache", ignore_errors=True)
+    t = time.perf_counter()
+    df = vytvor(trida, data_dir)
+    studena = time.perf_counter() - t
+
+    t = time.perf_counter()
+    vytvor(trida, data_dir)
+    tepla = time.perf_counter() - t
+
+    tracemalloc.start()
+    vytvor(trida, data_dir)
+    _, spicka = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(radku=len(df), studena=studena, tepla=tepla, pamet=spicka / 2**20)
+
+
+def porovnej(vysledky, predchozi, tolerance):
+    print(f"\n{'tabulka':>18} {'studená':>9} {'teplá':>9} {'paměť':>9}   (poměr k předchozímu běhu)")
+    zhorseni = False
+    for nazev, v in vysledky.items():
+        if nazev not in predchozi:
+            continue
+        pomery = [v[k] / predchozi[nazev][k] if predchozi[nazev][k] > 0 else 1.0 for k in ['studena', 'tepla', 'pamet']]
+        znacky = ['!' if p > 1 + tolerance else ' ' for p in pomery]
+        zhorseni = zhorseni or ('!' in znacky)
+        print(f"{nazev:>18} " + ' '.join(f"{p:>8.2f}{z}" for p, z in zip(pomery, znacky)))
+    return zhorseni
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--poslancu', type=int, default=200)
+    ap.add_argument('--schuzi', type=int, default=10)
+    ap.add_argument('--hlasovani', type=int, default=100, help='počet hlasování na schůzi')
+    ap.add_argument('--turnu', type=int, default=20, help='počet stenozáznamů na schůzi')
+    ap.add_argument('--uloz', help='uloží výsledky do souboru (json)')
+    ap.add_argument('--porovnej', help='porovná výsledky s dřívějším během (json)')
+    ap.add_argument('--tolerance', type=float, default=0.25, help='povolené relativní zhoršení při porovnání')
+    args = ap.parse_args()
+
+    logging.getLogger("Sněmovna").setLevel(logging.ERROR)
+    vysledky = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        t = time.perf_counter()
+        vytvor_data(data_dir, n_poslancu=args.poslancu, n_schuzi=args.schuzi, n_hlasovani=args.hlasovani, n_turnu=args.turnu)
+        priprav_steno_texty(data_dir)
+        print(f"Příprava dat: {time.perf_counter() - t:.1f} s ({args.poslancu} poslanců, {args.schuzi} schůzí, {args.schuzi * args.hlasovani} hlasování, {args.schuzi * args.turnu} stenozáznamů)\n")
+
+        print(f"{'tabulka':>18} {'řádků':>9} {'studená [s]':>12} {'teplá [s]':>10} {'paměť [MiB]':>12}")
+        for trida in TRIDY:
+            v = zmer(trida, data_dir)
+            vysledky[trida.__name__] = v
+            print(f"{trida.__name__:>18} {v['radku']:>9} {v['studena']:>12.2f} {v['tepla']:>10.2f} {v['pamet']:>12.1f}")
+
+    parametry = dict(poslancu=args.poslancu, schuzi=args.schuzi, hlasovani=args.hlasovani, turnu=args.turnu)
+    if args.uloz:
+        with open(args.uloz, 'w') as f:
+            json.dump(dict(parametry=parametry, tabulky=vysledky), f, indent=2)
+    if args.porovnej:
+        with open(args.porovnej) as f:
+            predchozi = json.load(f)
+        if predchozi['parametry'] != parametry:
+            print(f"\nPředchozí běh měl jinou velikost dat ({predchozi['parametry']}), neporovnávám.")
+            sys.exit(2)
+        if porovnej(vysledky, predchozi['tabulky'], args.tolerance):
+            sys.exit(1)
@@ -0,0 +1,44 @@
+# Porovnání převodu kódů na popisy (mask_by_values) s původní implementací maskující po jednotlivých hodnotách
+# na sloupci 'vysledek__ORIG' tabulky hlasování poslanců.
+#
+# Spuštění: python -m benchmarks.bench_mask_by_values
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from snemovna.utility import mask_by_values
+from snemovna.TabulkyHlasovani import TabulkaHlasovaniPoslanciMixin
+
+
+def mask_by_values_puvodni(series, mask):
+    series = series.astype(object)
+    new_series = series.copy()
+    for val_to_mask in series.unique():
+        if val_to_mask in mask.keys():
+            new_series = new_series.mask(series == val_to_mask, mask[val_to_mask])
+    return new_series
+
+
+def vytvor_data(n_radku, seed=0):
+    rng = np.random.default_rng(seed)
+    kody = np.array(list(TabulkaHlasovaniPoslanciMixin.vysledky_hlasovani.keys()) + ['X'], dtype=object)
+    return pd.Series(kody[rng.integers(0, len(kody), size=n_radku)]).astype('string')
+
+
+def zmer(fce, *args):
+    t = time.perf_counter()
+    ret = fce(*args)
+    return ret, time.perf_counter() - t
+
+
+if __name__ == '__main__':
+    mask = TabulkaHlasovaniPoslanciMixin.vysledky_hlasovani
+    print(f"{'řádků':>10} {'původní [s]':>12} {'mask_by_values [s]':>19}")
+    for n_radku in [100_000, 1_000_000, 5_000_000]:
+        srs = vytvor_data(n_radku)
+        ref, t_puvodni = zmer(mask_by_values_puvodni, srs, mask)
+        ret, t_novy = zmer(mask_by_values, srs, mask)
+        assert ref.astype('string').equals(ret.astype('string'))
+        print(f"{n_radku:>10} {t_puvodni:>12.3f} {t_novy:>19.3f}")
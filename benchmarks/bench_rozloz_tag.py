@@ -0,0 +1,136 @@
+# Cena rozkladu jednoho paragrafu stenozáznamu (TabulkaStenotextyMixin.rozloz_paragraf)
+# s jednoprůchodovým klasifikátorem a s původní variantou, která na každý uzel volala šest klasifikátorů
+# a text uzlu převáděla přes html2text (nová varianta jen normalizuje mezery, viz text_uzlu).
+# Html se parsuje předem, měří se jen rozklad paragrafů. S parametrem --profil vypíše i profil (cProfile).
+#
+# Spuštění: python -m benchmarks.bench_rozloz_tag [--profil]
+
+import re
+import sys
+import time
+import cProfile
+import pstats
+import tempfile
+
+from html2text import html2text
+from bs4 import NavigableString
+
+from snemovna.utility import flatten
+from snemovna.TabulkyStenotexty import TabulkaStenotextyMixin, Rec, Cas
+from benchmarks.bench_stenotexty import vytvor_parser
+
+
+class TabulkaStenotextyPuvodni(TabulkaStenotextyMixin):
+    """Původní rozklad paragrafu (před zavedením předkompilovaných vzorů a jednoho průchodu)."""
+
+    def je_poznamka(self, tag):
+        return re.match(r'^\s*\**\s*(\(.*?\))\s*\**\s*$', tag.string) != None
+
+    def najdi_poznamky(self, tag):
+        return re.findall(r'\((.*?)\)', tag.string)
+
+    def najdi_cas_v_tagu(self, tag):
+        s = tag.string
+        if self.je_poznamka(tag):
+            for vzor, typ in [('.*zaháj', 'zahájení'), ('.*přer', 'přerušení'), ('.*pokrač', 'pokračování'), ('.*konč', 'ukončení'), ('', 'obecně')]:
+                m = re.match(vzor + r'.*[^0-9]+([0-9]{1,2})\s*[.:]\s*([0-9]{2}).*hod', s)
+                if m:
+                    return Cas(typ, m.groups()[0], m.groups()[1])
+        return None
+
+    def najdi_recnika(self, tag):
+        if (tag.name == 'a') and tag.attrs and tag.attrs.get('id') and (re.match(r'^r[0-9]+$', tag.attrs.get('id'))):
+            id_rec = re.match(r'^r([0-9]+)$', tag.attrs.get('id')).groups()[0]
+            id_osoba = None
+            if tag.attrs.get('href'):
+                m = re.match(r'\/sqw\/detail.sqw\?id\=([0-9]+)$', tag.attrs.get('href'))
+                if m:
+                    id_osoba = m.groups()[0]
+            return Rec(id_rec=id_rec, id_osoba=id_osoba)
+        return None
+
+    def najdi_tisk(self, tag):
+        if (tag.name == 'a') and tag.attrs.get('href'):
+            m = re.match(r'\/sqw\/historie.sqw\?T\=([0-9]+)\&O=([0-9])+$', tag.attrs.get('href'))
+            if m:
+                return m.groups()[0], m.groups()[1]
+        return None
+
+    def najdi_hlasovani(self, tag):
+        if (tag.name == 'a') and tag.attrs.get('id') and (re.match(r'^h[0-9]+$', tag.attrs.get('id'))):
+            hid = re.match(r'^h([0-9]+)$', tag.attrs.get('id')).groups()[0]
+            G = None
+            if tag.attrs.get('href'):
+                m = re.match(r'\/sqw\/hlasy.sqw\?G\=([0-9]+)$', tag.attrs.get('href'))
+                if m:
+                    G = m.groups()[0]
+            return hid, G
+        return None
+
+    def rozloz_tag(self, tag, text, meta):
+        for child in tag.contents:
+            if (child == None) or (child.string == None):
+                continue
+            for fce, klic in [
+                [self.najdi_cas_v_tagu, 'cas'],
+                [self.najdi_recnika, 'recnici'],
+                [self.najdi_tisk, 'tisky'],
+                [self.najdi_hlasovani, 'hlasovani'],
+                [self.je_poznamka, 'je_poznamka'],
+                [self.najdi_poznamky, 'poznamky']
+            ]:
+                ret = fce(child)
+                if ret:
+                    if (klic == 'hlasovani') and len(ret) > 0:
+                        hid, G = ret
+                        meta['cislo_hlasovani'].append(hid)
+                        meta['hlasovani'].append(G)
+                        continue
+                    meta[klic].append(ret)
+                if (klic == 'recnici') and (len(meta['recnici']) > 0) and (len(meta['odstran']) == 0):
+                    meta['odstran'].append(self.polish(html2text(child.string)) + ' : ')
+                if (klic == 'poznamky') and (len(meta['poznamky']) > 0):
+                    meta['poznamky'] = flatten(meta['poznamky'])
+
+            if type(child) == NavigableString:
+                text.append(html2text(child.string))
+            else:
+                self.rozloz_tag(child, text, meta)
+
+
+def paragrafy(parser, n_souboru):
+    ret = []
+    for schuze, turn in parser.turny()[:n_souboru]:
+        body = parser.load_soup(f"{parser.parameters['data_dir']}/{parser.cesta(schuze, turn)}").find("div", id='body')
+        ret += body.find_all('p', align=['justify'])
+    return ret
+
+
+def zmer(parser, ps):
+    t = time.perf_counter()
+    rows = [parser.rozloz_paragraf(p) for p in ps]
+    return rows, time.perf_counter() - t
+
+
+if __name__ == '__main__':
+    n_souboru = 20
+    with tempfile.TemporaryDirectory() as data_dir:
+        novy = vytvor_parser(data_dir, n_souboru)
+        puvodni = TabulkaStenotextyPuvodni()
+        puvodni.__dict__.update(novy.__dict__)
+        ps = paragrafy(novy, n_souboru)
+
+    ref, t_puvodni = zmer(puvodni, ps)
+    rows, t_novy = zmer(novy, ps)
+    for a, b in zip(ref, rows):
+        assert (a['text'], a['meta']['recnici'], a['meta']['cas'][:1], a['meta']['hlasovani']) == (b['text'], b['meta']['recnici'], b['meta']['cas'][:1], b['meta']['hlasovani'])
+
+    print(f"{'paragrafů':>10} {'původní [µs/par.]':>18} {'nový [µs/par.]':>15}")
+    print(f"{len(ps):>10} {1e6 * t_puvodni / len(ps):>18.1f} {1e6 * t_novy / len(ps):>15.1f}")
+
+    if '--profil' in sys.argv:
+        for nazev, parser in [('původní', puvodni), ('nový', novy)]:
+            print(f"\nProfil: {nazev}")
+            profil = cProfile.Profile()
+            profil.runcall(zmer, parser, ps)
+            pstats.Stats(profil).sort_stats('cumulative').print_stats(12)
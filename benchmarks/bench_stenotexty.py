@@ -0,0 +1,76 @@
+# Porovnání propustnosti parsování stenozáznamů (TabulkaStenotextyMixin.zpracuj_steno_texty)
+# ve vláknech a v procesech, s parsery 'html5lib' a 'lxml'.
+# Stenozáznamy se generují do dočasného adresáře ve struktuře, v jaké je ukládá stahni_html_data.
+#
+# Spuštění: python -m benchmarks.bench_stenotexty [počet souborů]
+
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from snemovna.TabulkyStenotexty import TabulkaStenotextyMixin
+
+RECNICI = [(5000, 'Předseda PSP Radek Vondráček'), (5002, 'Poslanec Jan Novák'), (5007, 'Poslankyně Jana Nováková')]
+POZNAMKY = ['(Jednání zahájeno v 9.02 hodin.)', '(V sále je hluk.)', '(Potlesk z lavic ANO.)', '(Jednání přerušeno v 12.58 hodin.)']
+VETA = 'Vážené paní poslankyně, vážení páni poslanci, dovolte mi, abych vás seznámil s návrhem zákona, který projednáváme.'
+
+
+def vytvor_stenozaznam(path, n_odstavcu=40, seed=0, recnici=RECNICI, datum='Středa 22. listopadu 2017'):
+    """Vytvoří stenozáznam 'path', vrátí seznam vystoupení řečníků [(aname, id_osoba), ...]."""
+    rng = np.random.default_rng(seed)
+    odstavce, vystoupeni = [], []
+    for i in range(n_odstavcu):
+        casti = []
+        if i % 8 == 0:
+            id_osoba, jmeno = recnici[rng.integers(len(recnici))]
+            vystoupeni.append((i // 8 + 1, id_osoba))
+            casti.append(f'<a id="r{i // 8 + 1}" href="/sqw/detail.sqw?id={id_osoba}">{jmeno}</a>: ')
+        casti.append(' '.join([VETA] * int(rng.integers(1, 6))))
+        if rng.random() < 0.3:
+            casti.append(' ' + POZNAMKY[rng.integers(len(POZNAMKY))])
+        if rng.random() < 0.05:
+            casti.append(f' <a id="h{i}" href="/sqw/hlasy.sqw?G={70000 + i}">hlasování číslo {i}</a>')
+        odstavce.append(f'<p align="justify">{"".join(casti)}</p>')
+
+    html = (
+        '<html><head><title>Stenozáznam</title></head><body>\n<div id="body">\n'
+        f'<p class="date">{datum}</p>\n' + '\n'.join(odstavce) + '\n</div>\n</body></html>\n'
+    )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='cp1250') as f:
+        f.write(html)
+    return vystoupeni
+
+
+def vytvor_parser(data_dir, n_souboru):
+    parser = TabulkaStenotextyMixin()
+    parser.volebni_obdobi = 2017
+    parser.tzn = pytz.timezone('Europe/Prague')
+    parser.parameters = {'data_dir': data_dir, 'soubezne_zpracovani_max': -1}
+    parser.tbl = {'steno': pd.DataFrame({'schuze': [1] * n_souboru, 'turn': range(1, n_souboru + 1)})}
+    for schuze, turn in parser.tbl['steno'][['schuze', 'turn']].itertuples(index=False):
+        vytvor_stenozaznam(f"{data_dir}/{parser.cesta(schuze, turn)}", seed=turn)
+    return parser
+
+
+def zmer(parser, zpracovani, html_parser):
+    parser.parameters['zpracovani'] = zpracovani
+    parser.parameters['html_parser'] = html_parser
+    t = time.perf_counter()
+    df = parser.results2df(*parser.zpracuj_steno_texty())
+    return df, time.perf_counter() - t
+
+
+if __name__ == '__main__':
+    n_souboru = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    with tempfile.TemporaryDirectory() as data_dir:
+        parser = vytvor_parser(data_dir, n_souboru)
+        print(f"{'zpracování':>12} {'parser':>10} {'promluv':>8} {'čas [s]':>8} {'souborů/s':>10}")
+        for zpracovani, html_parser in [('vlakna', 'html5lib'), ('procesy', 'html5lib'), ('vlakna', 'lxml'), ('procesy', 'lxml')]:
+            df, t = zmer(parser, zpracovani, html_parser)
+            print(f"{zpracovani:>12} {html_parser:>10} {len(df):>8} {t:>8.2f} {n_souboru / t:>10.1f}")
@@ -0,0 +1,172 @@
+# Generátor syntetických dat Poslanecké sněmovny pro benchmarky a testy bez přístupu k síti.
+# Vytváří .unl soubory ve struktuře (počet a pořadí sloupců, formát dat, kódování), v jaké je publikuje psp.cz,
+# a k nim html stenozáznamy, jejichž řečníci odpovídají tabulce rec.unl.
+# Data popisují volební období 2017 (Poslanecká sněmovna id_organ=172), velikost je dána parametry vytvor_data.
+#
+# Spuštění: python -m benchmarks.synteticka_data <adresář> [počet poslanců] [počet schůzí]
+
+import os
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+
+from benchmarks.bench_stenotexty import vytvor_stenozaznam
+
+VOLEBNI_OBDOBI = 2017
+ID_SNEMOVNA, ID_SNEMOVNA_PREDCHOZI = 172, 165
+ZACATEK = date(2017, 10, 21)
+N_KLUBU = 5
+
+DNY = ['Pondělí', 'Úterý', 'Středa', 'Čtvrtek', 'Pátek', 'Sobota', 'Neděle']
+MESICE = ['ledna', 'února', 'března', 'dubna', 'května', 'června', 'července', 'srpna', 'září', 'října', 'listopadu', 'prosince']
+
+
+def zapis_unl(data_dir, nazev, radky, encoding='cp1250'):
+    """Zapíše řádky do souboru 'nazev' ve formátu .unl (hodnoty oddělené '|', i za poslední hodnotou)."""
+    with open(f"{data_dir}/{nazev}", 'w', encoding=encoding) as f:
+        for r in radky:
+            f.write('|'.join('' if x is None else str(x) for x in r) + '|\n')
+
+
+def datum_stenozaznamu(d):
+    """Datum ve tvaru, v jakém je uvedeno ve stenozáznamu, např. 'Středa 22. listopadu 2017'."""
+    return f"{DNY[d.weekday()]} {d.day}. {MESICE[d.month - 1]} {d.year}"
+
+
+def vytvor_organy(data_dir):
+    zapis_unl(data_dir, 'typ_organu.unl', [
+        [1, None, 'Parlament', 'Parliament', None, 1], [2, None, 'Klub', 'Club', None, 2], [3, None, 'Kraj', 'Region', None, 3],
+        [4, None, 'Výbor', 'Committee', None, 4], [5, None, 'Strana', 'Party', None, 5],
+    ])
+    organy = [
+        [ID_SNEMOVNA_PREDCHOZI, None, 1, 'PSP7', 'Poslanecká sněmovna', 'Chamber', '26.10.2013', '26.10.2017', 1, 0],
+        [ID_SNEMOVNA, None, 1, 'PSP8', 'Poslanecká sněmovna', 'Chamber', ZACATEK.strftime('%d.%m.%Y'), None, 1, 0],
+    ]
+    for k in range(N_KLUBU):
+        organy.append([1000 + k, ID_SNEMOVNA, 2, f'K{k}', f'Klub {k}', f'Club {k}', ZACATEK.strftime('%d.%m.%Y'), None, 1, 0])
+        organy.append([1100 + k, ID_SNEMOVNA, 4, f'V{k}', f'Výbor {k}', f'Committee {k}', ZACATEK.strftime('%d.%m.%Y'), None, 1, 0])
+        organy.append([1150 + k, 1100 + k, 4, f'P{k}', f'Podvýbor {k}', f'Subcommittee {k}', ZACATEK.strftime('%d.%m.%Y'), None, 1, 0])
+        organy.append([1200 + k, ID_SNEMOVNA_PREDCHOZI, 2, f'S{k}', f'Starý klub {k}', f'Old club {k}', '26.10.2013', '26.10.2017', 1, 0])
+    organy.append([2000, None, 3, 'KR', 'Kraj', 'Region', None, None, 1, 0])
+    organy.append([3000, None, 5, 'ST', 'Strana', 'Party', None, None, 1, 0])
+    zapis_unl(data_dir, 'organy.unl', organy)
+    zapis_unl(data_dir, 'typ_funkce.unl', [[1, 1, 'předseda', 'chair', 1, 1], [2, 2, 'místopředseda', 'vice-chair', 2, 2]])
+    zapis_unl(data_dir, 'funkce.unl', [[1, ID_SNEMOVNA, 1, 'předseda PS', 1], [2, 1000, 2, 'místopředseda klubu', 2]])
+
+
+def vytvor_poslance(data_dir, n_poslancu, rng):
+    """Osoby, jejich zařazení (sněmovna, kluby; každý sedmý poslanec klub změní) a poslanci."""
+    osoby, zarazeni, poslanci, pkgps = [], [], [], []
+    for i in range(n_poslancu):
+        id_osoba, id_poslanec = 5000 + i, 6000 + i
+        osoby.append([id_osoba, 'Ing.' if i % 3 == 0 else None, f'Příjmení{i}', f'Jméno{i}', None, '01.02.1970', 'M' if i % 2 else 'Z', '01.01.2020', None])
+        zarazeni.append([id_osoba, ID_SNEMOVNA, 0, f'{ZACATEK:%Y-%m-%d} 00', None, None, None])
+        klub = i % N_KLUBU
+        if i % 7 == 0:
+            zarazeni.append([id_osoba, 1000 + klub, 0, f'{ZACATEK:%Y-%m-%d} 00', '2019-01-01 00', None, None])
+            zarazeni.append([id_osoba, 1000 + (klub + 1) % N_KLUBU, 0, '2019-01-02 00', None, None, None])
+        else:
+            zarazeni.append([id_osoba, 1000 + klub, 0, f'{ZACATEK:%Y-%m-%d} 00', None, None, None])
+        if rng.random() < 0.2:
+            zarazeni.append([id_osoba, 1100 + klub, 0, f'{ZACATEK:%Y-%m-%d} 00', None, None, None])
+        poslanci.append([id_poslanec, id_osoba, 2000, 3000, ID_SNEMOVNA, None, 'Ulice', 'Obec', '11000', f'poslanec{i}@psp.cz', None, None, None, None, 1])
+        pkgps.append([id_poslanec, 'Adresa kanceláře', f'{50 + rng.random():.6f}', f'{14 + rng.random():.6f}'])
+    zapis_unl(data_dir, 'osoby.unl', osoby)
+    zapis_unl(data_dir, 'zarazeni.unl', zarazeni)
+    zapis_unl(data_dir, 'poslanec.unl', poslanci)
+    zapis_unl(data_dir, 'pkgps.unl', pkgps)
+    zapis_unl(data_dir, 'osoba_extra.unl', [[5000, ID_SNEMOVNA, 1, 1, 'X', 1]])
+
+
+def vytvor_hlasovani(data_dir, n_poslancu, dny_schuzi, n_hlasovani, rng):
+    """Hlasování (hlXXXXs), hlasování poslanců (hlXXXXh1, hlXXXXh2), zmatečná a zpochybněná hlasování."""
+    hlasovani, id_hlasovani = [], []
+    for schuze, den in enumerate(dny_schuzi, start=1):
+        for cislo in range(1, n_hlasovani + 1):
+            hid = 70000 + len(hlasovani)
+            id_hlasovani.append(hid)
+            pro = int(rng.integers(0, n_poslancu + 1))
+            hlasovani.append([
+                hid, ID_SNEMOVNA, schuze, cislo, int(rng.integers(-1, 10)), den.strftime('%d.%m.%Y'), f'{9 + cislo * 8 // n_hlasovani}:{cislo % 60:02d}',
+                pro, n_poslancu - pro, 0, 0, n_poslancu, n_poslancu // 2 + 1, 'N', 'A' if pro > n_poslancu // 2 else 'R', f'Dlouhý název hlasování {hid}', f'Hlasování {hid}'
+            ])
+    zapis_unl(data_dir, f'hl{VOLEBNI_OBDOBI}s.unl', hlasovani, encoding='ISO-8859-2')
+
+    # Hlasování poslanců: po hlasováních, rozdělené do dvou částí jako na psp.cz
+    vysledky = np.array(list('ABNCF@MWK'))[rng.choice(9, size=(len(id_hlasovani), n_poslancu), p=[.4, .2, .05, .1, .05, .1, .05, .03, .02])]
+    radky = [[6000 + i, hid, vysledky[j, i]] for j, hid in enumerate(id_hlasovani) for i in range(n_poslancu)]
+    pulka = (len(id_hlasovani) // 2) * n_poslancu
+    zapis_unl(data_dir, f'hl{VOLEBNI_OBDOBI}h1.unl', radky[:pulka])
+    zapis_unl(data_dir, f'hl{VOLEBNI_OBDOBI}h2.unl', radky[pulka:])
+
+    zapis_unl(data_dir, 'zmatecne.unl', [[h] for h in id_hlasovani[1::97]])
+    zpochybnena = id_hlasovani[2::53]
+    zapis_unl(data_dir, f'hl{VOLEBNI_OBDOBI}z.unl', [[h, 5, int(k % 2), None, None] for k, h in enumerate(zpochybnena)])
+    zapis_unl(data_dir, f'hl{VOLEBNI_OBDOBI}v.unl', [[h, 5, 0] for h in zpochybnena])
+    zapis_unl(data_dir, f'hl{VOLEBNI_OBDOBI}x.unl', [[h, 5000 + k % n_poslancu, 0] for k, h in enumerate(zpochybnena)])
+    return id_hlasovani
+
+
+def vytvor_omluvy(data_dir, n_poslancu, dny_schuzi, rng):
+    omluvy = []
+    for den in dny_schuzi:
+        for i in rng.choice(n_poslancu, size=max(1, n_poslancu // 10), replace=False):
+            cely_den = rng.random() < 0.5
+            omluvy.append([ID_SNEMOVNA, 6000 + int(i), den.strftime('%d.%m.%Y'), None if cely_den else '10:00', None if cely_den else '12:30'])
+    zapis_unl(data_dir, 'omluvy.unl', omluvy)
+
+
+def vytvor_schuze(data_dir, dny_schuzi):
+    schuze = []
+    for s, den in enumerate(dny_schuzi, start=1):
+        schuze.append([s, ID_SNEMOVNA, s, f'{den:%Y-%m-%d} 10:00', f'{den:%Y-%m-%d} 18:00', f'{den:%Y-%m-%d} 09:00', None])
+    zapis_unl(data_dir, 'schuze.unl', schuze)
+    zapis_unl(data_dir, 'schuze_stav.unl', [[s, 1, 1, None, None, None] for s in range(1, len(dny_schuzi) + 1)])
+    zapis_unl(data_dir, 'bod_stav.unl', [[1, 'projednaný'], [3, 'neprojednatelný']])
+    zapis_unl(data_dir, 'bod_schuze.unl', [[s, s, None, 1, 1, f'Bod schůze {s}', None, None, 1, None, None, None, 0, None, None] for s in range(1, len(dny_schuzi) + 1)])
+
+
+def vytvor_stenozaznamy(data_dir, n_poslancu, dny_schuzi, n_turnu, n_odstavcu, rng):
+    """Tabulky steno, steno_bod a rec a k nim html stenozáznamy v adresářové struktuře psp.cz."""
+    recnici = [(5000 + i, f'Poslanec Jméno{i} Příjmení{i}') for i in range(n_poslancu)]
+    steno, steno_bod, rec = [], [], []
+    for schuze, den in enumerate(dny_schuzi, start=1):
+        for turn in range(1, n_turnu + 1):
+            id_steno = len(steno) + 1
+            od_t = 9 * 60 + 10 * (turn - 1)
+            steno.append([id_steno, ID_SNEMOVNA, schuze, turn, f'{den:%Y-%m-%d}', 1, od_t, od_t + 10])
+            steno_bod.append([id_steno, 1, schuze])
+            path = f"{data_dir}/www.psp.cz/eknih/{VOLEBNI_OBDOBI}ps/stenprot/{schuze:03d}schuz/s{schuze:03d}{turn:03d}.htm"
+            vystoupeni = vytvor_stenozaznam(path, n_odstavcu, seed=int(rng.integers(2**31)), recnici=recnici, datum=datum_stenozaznamu(den))
+            rec += [[id_steno, id_osoba, aname, schuze, 5] for aname, id_osoba in vystoupeni]
+    zapis_unl(data_dir, 'steno.unl', steno)
+    zapis_unl(data_dir, 'steno_bod.unl', steno_bod)
+    zapis_unl(data_dir, 'rec.unl', rec)
+
+
+def vytvor_data(data_dir, n_poslancu=200, n_schuzi=10, n_hlasovani=100, n_turnu=20, n_odstavcu=40, seed=0):
+    """Vytvoří v adresáři 'data_dir' syntetická data volebního období 2017.
+
+    n_poslancu : počet poslanců (a osob)
+    n_schuzi : počet schůzí, každá schůze trvá jeden den
+    n_hlasovani : počet hlasování na schůzi
+    n_turnu, n_odstavcu : počet stenozáznamů na schůzi a odstavců ve stenozáznamu
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    dny_schuzi = [ZACATEK + timedelta(days=30 + 14 * s) for s in range(n_schuzi)]
+
+    vytvor_organy(data_dir)
+    vytvor_poslance(data_dir, n_poslancu, rng)
+    vytvor_hlasovani(data_dir, n_poslancu, dny_schuzi, n_hlasovani, rng)
+    vytvor_omluvy(data_dir, n_poslancu, dny_schuzi, rng)
+    vytvor_schuze(data_dir, dny_schuzi)
+    vytvor_stenozaznamy(data_dir, n_poslancu, dny_schuzi, n_turnu, n_odstavcu, rng)
+
+
+if __name__ == '__main__':
+    data_dir = sys.argv[1]
+    n_poslancu = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    n_schuzi = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    vytvor_data(data_dir, n_poslancu=n_poslancu, n_schuzi=n_schuzi)
@@ -0,0 +1,145 @@
+# Perzistentní cache přetypovaných tabulek
+# Parsování .unl souborů (pd.read_csv + pretypuj) je při každém vytvoření objektu drahé, zvláště u velkých tabulek typu hl2017h*.unl.
+# Výsledek proto ukládáme ve formátu Parquet a při dalším načtení jej použijeme, pokud se zdrojové soubory nezměnily.
+
+import os
+import json
+import hashlib
+from pathlib import Path
+
+import pandas as pd
+
+from snemovna.Helpers import MItem
+from snemovna.setup_logger import log
+
+
+class CacheTabulek(object):
+    """Cache přetypovaných tabulek uložená v adresáři 'adresar'.
+
+    Ke každé tabulce se ukládá soubor '<nazev>.parquet' s přetypovanou tabulkou
+    a soubor '<nazev>.json' s popisem zdrojových souborů (velikost, čas poslední změny, SHA-1 obsahu)
+    a hlavičkou tabulky (typy a popisy sloupců, viz rozsir_meta).
+
+    Záznam v cache je platný, pokud souhlasí hlavička a všechny zdrojové soubory.
+    Při shodě velikosti a času poslední změny se obsah souboru nehashuje,
+    při změně času (např. po opětovném rozbalení zipu) se porovná hash obsahu.
+    """
+
+    verze = 1
+
+    def __init__(self, adresar):
+        self.adresar = adresar
+
+    def _cesty(self, nazev):
+        return f"{self.adresar}/{nazev}.parquet", f"{self.adresar}/{nazev}.json"
+
+    @staticmethod
+    def hash_souboru(path, blok=1 << 20):
+        h = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(blok), b''):
+                h.update(chunk)
+        return h.hexdigest()
+
+    @staticmethod
+    def popis_hlavicky(header, **parametry):
+        """Převede hlavičku tabulky (a parametry načítání) do podoby uložitelné v JSONu."""
+        hlavicka = {}
+        for key, i in header.items():
+            if isinstance(i, MItem):
+                hlavicka[key] = [i.typ, i.popis]
+            else:
+                hlavicka[key] = [i, None]
+        return dict(sloupce=hlavicka, parametry=parametry)
+
+    @staticmethod
+    def podpis_sloupcu(sloupce):
+        """Vrátí krátký otisk seznamu sloupců (pro název záznamu s projekcí tabulky)."""
+        return hashlib.sha1('|'.join(sloupce).encode('utf-8')).hexdigest()[:10]
+
+    def popis_zdroje(self, path):
+        st = os.stat(path)
+        return dict(path=os.path.abspath(path), size=st.st_size, mtime_ns=st.st_mtime_ns, sha1=self.hash_souboru(path))
+
+    def nacti(self, nazev, paths, hlavicka):
+        """Vrátí tabulku z cache, nebo None, pokud v cache chybí či je neplatná."""
+        parquet_path, manifest_path = self._cesty(nazev)
+        if not (os.path.isfile(parquet_path) and os.path.isfile(manifest_path)):
+            return None
+
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning(f"Cache: Nelze přečíst manifest '{manifest_path}': {e}")
+            return None
+
+        if (manifest.get('verze') != self.verze) or (manifest.get('hlavicka') != hlavicka):
+            log.debug(f"Cache: Záznam '{nazev}' neodpovídá hlavičce tabulky.")
+            return None
+
+        zdroje = manifest.get('zdroje', [])
+        if [z['path'] for z in zdroje] != [os.path.abspath(p) for p in paths]:
+            log.debug(f"Cache: Záznam '{nazev}' neodpovídá zdrojovým souborům.")
+            return None
+
+        aktualizuj_manifest = False
+        for z in zdroje:
+            if not os.path.isfile(z['path']):
+                return None
+            st = os.stat(z['path'])
+            if st.st_size != z['size']:
+                return None
+            if st.st_mtime_ns != z['mtime_ns']:
+                if self.hash_souboru(z['path']) != z['sha1']:
+                    return None
+                # Obsah se nezměnil, jen čas poslední změny (typicky po opětovném rozbalení zipu).
+                z['mtime_ns'] = st.st_mtime_ns
+                aktualizuj_manifest = True
+
+        try:
+            df = pd.read_parquet(parquet_path)
+        except Exception as e:
+            log.warning(f"Cache: Nelze načíst '{parquet_path}': {e}")
+            return None
+
+        if aktualizuj_manifest:
+            self._zapis_manifest(manifest_path, manifest)
+
+        log.debug(f"Cache: Tabulka '{nazev}' načtena z '{parquet_path}'.")
+        return df
+
+    def uloz(self, nazev, paths, hlavicka, df):
+        parquet_path, manifest_path = self._cesty(nazev)
+        Path(self.adresar).mkdir(parents=True, exist_ok=True)
+
+        manifest = dict(
+            verze=self.verze,
+            hlavicka=hlavicka,
+            zdroje=[self.popis_zdroje(p) for p in paths]
+        )
+
+        try:
+            tmp_path = parquet_path + '.tmp'
+            df.to_parquet(tmp_path)
+            os.replace(tmp_path, parquet_path)
+        except Exception as e:
+            log.warning(f"Cache: Tabulku '{nazev}' se nepodařilo uložit: {e}")
+            return
+
+        self._zapis_manifest(manifest_path, manifest)
+        log.debug(f"Cache: Tabulka '{nazev}' uložena do '{parquet_path}'.")
+
+    def smaz(self, nazev=None):
+        """Smaže záznam 'nazev', případně celou cache."""
+        if not os.path.isdir(self.adresar):
+            return
+        for f in os.listdir(self.adresar):
+            if (nazev is None) or (os.path.splitext(f)[0] == nazev):
+                os.remove(f"{self.adresar}/{f}")
+
+    def _zapis_manifest(self, manifest_path, manifest):
+        tmp_path = manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, manifest_path)
@@ -45,50 +45,72 @@ MItem = namedtuple('MItem', ("typ", "popis"))
 
 
 class Meta(object):
-    def __init__(self, columns=[], defaults={}, dtypes={}, index_name='name'):
-        self.defaults = defaults
-        c = set([index_name]).union(columns).union(defaults.keys()).union(dtypes.keys())
-        self.data = pd.DataFrame([], columns=c).set_index(index_name)
+    """Metadata sloupců: slovník jméno sloupce -> slovník hodnot (např. popis, tabulka).
 
-    def __init__(self, defaults={}, dtypes={}, index_name='name'):
-        self.defaults = defaults
-        columns = set([index_name]).union(defaults.keys()).union(dtypes.keys())
-        self.data = pd.DataFrame([], columns=columns).set_index(index_name)
+    Vyhledání i zápis jsou O(1), pd.DataFrame se sestavuje až na vyžádání (viz popis()).
+    Hodnoty, které při vložení nového sloupce chybí, se doplní z 'defaults'.
+    """
+    __slots__ = ('_defaults', '_dtypes', '_index_name', '_data')
 
-        for key, dtype in dtypes.items():
-            self.data[key] = self.data[key].astype(dtype)
+    def __init__(self, defaults={}, dtypes={}, index_name='name'):
+        self._defaults = dict(defaults)
+        self._dtypes = dict(dtypes)
+        self._index_name = index_name
+        self._data = {}
 
     def __getitem__(self, name):
-        found = self.data[self.data.index.isin([name])]
-        if len(found) > 0:
-            return found.iloc[0]
-        else:
-            return None
+        found = self._data.get(name)
+        return None if found is None else dict(found)
 
     def __setitem__(self, name, val):
-        found = self.data[self.data.index.isin([name])]
-        if len(found) > 0:
-            # insert
-            for k, i in val.items():
-                self.data.loc[self.data.index == name, k] = i
-        else:
+        found = self._data.get(name)
+        if found is not None:
             # update
-            missing_keys = self.defaults.keys() - val.keys()
-            for k in missing_keys:
-                val[k] = self.defaults[k]
-            self.data = self.data.append(pd.Series(val.values(), index=val.keys(), name=name))
-            #self.data = self.data.update(pd.Series(val.values(), index=val.keys(), name=name))
+            found.update(val)
+        else:
+            # insert
+            self._data[name] = {**self._defaults, **val}
 
     def __contains__(self, name):
-        found = self.data[self.data.index.isin([name])]
-        if len(found) > 0:
-            return True
-        else:
-            return False
+        return name in self._data
 
     def __iter__(self):
-        for c in self.data.index:
-            yield c
+        return iter(list(self._data))
+
+    def __len__(self):
+        return len(self._data)
 
     def __str__(self):
-          return str(self.data)
+        return str(self.popis())
+
+    @property
+    def index(self):
+        return pd.Index(list(self._data), name=self._index_name)
+
+    @property
+    def columns(self):
+        return list(dict.fromkeys(list(self._defaults) + list(self._dtypes)))
+
+    @property
+    def data(self):
+        return self.popis()
+
+    def popis(self):
+        """Vrátí metadata jako pd.DataFrame (řádek = sloupec, index 'index_name')."""
+        df = pd.DataFrame.from_dict(self._data, orient='index', columns=self.columns)
+        df.index.name = self._index_name
+        # 'bool' s chybějícími hodnotami nelze, použijeme 'boolean'
+        return df.astype({k: ('boolean' if t == 'bool' else t) for k, t in self._dtypes.items() if k in df.columns})
+
+    def serad(self, prvni=[]):
+        """Přeřadí sloupce tak, aby sloupce 'prvni' (pokud existují) byly na začátku."""
+        poradi = [k for k in prvni if k in self._data] + list(self._data)
+        self._data = {k: self._data[k] for k in dict.fromkeys(poradi)}
+
+    def copy(self):
+        ret = self.__class__.__new__(self.__class__)
+        for cls in type(self).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                setattr(ret, slot, getattr(self, slot))
+        ret._data = {k: dict(v) for k, v in self._data.items()}
+        return ret
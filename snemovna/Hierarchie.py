@@ -0,0 +1,113 @@
+# Hierarchie orgánů
+# Orgány tvoří strom (les) přes sloupec 'organ_id_organ' (nadřazený orgán): sněmovna -> výbory -> podvýbory atp.
+# Index se sestaví jednou při načtení tabulky organy, dotazy na podřízené a nadřazené orgány pak nevyžadují
+# opakované procházení tabulky.
+
+import numpy as np
+import pandas as pd
+
+from snemovna.setup_logger import log
+
+
+class Hierarchie(object):
+    """Les uzlů daný dvojicemi (identifikátor, identifikátor nadřazeného uzlu), např. orgány a nadřazené orgány.
+
+    Uzly jsou uspořádané dle průchodu do hloubky: potomci uzlu tvoří souvislý úsek 'poradi[vstup:vystup]'.
+    Zda je uzel potomkem jiného uzlu, lze proto zjistit v čase O(1) a potomky uzlu vrátit jako řez pole.
+    Uzly, jejichž nadřazený uzel chybí, jsou kořeny. Případné cykly se rozpojí (s varováním).
+    """
+
+    def __init__(self, ids, rodice):
+        ids = np.asarray(ids, dtype=np.int64)
+        rodice = pd.array(rodice, dtype='Int64')
+        ids, prvni = np.unique(ids, return_index=True)
+        if len(ids) < len(rodice):
+            log.warning("Hierarchie: Identifikátory uzlů nejsou jedinečné, ponechávám první výskyt.")
+        rodice = rodice[prvni]
+
+        # Nadřazený uzel jako pozice v 'ids', -1 pro kořeny
+        self.ids = ids
+        self.rodic = self._pozice(rodice.to_numpy(dtype=np.int64, na_value=-1))
+        self.rodic[self.rodic == np.arange(len(ids))] = -1
+
+        # Podřízené uzly ve tvaru CSR
+        n = len(ids)
+        maji_rodice = np.flatnonzero(self.rodic >= 0)
+        deti = maji_rodice[np.argsort(self.rodic[maji_rodice], kind='stable')]
+        zacatky = np.concatenate([[0], np.cumsum(np.bincount(self.rodic[maji_rodice], minlength=n))])
+
+        self.poradi = np.empty(n, dtype=np.int64)
+        self.vstup = np.full(n, -1, dtype=np.int64)
+        self.koreny = np.full(n, -1, dtype=np.int64)
+        i = 0
+        for start in list(np.flatnonzero(self.rodic < 0)) + list(range(n)):
+            if self.vstup[start] >= 0:
+                continue
+            if self.rodic[start] >= 0:
+                log.warning(f"Hierarchie: Uzel {ids[start]} leží na cyklu, odpojuji jej od nadřazeného uzlu {ids[self.rodic[start]]}.")
+                self.rodic[start] = -1
+            zasobnik = [start]
+            while len(zasobnik) > 0:
+                v = zasobnik.pop()
+                if self.vstup[v] >= 0:
+                    continue
+                self.vstup[v], self.poradi[i], self.koreny[v] = i, v, start
+                i += 1
+                zasobnik.extend(u for u in deti[zacatky[v]:zacatky[v + 1]][::-1] if self.vstup[u] < 0)
+
+        # Velikosti podstromů, uzly jsou v 'poradi' vždy až za svým nadřazeným uzlem
+        velikost = np.ones(n, dtype=np.int64)
+        for v in self.poradi[::-1]:
+            if self.rodic[v] >= 0:
+                velikost[self.rodic[v]] += velikost[v]
+        self.vystup = self.vstup + velikost
+
+    @classmethod
+    def z_tabulky(cls, df, id_field='id_organ', parent_field='organ_id_organ'):
+        """Vytvoří hierarchii z tabulky se sloupcem identifikátorů 'id_field' a nadřazených identifikátorů 'parent_field'."""
+        df = df[df[id_field].notna()]
+        return cls(df[id_field].to_numpy(dtype=np.int64), df[parent_field])
+
+    def _pozice(self, ids):
+        """Vrátí pozice identifikátorů 'ids' v self.ids, -1 pro neznámé."""
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        if len(self.ids) == 0:
+            return np.full(len(ids), -1, dtype=np.int64)
+        pozice = np.minimum(np.searchsorted(self.ids, ids), len(self.ids) - 1)
+        return np.where(self.ids[pozice] == ids, pozice, -1)
+
+    def potomci(self, ids, vcetne=True):
+        """Vrátí seřazené identifikátory všech (i nepřímých) potomků uzlů 'ids', při 'vcetne=True' i uzly 'ids' samotné."""
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        pozice = self._pozice(ids)
+        useky = [self.poradi[self.vstup[p] + (0 if vcetne else 1):self.vystup[p]] for p in pozice[pozice >= 0]]
+        vysledek = self.ids[np.concatenate(useky)] if len(useky) > 0 else np.array([], dtype=np.int64)
+        if vcetne:
+            vysledek = np.concatenate([vysledek, ids[pozice < 0]])
+        return np.unique(vysledek)
+
+    def predci(self, id_uzel, vcetne=False):
+        """Vrátí identifikátory nadřazených uzlů 'id_uzel', od nejbližšího po kořen."""
+        p = self._pozice(id_uzel)[0]
+        vysledek = [id_uzel] if vcetne else []
+        while (p >= 0) and (self.rodic[p] >= 0):
+            p = self.rodic[p]
+            vysledek.append(int(self.ids[p]))
+        return vysledek
+
+    def je_potomek(self, ids, id_predek):
+        """Vrátí np.array příznaků, zda jsou uzly 'ids' (i nepřímými) potomky uzlu 'id_predek'."""
+        pozice, p = self._pozice(ids), self._pozice(id_predek)[0]
+        if p < 0:
+            return np.zeros(len(pozice), dtype=bool)
+        vstup = np.where(pozice >= 0, self.vstup[pozice], -1)
+        return (pozice >= 0) & (self.vstup[p] < vstup) & (vstup < self.vystup[p])
+
+    def koren(self, ids):
+        """Vrátí identifikátory kořenů stromů, do kterých uzly 'ids' patří (pro neznámé uzly je vrátí beze změny)."""
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        pozice = self._pozice(ids)
+        return np.where(pozice >= 0, self.ids[self.koreny[pozice]], ids)
+
+    def __len__(self):
+        return len(self.ids)
@@ -42,6 +42,18 @@ class Hlasovani(TabulkaHlasovaniMixin, TabulkaZmatecneHlasovaniMixin, TabulkaZpo
 
         super().__init__(*args, **kwargs)
 
+        self.sdilej('Hlasovani', self.sestav_hlasovani)
+
+        self.nastav_dataframe(
+            self.tbl['hlasovani'],
+            odstran=['datum__ORIG', 'druh_hlasovani__ORIG', 'vysledek__ORIG', 'typ__ORIG']
+        )
+        # Uprav informace, které se přepsaly při načítání tabulek
+        self.meta.uprav('id_hlasovani', tabulka='hlasovani')
+
+        log.debug("<-- Hlasovani")
+
+    def sestav_hlasovani(self):
         self.nacti_hlasovani()
         self.nacti_zmatecne_hlasovani()
         self.nacti_zpochybneni_hlasovani()
@@ -84,31 +96,25 @@ class Hlasovani(TabulkaHlasovaniMixin, TabulkaZmatecneHlasovaniMixin, TabulkaZpo
         )
         self.drop_by_inconsistency(self.tbl['hlasovani'], suffix, 0.1, 'hlasovani', 'hlasovani_vazba_stenozaznam', inplace=True)
 
-        self.nastav_dataframe(
-            self.tbl['hlasovani'],
-            odstran=['datum__ORIG', 'druh_hlasovani__ORIG', 'vysledek__ORIG', 'typ__ORIG']
-        )
-        # Uprav informace, které se přepsaly při načítání tabulek
-        self.meta.loc['id_hlasovani', 'tabulka'] = 'hlasovani'
-
-        log.debug("<-- Hlasovani")
-
 
 class ZmatecneHlasovani(Hlasovani):
     def __init__(self, *args, **kwargs):
         log.debug("--> ZmatecneHlasovani")
 
         super().__init__(*args, **kwargs)
-        self.nacti_zmatecne_hlasovani()
 
-        suffix = "__hlasovani"
-        self.tbl['zmatecne'] = pd.merge(left=self.tbl['zmatecne'], right=self.tbl['hlasovani'], on='id_hlasovani', suffixes = ("", suffix), how='left')
-        self.tbl['zmatecne'] = self.drop_by_inconsistency(self.tbl['zmatecne'], suffix, 0.1, 'zmatecne', 'hlasovani')
+        self.sdilej('ZmatecneHlasovani', self.sestav_zmatecne_hlasovani)
 
         self.nastav_dataframe(self.tbl['zmatecne'])
 
         log.debug("<-- ZmatecneHlasovani")
 
+    def sestav_zmatecne_hlasovani(self):
+        # Tabulka 'zmatecne' je načtená a zúžená na dané volební období už v Hlasovani.
+        suffix = "__hlasovani"
+        self.tbl['zmatecne'] = pd.merge(left=self.tbl['zmatecne'], right=self.tbl['hlasovani'], on='id_hlasovani', suffixes = ("", suffix), how='left')
+        self.tbl['zmatecne'] = self.drop_by_inconsistency(self.tbl['zmatecne'], suffix, 0.1, 'zmatecne', 'hlasovani')
+
 
 class ZpochybneniHlasovani(Hlasovani):
 
@@ -117,16 +123,19 @@ class ZpochybneniHlasovani(Hlasovani):
 
         super().__init__(*args, **kwargs)
 
+        self.sdilej('ZpochybneniHlasovani', self.sestav_zpochybneni_hlasovani)
+
+        self.nastav_dataframe(self.tbl['zpochybneni'])
+
+        log.debug("<-- ZpochybneniHlasovani")
+
+    def sestav_zpochybneni_hlasovani(self):
         self.nacti_zpochybneni_hlasovani()
 
         suffix = "__hlasovani"
         self.tbl['zpochybneni'] = pd.merge(left=self.tbl['zpochybneni'], right=self.tbl['hlasovani'], on='id_hlasovani', suffixes = ("", suffix), how='left')
         self.tbl['zpochybneni'] = self.drop_by_inconsistency(self.tbl['zpochybneni'], suffix, 0.1, 'zpochybneni', 'hlasovani')
 
-        self.nastav_dataframe(self.tbl['zpochybneni'])
-
-        log.debug("<-- ZpochybneniHlasovani")
-
 
 class ZpochybneniPoslancem(TabulkaZpochybneniPoslancemMixin, Hlasovani, Organy, Osoby):
 
@@ -135,6 +144,13 @@ class ZpochybneniPoslancem(TabulkaZpochybneniPoslancemMixin, Hlasovani, Organy,
 
         super().__init__(*args, **kwargs)
 
+        self.sdilej('ZpochybneniPoslancem', self.sestav_zpochybneni_poslancem)
+
+        self.nastav_dataframe(self.tbl['zpochybneni_poslancem'])
+
+        log.debug("<-- ZpochybneniPoslancem")
+
+    def sestav_zpochybneni_poslancem(self):
         self.nacti_zpochybneni_poslancem()
 
         # Připojuje se tabulka 'hlasovani', nikoliv 'zpochybneni_hlasovani', protože není možné mapovat řádky 'zpochybneni_hlasovani' na 'zpochybneni_poslancem'. Jedná se zřejmě o nedokonalost datového modelu.
@@ -150,11 +166,6 @@ class ZpochybneniPoslancem(TabulkaZpochybneniPoslancemMixin, Hlasovani, Organy,
         id_organ_dle_volebniho_obdobi = self.tbl['organy'][(self.tbl['organy'].nazev_organ_cz == 'Poslanecká sněmovna') & (self.tbl['organy'].od_organ.dt.year == self.volebni_obdobi)].iloc[0].id_organ
         self.tbl['zpochybneni_poslancem'] = self.tbl['zpochybneni_poslancem'][self.tbl['zpochybneni_poslancem'].id_organ == id_organ_dle_volebniho_obdobi]
 
-        self.nastav_dataframe(self.tbl['zpochybneni_poslancem'])
-
-        log.debug("<-- ZpochybneniPoslancem")
-
-
 
 class Omluvy(TabulkaOmluvyMixin, HlasovaniBase, Poslanci, ZarazeniOsoby, Organy):
 
@@ -163,6 +174,13 @@ class Omluvy(TabulkaOmluvyMixin, HlasovaniBase, Poslanci, ZarazeniOsoby, Organy)
 
         super().__init__(*args, **kwargs)
 
+        self.sdilej('Omluvy', self.sestav_omluvy)
+
+        self.nastav_dataframe(self.tbl['omluvy'])
+
+        log.debug("<-- Omluvy")
+
+    def sestav_omluvy(self):
         self.nacti_omluvy()
 
         # Připoj informace o poslanci
@@ -174,58 +192,111 @@ class Omluvy(TabulkaOmluvyMixin, HlasovaniBase, Poslanci, ZarazeniOsoby, Organy)
         self.tbl['omluvy'] = self.tbl['omluvy'][(self.tbl['omluvy'].id_parlament == self.snemovna.id_organ)]
 
         # Vyznačení poslanců v tabulce omluv
+        # Porovnáváme po dnech, proto časy zarovnáme na půlnoc
         om = self.tbl['omluvy']
-        om['je_poslanec'] = False
         zo = self.tbl['zarazeni_osoby']
         zo_poslanci_snemovna = zo[(zo.id_organ==self.snemovna.id_organ) & (zo.cl_funkce=='členství')]
-
-        for (id_osoba, od_o, do_o), _ in zo_poslanci_snemovna.groupby(['id_osoba', 'od_o', 'do_o'], dropna=False).size().iteritems():
-          om.je_poslanec.mask(
-            (om.id_osoba == id_osoba)
-              & (om.den.dt.date >= od_o.date())
-              & ((om.den.dt.date <= do_o.date()) | pd.isna(do_o)),
-            True, inplace=True)
+        zo_poslanci_snemovna = pd.DataFrame({
+            'id_osoba': zo_poslanci_snemovna.id_osoba,
+            'od_o': zo_poslanci_snemovna.od_o.dt.normalize(),
+            'do_o': zo_poslanci_snemovna.do_o.dt.normalize()
+        })
+        nalezeno = interval_join(
+            pd.DataFrame({'id_osoba': om.id_osoba, 'den': om.den.dt.normalize()}), zo_poslanci_snemovna,
+            on='den', by='id_osoba', start='od_o', end='do_o', columns=[], indicator='je_poslanec'
+        )
+        om['je_poslanec'] = nalezeno.je_poslanec.values
 
         self.meta.nastav_hodnotu('je_poslanec', dict(popis='Příznak, že omlouvající se osoba patří mezi poslance.', tabulka='df', vlastni=True))
 
-        self.nastav_dataframe(self.tbl['omluvy'])
 
-        log.debug("<-- Omluvy")
+class HlasovaniPoslanci(TabulkaHlasovaniPoslanciMixin, Hlasovani, Poslanci, ZarazeniOsoby):
+    """Hlasování jednotlivých poslanců.
 
+    Při 'kompaktni=True' obsahuje tabulka jen identifikátory (hlasování, poslance, osoby a klubu v den hlasování)
+    v nejmenších celočíselných typech a výsledek hlasování jako kategorii. Převodní tabulka kódů výsledků
+    je v self.tbl['vysledky_hlasovani']. Informace o poslancích, hlasováních a klubech lze připojit metodou rozsir().
 
-class HlasovaniPoslanci(TabulkaHlasovaniPoslanciMixin, Hlasovani, Poslanci, ZarazeniOsoby):
+    Matici hlasování (poslanec x hlasování) jako numpy pole typu int8 vrací metoda matice().
 
-    def __init__(self, *args, **kwargs):
+    Při zadání 'davka' se soubory hlXXXXhN.unl čtou po dávkách o daném počtu řádků a z každé dávky
+    se ponechají jen hlasování poslanců daného volebního období (viz nacti_hlasovani_poslanci).
+
+    Kontaktní údaje poslanců (viz 'nepotrebne_sloupce') se nenačítají, pokud nejsou výslovně požadované
+    parametrem 'sloupce'. Ten zužuje i sloupce připojovaných tabulek poslanci a hlasovani.
+    """
+
+    nepotrebne_sloupce = [
+        'pohlavi__ORIG', 'od_parlament', 'do_parlament',
+        'web', 'ulice', 'obec', 'psc', 'telefon', 'fax', 'psp_telefon', 'email', 'facebook', 'foto', 'zmena', 'umrti', 'adresa', 'sirka', 'delka'
+    ]
+
+    # Sloupce z tabulky hlasovani, které se připojují k hlasováním poslanců
+    sloupce_hlasovani = ['id_hlasovani', 'schuze', 'cislo', 'bod', 'cas',
+        'nazev_dlouhy', 'datum', 'bod__KAT',
+        'druh_hlasovani', 'ma_zpochybneni', 'je_zmatecne']
+
+    def __init__(self, *args, kompaktni=False, davka=None, **kwargs):
         log.debug("--> HlasovaniPoslance")
 
+        if davka is not None:
+            # Hlasování poslanců se čtou po dávkách, celé se nenačítají
+            kwargs['nepredcitat'] = list(kwargs.get('nepredcitat', [])) + ['hlasovani_poslance']
         super().__init__(*args, **kwargs)
+        self.parameters['kompaktni'] = kompaktni
+        self.parameters['davka'] = davka
+
+        if kompaktni == True:
+            self.sdilej('HlasovaniPoslanciKompaktni', self.sestav_hlasovani_poslance_kompaktni)
+            self.nastav_dataframe(
+                self.tbl['hlasovani_poslance'],
+                vyber=['id_hlasovani', 'vysledek', 'id_poslanec', 'id_osoba', 'id_klub'],
+                odstran=['vysledek__ORIG']
+            )
+        else:
+            self.sdilej('HlasovaniPoslanci' if davka is None else 'HlasovaniPoslanciPoDavkach', self.sestav_hlasovani_poslance)
+
+            self.nastav_dataframe(
+                self.tbl['hlasovani_poslance'],
+                vyber = [
+                    'id_hlasovani', 'nazev_dlouhy', 'vysledek', # základní informace o hlasování poslance 
+                    'id_poslanec', 'id_osoba', 'pred', 'jmeno', 'prijmeni', # základní informace o poslanci
+                    'id_klub', 'nazev_klub_cz', 'zkratka_klub', #
+                    'narozeni', 'pohlavi', 'pred', 'za',
+                    'id_klub', 'nazev_klub_cz', 'zkratka_klub',
+                    'id_kraj', 'nazev_kraj_cz', 'zkratka_kraj',
+                    'id_kandidatka', 'nazev_kandidatka_cz', 'zkratka_kandidatka',
+                    'schuze', 'cislo', 'bod', 'cas', 'datum', 'bod__KAT',
+                    'druh_hlasovani', 'ma_zpochybneni', 'je_zmatecne'
+                    'id_organ', 'id_parlament', # informace o PS
+                ],
+                odstran = ['vysledek__ORIG'] + self.nepotrebne_sloupce
+            )
+
+        log.debug("<-- HlasovaniPoslance")
 
-        self.nacti_hlasovani_poslanci()
+    def sestav_hlasovani_poslance(self):
+        if self.parameters['davka'] is None:
+            self.nacti_hlasovani_poslanci()
+        else:
+            self.nacti_hlasovani_poslanci(davka=self.parameters['davka'], id_poslanec=self.id_poslanec_snemovny())
 
         # Připoj Poslance. Získáme mimo jiné také 'id_osoba'.
-        self.tbl['hlasovani_poslance'] = pd.merge(left=self.tbl['hlasovani_poslance'], right=self.tbl['poslanci'], on="id_poslanec", suffixes=("", "__poslanci"), how='left')
+        poslanci = self.tbl['poslanci']
+        nutne = ['id_poslanec', 'id_osoba', 'id_parlament']
+        poslanci = poslanci[self.vyber_sloupce('hlasovani_poslance+poslanci', list(poslanci.columns), [c for c in poslanci.columns if c not in nutne])]
+        self.tbl['hlasovani_poslance'] = pd.merge(left=self.tbl['hlasovani_poslance'], right=poslanci, on="id_poslanec", suffixes=("", "__poslanci"), how='left')
         self.drop_by_inconsistency(self.tbl['hlasovani_poslance'], "__poslanci", 0.1, 'hlasovani_poslance', 'poslanci', inplace=True)
         self.tbl['hlasovani_poslance'] = self.tbl['hlasovani_poslance'][self.tbl['hlasovani_poslance'].id_parlament == self.snemovna.id_organ]
 
         # Připoj Hlasovani
-        hlasovani_columns = ['id_hlasovani', 'schuze', 'cislo', 'bod', 'cas',
-            'nazev_dlouhy', 'datum', 'bod__KAT',
-            'druh_hlasovani', 'ma_zpochybneni', 'je_zmatecne']
-        self.tbl['hlasovani_poslance'] = pd.merge(left=self.tbl['hlasovani_poslance'], right=self.tbl['hlasovani'][hlasovani_columns], on="id_hlasovani", suffixes=("", "__hlasovani"), how='left')
+        nutne = ['id_hlasovani', 'datum']
+        sloupce_hlasovani = self.vyber_sloupce('hlasovani_poslance+hlasovani', self.sloupce_hlasovani, [c for c in self.sloupce_hlasovani if c not in nutne])
+        self.tbl['hlasovani_poslance'] = pd.merge(left=self.tbl['hlasovani_poslance'], right=self.tbl['hlasovani'][sloupce_hlasovani], on="id_hlasovani", suffixes=("", "__hlasovani"), how='left')
         self.drop_by_inconsistency(self.tbl['hlasovani_poslance'], "__hlasovani", 0.1, 'hlasovani_poslance', 'hlasovani', inplace=True)
 
         # Ze zarazeni_osoby získáme informace o tom, v jakém poslaneckém klubu byl daný poslanec v den hlasování
-        zarazeni_osoby = self.tbl['zarazeni_osoby']
-
-        # Vyber všechny osoby, které byly členy dané poslanecné sněmovny
-        id_osoba_all = set(zarazeni_osoby[(zarazeni_osoby.id_organ==self.snemovna.id_organ) & (zarazeni_osoby.cl_funkce=='členství')].id_osoba)
-        # Vyber všechna zařazení osob do poslaneckých klubů dané poslanecké sněmovny
-        zarazeni_osoby_kluby = zarazeni_osoby[(zarazeni_osoby.id_osoba.isin(id_osoba_all)) & (zarazeni_osoby.nazev_typ_organ_cz == "Klub") & (zarazeni_osoby.cl_funkce=='členství')]\
-            .rename(columns={
-                'id_organ': 'id_klub',
-                'nazev_organ_cz': 'nazev_klub_cz', 'zkratka': 'zkratka_klub',
-                'od_o': 'od_klub', 'do_o': 'do_klub'
-            })
+        zarazeni_osoby_kluby = self.zarazeni_do_klubu()
 
         # Některé osoby mohli být zařazeny ve více klubech.
         # Pro každou osobu zatím vybereme poslední hodnotu, kterou pro přeběhlíky a nezařazené později upravíme.
@@ -244,55 +315,85 @@ class HlasovaniPoslanci(TabulkaHlasovaniPoslanciMixin, Hlasovani, Poslanci, Zara
         #print(self.tbl['hlasovani_poslance'].columns)
 
         # Pro přeběhlíky a vystoupivší je nutné vybrat řádky se správným údajem o zařazení do klubu.
-        s = zarazeni_osoby_kluby.groupby('id_osoba').size().sort_values()
-        oprav_zarazeni = s[s > 1]
+        self.oprav_kluby_dle_data(self.tbl['hlasovani_poslance'], zarazeni_osoby_kluby)
 
-        for id_osoba in oprav_zarazeni.index:
-            for idx, row in zarazeni_osoby_kluby[zarazeni_osoby_kluby.id_osoba == id_osoba].iterrows():
-                od_klub, do_klub =  row['od_klub'], row['do_klub']
-                id_klub, nazev_klub_cz, zkratka_klub =  row['id_klub'], row['nazev_klub_cz'], row['zkratka_klub']
-
-                # nastav id_klub dle data hlasování (pro prebehliky a vystoupivší)
-                self.tbl['hlasovani_poslance'].id_klub.mask(
-                    (self.tbl['hlasovani_poslance'].id_osoba == id_osoba)
-                      & (self.tbl['hlasovani_poslance'].datum >= od_klub)
-                      & ((self.tbl['hlasovani_poslance'].datum <= do_klub) | (pd.isna(do_klub))),
-                    id_klub, inplace=True)
-
-                # nastav nazev_klub_cz dle data hlasování (pro prebehliky a vystoupivší)
-                self.tbl['hlasovani_poslance'].nazev_klub_cz.mask(
-                    (self.tbl['hlasovani_poslance'].id_osoba == id_osoba)
-                      & (self.tbl['hlasovani_poslance'].datum >= od_klub)
-                      & ((self.tbl['hlasovani_poslance'].datum <= do_klub) | (pd.isna(do_klub))),
-                    nazev_klub_cz, inplace=True)
-
-                # nastav zkratka_klub dle data hlasování (pro prebehliky a vystoupivší)
-                self.tbl['hlasovani_poslance'].zkratka_klub.mask(
-                    (self.tbl['hlasovani_poslance'].id_osoba == id_osoba)
-                      & (self.tbl['hlasovani_poslance'].datum >= od_klub)
-                      & ((self.tbl['hlasovani_poslance'].datum <= do_klub) | (pd.isna(do_klub))),
-                    zkratka_klub, inplace=True)
+    @staticmethod
+    def oprav_kluby_dle_data(hp, zarazeni_osoby_kluby, sloupce=['id_klub', 'nazev_klub_cz', 'zkratka_klub']):
+        """Osobám zařazeným ve více klubech (přeběhlíkům a vystoupivším) nastaví v 'hp' klub platný v den hlasování.
 
-        self.nastav_dataframe(
-            self.tbl['hlasovani_poslance'],
-            vyber = [
-                'id_hlasovani', 'nazev_dlouhy', 'vysledek', # základní informace o hlasování poslance 
-                'id_poslanec', 'id_osoba', 'pred', 'jmeno', 'prijmeni', # základní informace o poslanci
-                'id_klub', 'nazev_klub_cz', 'zkratka_klub', #
-                'narozeni', 'pohlavi', 'pred', 'za',
-                'id_klub', 'nazev_klub_cz', 'zkratka_klub',
-                'id_kraj', 'nazev_kraj_cz', 'zkratka_kraj',
-                'id_kandidatka', 'nazev_kandidatka_cz', 'zkratka_kandidatka',
-                'schuze', 'cislo', 'bod', 'cas', 'datum', 'bod__KAT',
-                'druh_hlasovani', 'ma_zpochybneni', 'je_zmatecne'
-                'id_organ', 'id_parlament', # informace o PS
-            ],
-            odstran = [
-              'vysledek__ORIG', 'pohlavi__ORIG',
-              'od_parlament', 'do_parlament',
-              'web', 'ulice', 'obec', 'psc', 'telefon', 'fax', 'psp_telefon', 'email', 'facebook', 'foto', 'zmena', 'umrti', 'adresa', 'sirka', 'delka'
-           ]
+        Klub se hledá intervalovým joinem 'datum' přes 'od_klub' a 'do_klub' (včetně krajních časů, chybějící 'do_klub' znamená dosud trvající zařazení).
+        Hlasování mimo zařazení do klubů se ponechají beze změny. Tabulka 'hp' se mění na místě.
+        """
+        s = zarazeni_osoby_kluby.groupby('id_osoba').size()
+        oprav_zarazeni = s[s > 1]
+
+        oprav = hp.id_osoba.isin(oprav_zarazeni.index)
+        kluby_dle_data = interval_join(
+            hp[oprav],
+            zarazeni_osoby_kluby[zarazeni_osoby_kluby.id_osoba.isin(oprav_zarazeni.index)],
+            on='datum', by='id_osoba', start='od_klub', end='do_klub', columns=sloupce, indicator='nalezeno'
         )
+        kluby_dle_data = kluby_dle_data[kluby_dle_data.nalezeno]
+        for col in sloupce:
+            hp.loc[kluby_dle_data.index, col] = kluby_dle_data[col]
 
-        log.debug("<-- HlasovaniPoslance")
+    def id_poslanec_snemovny(self):
+        """Vrátí identifikátory poslanců dané poslanecké sněmovny."""
+        poslanci = self.tbl['poslanci']
+        return poslanci[poslanci.id_parlament == self.snemovna.id_organ].id_poslanec.unique()
+
+    def zarazeni_do_klubu(self):
+        """Vrátí všechna zařazení členů dané poslanecké sněmovny do poslaneckých klubů."""
+        zarazeni_osoby = self.tbl['zarazeni_osoby']
 
+        # Vyber všechny osoby, které byly členy dané poslanecné sněmovny
+        id_osoba_all = set(zarazeni_osoby[(zarazeni_osoby.id_organ==self.snemovna.id_organ) & (zarazeni_osoby.cl_funkce=='členství')].id_osoba)
+        # Vyber všechna zařazení osob do poslaneckých klubů dané poslanecké sněmovny
+        return zarazeni_osoby[(zarazeni_osoby.id_osoba.isin(id_osoba_all)) & (zarazeni_osoby.nazev_typ_organ_cz == "Klub") & (zarazeni_osoby.cl_funkce=='členství')]\
+            .rename(columns={
+                'id_organ': 'id_klub',
+                'nazev_organ_cz': 'nazev_klub_cz', 'zkratka': 'zkratka_klub',
+                'od_o': 'od_klub', 'do_o': 'do_klub'
+            })
+
+    def sestav_hlasovani_poslance_kompaktni(self):
+        # Zúžení na volební období a 'id_osoba' bez připojování celé tabulky poslanci
+        poslanci = self.tbl['poslanci']
+        poslanci = poslanci[poslanci.id_parlament == self.snemovna.id_organ].drop_duplicates('id_poslanec').set_index('id_poslanec')
+        self.nacti_hlasovani_poslanci(kompaktni=True, davka=self.parameters['davka'], id_poslanec=poslanci.index)
+        hp = self.tbl['hlasovani_poslance'].reset_index(drop=True)
+        hp['id_osoba'] = downcast_integers(hp.id_poslanec.map(poslanci.id_osoba))
+
+        # Klub v den hlasování: poslední klub osoby, pro přeběhlíky a vystoupivší klub dle data hlasování
+        zarazeni_osoby_kluby = self.zarazeni_do_klubu()
+        posledni_klub = zarazeni_osoby_kluby.groupby('id_osoba').tail(1).set_index('id_osoba').id_klub
+        id_klub = hp.id_osoba.map(posledni_klub).astype('Int64')
+
+        s = zarazeni_osoby_kluby.groupby('id_osoba').size()
+        oprav_zarazeni = s[s > 1]
+        oprav = hp.id_osoba.isin(oprav_zarazeni.index)
+        datum = self.tbl['hlasovani'].drop_duplicates('id_hlasovani').set_index('id_hlasovani').datum
+        kluby_dle_data = interval_join(
+            pd.DataFrame({'id_osoba': hp.id_osoba[oprav], 'datum': hp.id_hlasovani[oprav].map(datum)}),
+            zarazeni_osoby_kluby[zarazeni_osoby_kluby.id_osoba.isin(oprav_zarazeni.index)],
+            on='datum', by='id_osoba', start='od_klub', end='do_klub', columns=['id_klub'], indicator='nalezeno'
+        )
+        kluby_dle_data = kluby_dle_data[kluby_dle_data.nalezeno]
+        id_klub.loc[kluby_dle_data.index] = kluby_dle_data.id_klub
+        hp['id_klub'] = downcast_integers(id_klub)
+
+        self.tbl['hlasovani_poslance'] = hp
+
+    def rozsir(self):
+        """Vrátí kompaktní tabulku hlasování poslanců rozšířenou o informace o poslancích, hlasováních a klubech."""
+        df = pd.DataFrame(self)
+        klice = ['id_hlasovani', 'id_poslanec', 'id_osoba', 'id_klub']
+        df = df.astype({k: 'Int64' for k in klice if k in df.columns})
+
+        poslanci = self.tbl['poslanci']
+        poslanci = poslanci[poslanci.id_parlament == self.snemovna.id_organ].drop(columns=['id_osoba'])
+        df = pd.merge(df, poslanci, on='id_poslanec', how='left', suffixes=('', '__poslanci'))
+        df = pd.merge(df, self.tbl['hlasovani'][self.sloupce_hlasovani], on='id_hlasovani', how='left', suffixes=('', '__hlasovani'))
+        kluby = self.zarazeni_do_klubu().drop_duplicates('id_klub')[['id_klub', 'nazev_klub_cz', 'zkratka_klub']]
+        df = pd.merge(df, kluby, on='id_klub', how='left', suffixes=('', '__kluby'))
+        return df
@@ -0,0 +1,104 @@
+# Souběžné načítání tabulek
+# Tabulky (.unl soubory) jsou na sobě nezávislé, závislosti vznikají až při jejich spojování v konstruktorech.
+# Graf úloh je proto dvouúrovňový: načtení tabulek (listy grafu) se spouští souběžně ve vláknech,
+# kroky konstruktorů (spojování, viz SnemovnaDataFrame.sdilej) běží postupně a na svá načtení čekají.
+
+import os
+import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from snemovna.setup_logger import log
+
+# Popis načtení jedné tabulky, viz SnemovnaDataFrame.nacti_tabulku a metody 'specifikace_*' tříd 'Tabulka*Mixin'
+# 'sloupce' jsou načítané sloupce hlavičky 'header', None znamená všechny
+SpecifikaceUnl = namedtuple('SpecifikaceUnl', ['paths', 'header', 'tabulka', 'encoding', 'strip', 'sloupce'], defaults=['cp1250', False, None])
+
+
+class PlanovacNacitani(object):
+    """Plánovač souběžného načítání tabulek.
+
+    Načtení se plánují metodou naplanuj() a jejich výsledky se vyzvedávají metodou vysledek().
+    Vlákna běží jen po dobu, kdy jsou nějaká načtení naplánovaná: po vyzvednutí (nebo zahození) posledního
+    z nich se executor ukončí a při dalším plánování se vytvoří znovu, viz ukonci().
+    U všech načtení (souběžných i postupných) se zaznamenává doba trvání, viz casy().
+    """
+
+    def __init__(self, soubezne_max=-1):
+        self.soubezne_max = os.cpu_count() if soubezne_max in (None, -1) else soubezne_max
+        self.executor = None
+        self.ulohy = {}
+        self.nactene = set()
+        self.zaznamy = []
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def klic(spec):
+        return (tuple(spec.paths), spec.tabulka, spec.encoding, spec.strip, spec.sloupce)
+
+    def naplanuj(self, spec, fce):
+        """Naplánuje načtení tabulky 'spec' funkcí fce(spec), pokud ještě naplánované není."""
+        klic = self.klic(spec)
+        with self.lock:
+            if (klic in self.ulohy) or (klic in self.nactene):
+                return
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.soubezne_max, thread_name_prefix='nacitani')
+            log.debug(f"Plánovač: Plánuji načtení tabulky '{spec.tabulka}'.")
+            self.ulohy[klic] = self.executor.submit(self._spust, spec, fce, True)
+
+    def vysledek(self, spec, fce):
+        """Vrátí výsledek naplánovaného načtení tabulky 'spec', případně ji načte hned funkcí fce(spec)."""
+        with self.lock:
+            uloha = self.ulohy.pop(self.klic(spec), None)
+            self.nactene.add(self.klic(spec))
+        if uloha is None:
+            return self._spust(spec, fce, False)
+        try:
+            return uloha.result()
+        finally:
+            self._uvolni()
+
+    def zahod(self, tabulky):
+        """Zahodí naplánovaná načtení tabulek 'tabulky' (např. převzatých z registru)."""
+        with self.lock:
+            for klic in [k for k in self.ulohy if k[1] in tabulky]:
+                self.ulohy.pop(klic).cancel()
+        self._uvolni()
+
+    def ukonci(self):
+        """Zahodí všechna naplánovaná načtení a ukončí vlákna (počká na právě běžící načtení)."""
+        with self.lock:
+            for uloha in self.ulohy.values():
+                uloha.cancel()
+            self.ulohy = {}
+        self._uvolni()
+
+    def _uvolni(self):
+        # Bez naplánovaných načtení executor ukončíme, shutdown() se volá mimo zámek (běžící úlohy ho potřebují v _spust)
+        with self.lock:
+            if (self.executor is None) or (len(self.ulohy) > 0):
+                return
+            executor, self.executor = self.executor, None
+        executor.shutdown(wait=True)
+
+    def _spust(self, spec, fce, soubezne):
+        start = time.perf_counter()
+        ret = fce(spec)
+        konec = time.perf_counter()
+        with self.lock:
+            self.zaznamy.append(dict(
+                tabulka=spec.tabulka, start=start, trvani=konec - start,
+                soubezne=soubezne, vlakno=threading.current_thread().name
+            ))
+        return ret
+
+    def casy(self):
+        """Vrátí tabulku s dobami načítání jednotlivých tabulek [s]."""
+        df = pd.DataFrame(self.zaznamy, columns=['tabulka', 'start', 'trvani', 'soubezne', 'vlakno'])
+        if len(df) > 0:
+            df['start'] = df.start - df.start.min()
+        return df.sort_values('start').reset_index(drop=True)
@@ -11,6 +11,7 @@ import numpy as np
 from snemovna.utility import *
 from snemovna.Snemovna import *
 from snemovna.TabulkyPoslanciOsoby import *
+from snemovna.Hierarchie import Hierarchie
 from snemovna.setup_logger import log
 
 
@@ -30,18 +31,36 @@ class PoslanciOsobyBase(SnemovnaZipDataMixin, SnemovnaDataFrame):
 class TypOrgan(TabulkaTypOrganMixin, PoslanciOsobyBase):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.nacti_typ_organ()
+
+        self.sdilej('TypOrgan', self.sestav_typ_organ)
+
         self.nastav_dataframe(
             self.tbl['typ_organ'],
             odstran=['priorita'],
             vyber=['id_typ_organ', 'nazev_typ_organ_cz', 'nazev_typ_organ_en'])
 
+    def sestav_typ_organ(self):
+        self.nacti_typ_organ()
+
 
 class Organy(TabulkaOrganyMixin, TypOrgan):
+    """Orgány dané sněmovny.
+
+    Hierarchie všech načtených orgánů (i jiných volebních období) je v self.tbl['hierarchie_organu'], viz Hierarchie
+    a metody podrizene_organy() a nadrazene_organy().
+    """
+
     def __init__(self, *args, **kwargs):
         log.debug("--> Organy")
         super().__init__(*args, **kwargs)
 
+        self.sdilej('Organy', self.sestav_organy)
+
+        self.nastav_dataframe(self.tbl['organy'])
+
+        log.debug("<-- Organy")
+
+    def sestav_organy(self):
         self.nacti_organy()
 
         # Připoj Typu orgánu
@@ -51,6 +70,7 @@ class Organy(TabulkaOrganyMixin, TypOrgan):
         # Tímto se vyhneme varování funkce 'drop_by_inconsistency.
         self.tbl['organy'].drop(columns=["priorita", "priorita__typ_organ"], inplace=True)
         self.tbl['organy'] = self.drop_by_inconsistency(self.tbl['organy'], suffix, 0.1, 'organy', 'typ_organ')
+        self.tbl['hierarchie_organu'] = Hierarchie.z_tabulky(self.tbl['organy'], 'id_organ', 'organ_id_organ')
 
         # Nastav volební období, pokud chybí
         if self.volebni_obdobi == None:
@@ -69,17 +89,17 @@ class Organy(TabulkaOrganyMixin, TypOrgan):
                 raise ValueError
 
         self.tbl['organy'] = self.vyber_platne_organy()
-        self.nastav_dataframe(self.tbl['organy'])
-
-        log.debug("<-- Organy")
 
     def vyber_platne_organy(self, df=None):
-        if df == None:
+        if df is None:
             df = self.tbl['organy']
+            hierarchie = self.tbl['hierarchie_organu']
+        else:
+            hierarchie = Hierarchie.z_tabulky(df, 'id_organ', 'organ_id_organ')
         if self.volebni_obdobi == -1:
             return df
 
-        ids_snemovnich_organu = expand_hierarchy(df, 'id_organ', 'organ_id_organ', [self.snemovna.id_organ])
+        ids_snemovnich_organu = hierarchie.potomci([self.snemovna.id_organ])
 
         # TODO: Kdy použít od_f místo od_o, resp. do_f místo do_o?
         interval_start = df.od_organ\
@@ -108,8 +128,7 @@ class Organy(TabulkaOrganyMixin, TypOrgan):
         if x is not None:
             ids_jinych_snemoven.append(x.id_organ)
 
-        #ids_jinych_snemovnich_organu = find_children_ids(ids_jinych_snemoven, 'id_organ', df, 'organ_id_organ', ids_jinych_snemoven, 0)
-        ids_jinych_snemovnich_organu = expand_hierarchy(df, 'id_organ', 'organ_id_organ', ids_jinych_snemoven)
+        ids_jinych_snemovnich_organu = hierarchie.potomci(ids_jinych_snemoven)
         podminka_nepatri_do_jine_snemovny = ~df.id_organ.isin(ids_jinych_snemovnich_organu)
 
         df = df[
@@ -119,6 +138,14 @@ class Organy(TabulkaOrganyMixin, TypOrgan):
 
         return df
 
+    def podrizene_organy(self, id_organ, vcetne=False):
+        """Vrátí řádky tabulky s (i nepřímo) podřízenými orgány orgánu 'id_organ', při 'vcetne=True' i orgán samotný."""
+        return self[self.id_organ.isin(self.tbl['hierarchie_organu'].potomci([id_organ], vcetne=vcetne))]
+
+    def nadrazene_organy(self, id_organ):
+        """Vrátí identifikátory nadřazených orgánů orgánu 'id_organ', od nejbližšího po kořen (typicky Parlament)."""
+        return self.tbl['hierarchie_organu'].predci(id_organ)
+
     def _posledni_snemovna(self):
         """Pomocná funkce, vrací data poslední sněmovny"""
         p =  self.tbl['organy'][(self.tbl['organy'].nazev_organ_cz == 'Poslanecká sněmovna') & (self.tbl['organy'].do_organ.isna())].sort_values(by=["od_organ"])
@@ -173,6 +200,17 @@ class TypFunkce(TabulkaTypFunkceMixin, TypOrgan):
         log.debug("--> TypFunkce")
         super().__init__(*args, **kwargs)
 
+        self.sdilej('TypFunkce', self.sestav_typ_funkce)
+
+        self.nastav_dataframe(
+            self.tbl['typ_funkce'],
+            vyber=['id_typ_funkce', 'typ_funkce_cz', 'typ_funkce_en', 'typ_funkce_obecny'],
+            odstran=['typ_funkce_obecny__ORIG']
+        )
+
+        log.debug("<-- TypFunkce")
+
+    def sestav_typ_funkce(self):
         self.nacti_typ_funkce()
 
         # Připoj Typu orgánu
@@ -189,20 +227,19 @@ class TypFunkce(TabulkaTypFunkceMixin, TypOrgan):
         self.tbl['typ_funkce'].drop(columns=["priorita", "priorita__typ_organ"], inplace=True)
         self.tbl['typ_funkce'] = self.drop_by_inconsistency(self.tbl['typ_funkce'], suffix, 0.1, t1_name='typ_funkce', t2_name='typ_organ', t1_on='id_typ_organ', t2_on='id_typ_organ')
 
-        self.nastav_dataframe(
-            self.tbl['typ_funkce'],
-            vyber=['id_typ_funkce', 'typ_funkce_cz', 'typ_funkce_en', 'typ_funkce_obecny'],
-            odstran=['typ_funkce_obecny__ORIG']
-        )
-
-        log.debug("<-- TypFunkce")
-
 
 class Funkce(TabulkaFunkceMixin, Organy, TypFunkce):
     def __init__(self, *args, **kwargs):
         log.debug("--> Funkce")
         super().__init__(*args, **kwargs)
 
+        self.sdilej('Funkce', self.sestav_funkce)
+
+        self.nastav_dataframe(self.tbl['funkce'])
+
+        log.debug("<-- Funkce")
+
+    def sestav_funkce(self):
         self.nacti_funkce()
 
         # Zúžení
@@ -236,10 +273,6 @@ class Funkce(TabulkaFunkceMixin, Organy, TypFunkce):
         if self.volebni_obdobi != -1:
             assert len(self.tbl['funkce'][self.tbl['funkce'].id_organ.isna()]) == 0
 
-        self.nastav_dataframe(self.tbl['funkce'])
-
-        log.debug("<-- Funkce")
-
     def vyber_platne_funkce(self):
         if self.volebni_obdobi != -1:
             self.tbl['funkce'] = self.tbl['funkce'][self.tbl['funkce'].id_organ.isin(self.tbl['organy'].id_organ)]
@@ -250,6 +283,13 @@ class Osoby(TabulkaOsobaExtraMixin, TabulkaOsobyMixin, PoslanciOsobyBase):
         log.debug("--> Osoby")
         super(Osoby, self).__init__(*args, **kwargs)
 
+        self.sdilej('Osoby', self.sestav_osoby)
+
+        self.nastav_dataframe(self.tbl['osoby'])
+
+        log.debug("<-- Osoby")
+
+    def sestav_osoby(self):
         self.nacti_osoby()
         self.nacti_osoba_extra()
 
@@ -257,10 +297,6 @@ class Osoby(TabulkaOsobaExtraMixin, TabulkaOsobyMixin, PoslanciOsobyBase):
         #self.tbl['osoby'] = pd.merge(left=self.tbl['osoby'], right=self.tbl['osoba_extra'], on="id_osoba", how="left", suffixes=('', suffix))
         #self.drop_by_inconsistency(self.tbl['osoby'], suffix, 0.1, 'hlasovani', 'osoba_extra', inplace=True)
 
-        self.nastav_dataframe(self.tbl['osoby'])
-
-        log.debug("<-- Osoby")
-
 
 class ZarazeniOsoby(TabulkaZarazeniOsobyMixin, Funkce, Organy, Osoby):
     def __init__(self, *args, **kwargs):
@@ -268,6 +304,13 @@ class ZarazeniOsoby(TabulkaZarazeniOsobyMixin, Funkce, Organy, Osoby):
 
         super().__init__(*args, **kwargs)
 
+        self.sdilej('ZarazeniOsoby', self.sestav_zarazeni_osoby)
+
+        self.nastav_dataframe(self.tbl['zarazeni_osoby'])
+
+        log.debug("<-- ZarazeniOsoby")
+
+    def sestav_zarazeni_osoby(self):
         self.nacti_zarazeni_osoby()
 
         # Připoj Osoby
@@ -299,10 +342,6 @@ class ZarazeniOsoby(TabulkaZarazeniOsobyMixin, Funkce, Organy, Osoby):
         # Zúžení na dané volební období
         self.vyber_platne_zarazeni_osoby()
 
-        self.nastav_dataframe(self.tbl['zarazeni_osoby'])
-
-        log.debug("<-- ZarazeniOsoby")
-
     def vyber_platne_zarazeni_osoby(self):
         if self.volebni_obdobi != -1:
             interval_start = self.tbl['zarazeni_osoby'].od_o\
@@ -330,6 +369,16 @@ class Poslanci(TabulkaPoslanciPkgpsMixin, TabulkaPoslanciMixin, ZarazeniOsoby, O
 
         super().__init__(*args, **kwargs)
 
+        self.sdilej('Poslanci', self.sestav_poslance)
+
+        self.nastav_dataframe(
+            self.tbl['poslanci'],
+            odstran=['pohlavi__ORIG']
+        )
+
+        log.debug("<-- Poslanci")
+
+    def sestav_poslance(self):
         self.nacti_poslanci_pkgps()
         self.nacti_poslance()
 
@@ -387,11 +436,3 @@ class Poslanci(TabulkaPoslanciPkgpsMixin, TabulkaPoslanciMixin, ZarazeniOsoby, O
         self.meta.nastav_hodnotu('zkratka_klub', {"popis": 'Zkratka posledního klubu, do něhož byli poslanci zařazeni, viz Organy:zkratka', 'tabulka': 'df', 'vlastni': True})
         self.meta.nastav_hodnotu('od_klub', {"popis": 'Datum začátku zařazení poslanců do posledního klubu, viz Organy:od_o', 'tabulka': 'df', 'vlastni': True})
         self.meta.nastav_hodnotu('do_klub', {"popis": 'Datum konce zařazení poslanců do posledního klubu, viz Organy:do_o', 'tabulka': 'df', 'vlastni': True})
-
-        self.nastav_dataframe(
-            self.tbl['poslanci'],
-            odstran=['pohlavi__ORIG']
-        )
-
-        log.debug("<-- Poslanci")
-
@@ -0,0 +1,93 @@
+# Sdílený registr tabulek
+# Kvůli hluboké hierarchii tříd (např. HlasovaniPoslanci dědí z Hlasovani, Poslanci, ZarazeniOsoby, ...) se při vytváření
+# více objektů v jednom procesu opakovaně načítají a spojují stejné tabulky (organy, osoby, zarazeni_osoby, ...).
+# Registr si pamatuje výsledky jednotlivých kroků konstruktorů pro danou dvojici (data_dir, volebni_obdobi).
+
+import threading
+from os import path
+from collections import namedtuple
+
+from snemovna.setup_logger import log
+
+# Výsledek jednoho kroku: změněné tabulky (tbl), cesty (paths), zápisy do metadat, atributy objektu,
+# nekonzistence zjištěné při spojování tabulek (viz SnemovnaDataFrame.drop_by_inconsistency)
+# a vynechané sloupce tabulek, z nichž byl výsledek sestaven (viz SnemovnaDataFrame.vyber_sloupce)
+ZaznamKroku = namedtuple('ZaznamKroku', ['tbl', 'paths', 'meta', 'atributy', 'nekonzistence', 'projekce'], defaults=[(), ()])
+
+
+class SledovaneTabulky(dict):
+    """Slovník tabulek objektu (self.tbl), který si během kroku pamatuje čtené tabulky (je-li 'ctene' množina)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ctene = None
+
+    def __getitem__(self, key):
+        if self.ctene is not None:
+            self.ctene.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        if self.ctene is not None:
+            self.ctene.add(key)
+        return super().get(key, default)
+
+
+class RegistrTabulek(object):
+    """Procesový registr načtených a spojených tabulek.
+
+    Tabulky v registru jsou sdílené mezi objekty, nesmí se proto měnit na místě (inplace).
+    Objekty (viz SnemovnaDataFrame.nastav_dataframe) sdílí data s tabulkami v registru, ne však seznam sloupců:
+    přidání sloupce do objektu je bezpečné, změna hodnot na místě se může projevit ve všech objektech.
+    Po změně zdrojových dat je nutné registr zneplatnit, viz zneplatni().
+
+    Krok může mít více variant lišících se vynechanými sloupci (viz ZaznamKroku.projekce),
+    najdi() vrací první variantu, kterou lze pro daný objekt použít.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def klic(data_dir, volebni_obdobi):
+        return (path.abspath(data_dir), volebni_obdobi)
+
+    def najdi(self, data_dir, volebni_obdobi, krok, pouzitelny=None):
+        """Vrátí uložený výsledek kroku, pro který pouzitelny(zaznam) platí, případně None."""
+        with self.lock:
+            varianty = list(self.data.get(self.klic(data_dir, volebni_obdobi), {}).get(krok, []))
+        for zaznam in varianty:
+            if (pouzitelny is None) or pouzitelny(zaznam):
+                return zaznam
+        return None
+
+    def tabulky(self, data_dir, volebni_obdobi, pouzitelny=None):
+        """Vrátí jména tabulek z uložených kroků, pro které pouzitelny(zaznam) platí."""
+        with self.lock:
+            kroky = list(self.data.get(self.klic(data_dir, volebni_obdobi), {}).values())
+        return {key for varianty in kroky for zaznam in varianty if (pouzitelny is None) or pouzitelny(zaznam) for key in zaznam.tbl}
+
+    def uloz(self, data_dir, volebni_obdobi, krok, zaznam):
+        """Uloží výsledek kroku, případnou variantu se stejnou projekcí nahradí."""
+        with self.lock:
+            kroky = self.data.setdefault(self.klic(data_dir, volebni_obdobi), {})
+            kroky[krok] = [z for z in kroky.get(krok, []) if z.projekce != zaznam.projekce] + [zaznam]
+
+    def zneplatni(self, data_dir=None, volebni_obdobi=None):
+        """Zapomene uložené kroky, volitelně jen pro daný adresář, resp. volební období."""
+        with self.lock:
+            for klic in list(self.data.keys()):
+                if (data_dir is not None) and (klic[0] != path.abspath(data_dir)):
+                    continue
+                if (volebni_obdobi is not None) and (klic[1] != volebni_obdobi):
+                    continue
+                log.debug(f"Registr: Zneplatňuji tabulky pro {klic}.")
+                del self.data[klic]
+
+    def __contains__(self, klic):
+        with self.lock:
+            return self.klic(*klic) in self.data
+
+
+registr_tabulek = RegistrTabulek()
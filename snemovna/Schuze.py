@@ -24,6 +24,16 @@ class Schuze(TabulkaSchuzeMixin, TabulkaSchuzeStavMixin, SchuzeBase):
 
         super().__init__(*args, **kwargs)
 
+        self.sdilej('Schuze', self.sestav_schuze)
+
+        self.nastav_dataframe(
+            self.tbl['schuze'],
+            odstran=['pozvanka__ORIG', 'stav__ORIG', 'typ__ORIG']
+        )
+
+        log.debug('<-- Schuze')
+
+    def sestav_schuze(self):
         self.nacti_schuze()
         self.nacti_schuze_stav()
 
@@ -36,13 +46,6 @@ class Schuze(TabulkaSchuzeMixin, TabulkaSchuzeStavMixin, SchuzeBase):
         self.tbl['schuze'] = pd.merge(left=self.tbl['schuze'], right=self.tbl['schuze_stav'], on='id_schuze', suffixes = ("", suffix), how='left')
         self.drop_by_inconsistency(self.tbl['schuze'], suffix, 0.1, 'schuze', 'schuze_stav', inplace=True)
 
-        self.nastav_dataframe(
-            self.tbl['schuze'],
-            odstran=['pozvanka__ORIG', 'stav__ORIG', 'typ__ORIG']
-        )
-
-        log.debug('<-- Schuze')
-
 
 class BodSchuze(TabulkaBodSchuzeMixin, TabulkaBodStavMixin, SchuzeBase):
     def __init__(self, *args, **kwargs):
@@ -50,6 +53,13 @@ class BodSchuze(TabulkaBodSchuzeMixin, TabulkaBodStavMixin, SchuzeBase):
 
         super().__init__(*args, **kwargs)
 
+        self.sdilej('BodSchuze', self.sestav_bod_schuze)
+
+        self.nastav_dataframe(self.tbl['bod_schuze'])
+
+        log.debug('<-- BodSchuze')
+
+    def sestav_bod_schuze(self):
         self.nacti_bod_schuze()
         self.nacti_bod_stav()
 
@@ -59,8 +69,3 @@ class BodSchuze(TabulkaBodSchuzeMixin, TabulkaBodStavMixin, SchuzeBase):
         suffix = "__bod_stav"
         self.tbl['bod_schuze'] = pd.merge(left=self.tbl['bod_schuze'], right=self.tbl['bod_stav'], on='id_bod_stav', suffixes = ("", suffix), how='left')
         self.drop_by_inconsistency(self.tbl['bod_schuze'], suffix, 0.1, 'bod_schuze', 'bod_stav', inplace=True)
-
-        self.nastav_dataframe(self.tbl['bod_schuze'])
-
-        log.debug('<-- BodSchuze')
-
@@ -12,33 +12,69 @@ import numpy as np
 
 from snemovna.Helpers import *
 from snemovna.utility import *
+from snemovna.Cache import CacheTabulek
+from snemovna.Registr import registr_tabulek, ZaznamKroku, SledovaneTabulky
+from snemovna.Planovac import PlanovacNacitani, SpecifikaceUnl
 from snemovna.setup_logger import log
 
 
-class SnemovnaMeta(MyDataFrame):
-    def __init__(self, cols=[], defaults={}, dtypes={}, index_name='name'):
-        # Create an empty dataframe with defined columns
-        columns = set(cols + [index_name] + list(defaults.keys()) + list(dtypes.keys()))
-        super().__init__([], columns=columns)
+# Způsoby kontroly konzistence spojených tabulek, viz SnemovnaDataFrame.drop_by_inconsistency
+KONTROLA_KONZISTENCE = ['uplna', 'vzorek', 'vypnuta']
 
-        # Register custom variables that should not mix with the dataframe columns
-        self._metadata = ['_cols', '_defaults', '_dtypes', '_index_name']
-        self._cols, self._defaults, self._dtypes = cols, defaults, dtypes
-        self._index_name = index_name
+# Převzetí bloků tabulky bez kopírování (viz SnemovnaDataFrame.nastav_dataframe) používá interní API pandas,
+# které je ověřené pro verze 1.1 až 1.4. V ostatních verzích se vybrané sloupce kopírují.
+VERZE_PANDAS = tuple(int(x) for x in pd.__version__.split('.')[:2])
+PREVZETI_BLOKU = (1, 1) <= VERZE_PANDAS < (1, 5)
 
-        # Set index
-        self.set_index(index_name, inplace=True)
 
-    def nastav_hodnotu(self, name, val):
+def rozdilne_hodnoty(a, b):
+    """Vrátí np.array příznaků, zda se hodnoty sloupců 'a' a 'b' liší (dvě chybějící hodnoty se neliší)."""
+    # Note: np.nan != np.nan by default, pd.NA != x je pd.NA (bere se jako shoda)
+    rozdil = (a.to_numpy() != b.to_numpy()) if (a.dtype == b.dtype) and isinstance(a.dtype, np.dtype) and (a.dtype != object) else (a != b)
+    rozdil = rozdil & ~(a.isna().to_numpy() & b.isna().to_numpy())
+    if isinstance(rozdil, pd.Series):
+        rozdil = rozdil.fillna(False).to_numpy(dtype=bool)
+    return rozdil
+
+
+class SnemovnaMeta(Meta):
+    """Metadata sloupců tabulek (popis, tabulka, vlastni, aktivni), viz Meta.
+
+    Na rozdíl od Meta lze zapisovat jen registrované hodnoty (viz 'cols', 'defaults', 'dtypes').
+    """
+    __slots__ = ('_cols', '_zaznam')
+
+    def __init__(self, cols=[], defaults={}, dtypes={}, index_name='name'):
+        super().__init__(defaults=defaults, dtypes=dtypes, index_name=index_name)
+        self._cols = list(cols)
+        # Pokud není None, zaznamenávají se sem všechny zápisy (viz SnemovnaDataFrame.sdilej)
+        self._zaznam = None
+
+    @property
+    def columns(self):
+        return list(dict.fromkeys(self._cols + super().columns))
+
+    def zkontroluj_klice(self, val):
         unregistered_keys = set(val.keys()) - set(self.columns)
         if len(unregistered_keys) > 0:
             raise ValueError(f"Found unregistered keys: {unregistered_keys}. Cannot set metadata!")
-        missing_keys = self._defaults.keys() - val.keys()
-        for k in missing_keys:
-            val[k] = self._defaults[k]
 
-        for k, i in val.items():
-            self.at[name, k] = i
+    def nastav_hodnotu(self, name, val):
+        """Nastaví metadata sloupce 'name', chybějící hodnoty se nastaví na výchozí."""
+        self.zkontroluj_klice(val)
+        if self._zaznam is not None:
+            self._zaznam.append((name, dict(val)))
+        self._data[name] = {**self._defaults, **val}
+
+    def uprav(self, name, **val):
+        """Změní jen zadané hodnoty metadat sloupce 'name' (ostatní ponechá)."""
+        self.zkontroluj_klice(val)
+        self[name] = val
+
+    def copy(self):
+        ret = super().copy()
+        ret._zaznam = None
+        return ret
 
 
 class SnemovnaDataFrame(MyDataFrame):
@@ -68,23 +104,54 @@ class SnemovnaDataFrame(MyDataFrame):
         lokální cesta k zazipovaným tabulkám
     file_name
         jméno zip souboru (basename)
+    cache : bool
+        pokud je True, přetypované tabulky se ukládají do adresáře '{data_dir}/cache' a při dalším načtení se z něj berou
+    registr : bool
+        pokud je True, výsledky načítání a spojování tabulek se sdílí s ostatními objekty v procesu, viz RegistrTabulek
+    soubezne_nacitani_max : int
+        maximální počet souběžně načítaných tabulek, -1 znamená počet procesorů, 1 vypíná souběžné načítání
+    nepredcitat : list
+        tabulky, které se nemají načítat předem (např. tabulky čtené po dávkách)
+    kontrola_konzistence : str
+        kontrola sloupců po spojení tabulek: 'uplna', 'vzorek' (jen 'vzorek_konzistence' řádků) nebo 'vypnuta'
+    sloupce : list
+        požadované sloupce výsledné tabulky, volitelné sloupce mimo ně se vůbec nenačítají (viz vyber_sloupce),
+        None znamená všechny kromě 'nepotrebne_sloupce' třídy
 
     Methods
     -------
+    nacti_unl(paths, header, tabulka, encoding='cp1250', strip=False)
+        Načte tabulku z .unl souboru(ů), přetypuje ji a rozšíří meta informace
+    nacti_tabulku(spec)
+        Totéž jako nacti_unl, tabulka je zadaná specifikací SpecifikaceUnl (viz metody 'specifikace_*')
+    vyber_sloupce(nazev, sloupce, volitelne)
+        Vrátí sloupce, které se mají načíst, resp. připojit (bez nepožadovaných volitelných sloupců)
+    sdilej(krok, fce)
+        Provede krok konstruktoru, nebo převezme jeho výsledek ze sdíleného registru
+    predcti_tabulky()
+        Naplánuje souběžné načtení tabulek, jejichž soubory jsou k dispozici
+    casy_nacitani()
+        Vrátí doby načítání jednotlivých tabulek
     drop_by_inconsistency (df, suffix, threshold, t1_name=None, t2_name=None, t1_on=None, t2_on=None, inplace=False)
         Prozkoumá tabulku a oveří konzistenci dat po mergování
+    souhrn_nekonzistence()
+        Vrátí přehled nekonzistencí zjištěných při spojování tabulek
     nastav_meta()
         Nastaví meta informace k sloupcům dle aktuálního stavu tabuky df
     rozsir_meta(header, tabulka=None, vlastni=None)
         Rozšíří meta informace k sloupcům dle hlavičky konkrétní tabulky
     """
-    def __init__(self, volebni_obdobi=None, data_dir='./data', *args, **kwargs):
+
+    # Sloupce, které třída na konci odstraňuje; pokud nejsou požadované sloupce ('sloupce'), tyto se nenačítají
+    nepotrebne_sloupce = []
+
+    def __init__(self, volebni_obdobi=None, data_dir='./data', *args, cache=True, registr=True, soubezne_nacitani_max=-1, nepredcitat=[], kontrola_konzistence='uplna', vzorek_konzistence=10000, sloupce=None, **kwargs):
         log.debug("--> SnemovnaDataFrame")
         log.debug(f"Base kwargs: {kwargs}")
         super().__init__(*args, **kwargs)
         self._metadata = [
             "meta", 'tbl', 'parameters', 'paths',
-            "volební období", "snemovna", "tzn"
+            "volební období", "snemovna", "tzn", "nekonzistence", "projekce", "puvod"
         ]
 
         self.meta = SnemovnaMeta(
@@ -92,7 +159,7 @@ class SnemovnaDataFrame(MyDataFrame):
             dtypes=dict(popis='string', tabulka='string', vlastni='bool', aktivni='bool'),
             defaults=dict(popis=None, tabulka=None, vlastni=None, aktivni=None),
         )
-        self.tbl = {}
+        self.tbl = SledovaneTabulky()
         self.paths = {}
         self.volebni_obdobi = volebni_obdobi
         self.snemovna = None
@@ -100,6 +167,24 @@ class SnemovnaDataFrame(MyDataFrame):
 
         self.parameters = {}
         self.parameters['data_dir'] = data_dir
+        self.parameters['cache'] = cache
+        self.parameters['registr'] = registr
+        self.parameters['soubezne_nacitani_max'] = soubezne_nacitani_max
+        self.parameters['nepredcitat'] = list(nepredcitat)
+        if kontrola_konzistence not in KONTROLA_KONZISTENCE:
+            raise ValueError(f"Neznámý způsob kontroly konzistence '{kontrola_konzistence}', možnosti jsou {KONTROLA_KONZISTENCE}.")
+        self.parameters['kontrola_konzistence'] = kontrola_konzistence
+        self.parameters['vzorek_konzistence'] = vzorek_konzistence
+        self.parameters['sloupce'] = None if sloupce is None else list(sloupce)
+
+        # Nekonzistence zjištěné při spojování tabulek, viz drop_by_inconsistency a souhrn_nekonzistence
+        self.nekonzistence = []
+        # Vynechané volitelné sloupce: název tabulky -> (volitelné sloupce, vynechané sloupce), viz vyber_sloupce
+        self.projekce = {}
+        # Projekce, na kterých závisí tabulky v self.tbl: tabulka -> názvy v self.projekce, viz sdilej
+        self.puvod = {}
+
+        self.planovac = PlanovacNacitani(soubezne_nacitani_max)
 
         log.debug("<-- SnemovnaDataFrame")
 
@@ -109,88 +194,312 @@ class SnemovnaDataFrame(MyDataFrame):
         for key in obj.tbl:
             self.tbl[key] = obj.tbl[key]
         for key in obj.meta:
-            row = obj.meta.data.loc[key].to_dict()
+            row = obj.meta[key]
             if row['tabulka'] == 'df':
                 row['tabulka'] = jmeno + '_df'
-            self.meta[key] = row
+            self.meta.nastav_hodnotu(key, row)
         return obj
 
     def popis(self):
-        popis_tabulku(self, self.meta, schovej=['aktivni', 'sloupec'])
+        popis_tabulku(self, self.meta.popis(), schovej=['aktivni', 'sloupec'])
 
     def popis_sloupec(self, sloupec):
         popis_sloupec(self, sloupec)
 
     def drop_by_inconsistency (self, df, suffix, threshold, t1_name=None, t2_name=None, t1_on=None, t2_on=None, inplace=False, silent=False):
-        inconsistency = {}
-        abundance = []
-
-        for col in df.columns[df.columns.str.endswith(suffix)]:
-            short_col = col[:len(col)-len(suffix)]
-
-            # Note: np.nan != np.nan by default
-            difference = df[(df[short_col] != df[col]) & ~(df[short_col].isna() & df[col].isna())]
-            if len(difference) > 0:
-              inconsistency[short_col] = float(len(difference))/len(df)
-              on = f", left_on={t1_on} right_on={t2_on}" if ((t1_on != None) and (t2_on != None)) else ''
-              if not silent:
-                  log.warning(f"While merging '{t1_name}' with '{t2_name}'{on}: Columns '{short_col}' and '{col}' differ in {len (difference)} values from {len(df)}. Inconsistency ratio: {inconsistency[short_col]:.4f}. Example of inconsistency: '{difference.iloc[0][short_col]}' (i.e. {short_col}@{difference.index[0]}) != '{difference.iloc[0][col]}' (i.e. {col}@{difference.index[0]})")
-            else:
-              abundance.append(short_col)
-
-        to_drop = [col for (col, i) in inconsistency.items() if i >= threshold]
-        if len(to_drop) > 0:
-            if not silent:
-                log.warning(f"While merging '{t1_name}' with '{t2_name}': Dropping {to_drop} because of big inconsistency.")
-
-        to_skip = [col + suffix for col in set(inconsistency.keys()).union(abundance)]
-        if len(to_skip) > 0:
-            if not silent:
-                log.warning(f"While merging '{t1_name}' with '{t2_name}': Dropping {to_skip} because of abundance.")
+        """Porovná sloupce s příponou 'suffix' (vzniklé při spojení tabulek) s jejich protějšky bez přípony.
+
+        Sloupce s příponou se vždy odstraní, protějšek se odstraní, pokud se od nich liší
+        v podílu řádků alespoň 'threshold'. Kontrola se řídí parametrem 'kontrola_konzistence':
+        'uplna' porovná všechny řádky, 'vzorek' jen náhodný vzorek 'vzorek_konzistence' řádků
+        a 'vypnuta' neporovnává nic (protějšky se pak ponechají vždy).
+        Zjištěné rozdíly se zaznamenají do self.nekonzistence, viz souhrn_nekonzistence().
+        """
+        sloupce = [col for col in df.columns if col.endswith(suffix)]
+        kratke = [col[:len(col)-len(suffix)] for col in sloupce]
+
+        rezim = self.parameters.get('kontrola_konzistence', 'uplna')
+        to_drop = []
+        if (rezim != 'vypnuta') and (len(sloupce) > 0) and (len(df) > 0):
+            radky, vyber = np.arange(len(df)), (lambda s: s)
+            vzorek = self.parameters.get('vzorek_konzistence', 10000)
+            if (rezim == 'vzorek') and (len(df) > vzorek):
+                radky = np.sort(np.random.default_rng(0).choice(len(df), size=vzorek, replace=False))
+                vyber = (lambda s: s.iloc[radky])
+
+            # Matice rozdílů: řádek (vzorku) x dvojice sloupců
+            rozdily = np.column_stack([rozdilne_hodnoty(vyber(df[short_col]), vyber(df[col])) for short_col, col in zip(kratke, sloupce)])
+            pocty = rozdily.sum(axis=0)
+            prvni = rozdily.argmax(axis=0)
+
+            for i in np.flatnonzero(pocty):
+                short_col, col, radek = kratke[i], sloupce[i], radky[prvni[i]]
+                podil = float(pocty[i]) / len(radky)
+                if podil >= threshold:
+                    to_drop.append(short_col)
+                self.nekonzistence.append(dict(
+                    tabulka=t1_name, pripojena=t2_name, tabulka_on=t1_on, pripojena_on=t2_on,
+                    sloupec=short_col, radku=len(radky), rozdilnych=int(pocty[i]), podil=podil, vzorek=len(radky) < len(df),
+                    priklad=df.index[radek], hodnota=df[short_col].iat[radek], hodnota_pripojena=df[col].iat[radek],
+                    odstranen=podil >= threshold
+                ))
+                if not silent:
+                    log.debug(f"While merging '{t1_name}' with '{t2_name}': Columns '{short_col}' and '{col}' differ in {pocty[i]} values from {len(radky)}.")
+
+        if (len(to_drop) > 0) and (not silent):
+            log.warning(f"While merging '{t1_name}' with '{t2_name}': Dropping {to_drop} because of big inconsistency, see souhrn_nekonzistence().")
 
         if inplace == True:
-            df.drop(columns=set(to_drop).union(to_skip), inplace=True)
+            df.drop(columns=set(to_drop).union(sloupce), inplace=True)
             ret = df
         else:
-            ret = df.drop(columns=set(to_drop).union(to_skip))
+            ret = df.drop(columns=set(to_drop).union(sloupce))
 
         return ret
 
+    def souhrn_nekonzistence(self):
+        """Vrátí přehled nekonzistencí zjištěných při spojování tabulek (jeden řádek na dvojici sloupců a spojení).
+
+        Sloupce: 'tabulka' a 'pripojena' (jména spojených tabulek), 'sloupec', 'radku' (počet porovnaných řádků),
+        'rozdilnych', 'podil', 'vzorek' (porovnán jen vzorek řádků), 'priklad' (index řádku s rozdílem),
+        'hodnota', 'hodnota_pripojena' a 'odstranen' (sloupec byl kvůli nekonzistenci odstraněn).
+        """
+        sloupce = ['tabulka', 'pripojena', 'tabulka_on', 'pripojena_on', 'sloupec', 'radku', 'rozdilnych', 'podil', 'vzorek', 'priklad', 'hodnota', 'hodnota_pripojena', 'odstranen']
+        return pd.DataFrame(self.nekonzistence, columns=sloupce)
+
     def nastav_dataframe(self, frame, odstran=[], vyber=[]):
+        """Nastaví tabulku 'frame' jako data objektu, se sloupci 'vyber' na začátku a bez sloupců 'odstran'.
+
+        Data se nekopírují: objekt převezme bloky tabulky 'frame', resp. jejich pohledy, pokud se sloupce vybírají či přeřazují.
+        Přidání či odebrání sloupců objektu se ve 'frame' neprojeví, změna hodnot na místě (např. přes loc) se projevit může
+        (u sloupců typů numpy). Tabulka 'frame' bývá sdílená přes registr (viz sdilej), změna hodnot se pak může projevit
+        ve všech objektech se stejnými daty v procesu. Pro úpravy hodnot je proto vhodné nejdříve vytvořit kopii (např. pd.DataFrame(obj).copy()).
+        Pohledy na bloky lze vytvořit jen ve verzích pandas, kde PREVZETI_BLOKU je True, jinak se vybrané či přeřazené sloupce zkopírují.
+        """
+        if not frame.columns.is_unique:
+            frame = frame.loc[:, ~frame.columns.duplicated()]
+
         ordered_cols = list(vyber) + list(frame.columns)
         ordered_cols = [x for x in ordered_cols if x in frame.columns]
         ordered_cols =  list(dict.fromkeys(ordered_cols))
-
-        # recreate the frame with ordered and selected columns
-        self.drop(index=self.index, columns=self.columns, inplace=True)
-        for col in ordered_cols:
-            if col not in odstran:
-                self[col] = frame[col].astype(frame[col].dtype)
+        if self.parameters.get('sloupce') is not None:
+            # Požadované sloupce se ponechají, i pokud je třída běžně odstraňuje
+            odstran = [x for x in ordered_cols if x not in self.parameters['sloupce']]
+        ordered_cols = [x for x in ordered_cols if x not in odstran]
+
+        if ordered_cols == list(frame.columns):
+            # Mělká kopie má vlastní seznam sloupců, přidání sloupce se tak nepropíše do 'frame'
+            pd.DataFrame.__init__(self, frame.copy(deep=False), copy=False)
+        elif PREVZETI_BLOKU:
+            from pandas.core.internals import BlockManager
+            indexer = frame.columns.get_indexer(ordered_cols)
+            blocks = frame._mgr._slice_take_blocks_ax0(indexer, only_slice=True)
+            self._mgr = BlockManager(blocks, [frame.columns[indexer], frame._mgr.axes[1]])
+            self._clear_item_cache()
+        else:
+            pd.DataFrame.__init__(self, frame[ordered_cols], copy=False)
 
         self.nastav_meta(odstran=odstran, vyber=vyber)
 
     def nastav_meta(self, odstran=[], vyber=[]):
-        m = self.meta.copy()
-        for key in m.index:
-            if key in odstran:
-                m.loc[key, 'aktivni'] = False
-            elif key not in self.columns:
-                m.loc[key, 'aktivni'] = False
-            else:
-                m.loc[key, 'aktivni'] = True
+        sloupce = set(self.columns)
+        for key in self.meta:
+            self.meta.uprav(key, aktivni=(key not in odstran) and (key in sloupce))
 
         for key in self.columns:
-            if key not in m.index:
+            if key not in self.meta:
                 log.warning(f"Pro sloupec '{key}' nebyla nalezena metadata!")
 
-        ordered_idx = list(vyber) + list(m.index)
-        ordered_idx = [x for x in ordered_idx if x in m.index]
-        ordered_idx =  list(dict.fromkeys(ordered_idx))
-        m = m.reindex(index=ordered_idx)
-
-        self.meta.drop(index=self.meta.index, columns=self.meta.columns, inplace=True)
-        for col in m.columns:
-            self.meta[col] = m[col]
+        self.meta.serad(vyber)
+
+    def sdilej(self, krok, fce):
+        """Provede krok 'fce' (načtení a spojení tabulek), nebo převezme jeho výsledek ze sdíleného registru.
+
+        Krok je identifikován jménem 'krok' a dvojicí (data_dir, volebni_obdobi).
+        Z kroku se pamatují změněné tabulky v self.tbl, cesty v self.paths, zápisy do metadat
+        a atributy 'volebni_obdobi' a 'snemovna'.
+        """
+        data_dir, volebni_obdobi = self.parameters['data_dir'], self.volebni_obdobi
+        if self.parameters.get('registr', False) == False:
+            self.predcti_tabulky()
+            fce()
+            return
+
+        zaznam = registr_tabulek.najdi(data_dir, volebni_obdobi, krok, pouzitelny=self.pouzitelna_projekce)
+        if zaznam is not None:
+            log.debug(f"Registr: Přebírám výsledek kroku '{krok}'.")
+            self.tbl.update(zaznam.tbl)
+            self.planovac.zahod(zaznam.tbl.keys())
+            self.paths.update(zaznam.paths)
+            for name, val in zaznam.meta:
+                self.meta.nastav_hodnotu(name, dict(val))
+            for name, val in zaznam.atributy.items():
+                setattr(self, name, val)
+            self.nekonzistence.extend(zaznam.nekonzistence)
+            self.projekce.update(zaznam.projekce)
+            for key in zaznam.tbl:
+                self.puvod[key] = frozenset(nazev for nazev, _ in zaznam.projekce)
+            return
+
+        self.predcti_tabulky()
+
+        tbl, paths, projekce = dict(self.tbl), dict(self.paths), dict(self.projekce)
+        self.meta._zaznam = []
+        self.tbl.ctene = set()
+        nekonzistence = len(self.nekonzistence)
+        try:
+            fce()
+            meta = self.meta._zaznam
+            ctene = self.tbl.ctene
+        finally:
+            self.meta._zaznam = None
+            self.tbl.ctene = None
+
+        # Výsledek kroku závisí na projekcích provedených v kroku a na projekcích čtených tabulek
+        puvod = {nazev for nazev, val in self.projekce.items() if projekce.get(nazev) is not val}
+        for key in ctene:
+            puvod |= self.puvod.get(key, frozenset())
+        for key, val in self.tbl.items():
+            if tbl.get(key) is not val:
+                self.puvod[key] = frozenset(puvod)
+
+        zaznam = ZaznamKroku(
+            tbl={k: v for k, v in self.tbl.items() if tbl.get(k) is not v},
+            paths={k: v for k, v in self.paths.items() if paths.get(k) != v},
+            meta=meta,
+            atributy=dict(volebni_obdobi=self.volebni_obdobi, snemovna=self.snemovna),
+            nekonzistence=tuple(self.nekonzistence[nekonzistence:]),
+            projekce=tuple((nazev, self.projekce[nazev]) for nazev in sorted(puvod))
+        )
+        registr_tabulek.uloz(data_dir, volebni_obdobi, krok, zaznam)
+
+    def pouzitelna_projekce(self, zaznam):
+        """Zjistí, zda výsledek kroku z registru vynechává stejné sloupce, jaké by vynechal tento objekt."""
+        return all(self.vynechane_sloupce(volitelne) == list(vynechane) for _, (volitelne, vynechane) in zaznam.projekce)
+
+    def volitelne_sloupce_tabulky(self, tabulka):
+        """Vrátí sloupce tabulky, které se nepoužívají při sestavení tabulek a lze je vynechat.
+
+        Jde o sloupce uvedené v atributu 'volitelne_sloupce' (slovník tabulka -> sloupce) tříd 'Tabulka*Mixin'.
+        """
+        volitelne = []
+        for cls in type(self).__mro__:
+            if cls.__name__.startswith('Tabulka'):
+                volitelne += cls.__dict__.get('volitelne_sloupce', {}).get(tabulka, [])
+        return list(dict.fromkeys(volitelne))
+
+    def vynechane_sloupce(self, volitelne):
+        """Vrátí ty z volitelných sloupců, které nejsou požadované (viz parametr 'sloupce', resp. 'nepotrebne_sloupce')."""
+        if self.parameters.get('sloupce') is not None:
+            return [col for col in volitelne if col not in self.parameters['sloupce']]
+        return [col for col in volitelne if col in self.nepotrebne_sloupce]
+
+    def vyber_sloupce(self, nazev, sloupce, volitelne):
+        """Vrátí ze 'sloupce' ty, které se mají načíst, resp. připojit, tj. bez nepožadovaných volitelných sloupců.
+
+        Vynechané sloupce se zaznamenají pod jménem 'nazev' do self.projekce, podle nich se
+        pozná, zda lze výsledek kroku ze sdíleného registru použít i pro jiný objekt.
+        """
+        volitelne = [col for col in volitelne if col in sloupce]
+        vynechane = self.vynechane_sloupce(volitelne)
+        self.projekce[nazev] = (tuple(volitelne), tuple(vynechane))
+        return [col for col in sloupce if col not in vynechane]
+
+    def cache_tabulek(self):
+        if self.parameters.get('cache', False) == False:
+            return None
+        return CacheTabulek(f"{self.parameters['data_dir']}/cache")
+
+    def nacti_unl(self, paths, header, tabulka, encoding='cp1250', strip=False):
+        """Načte tabulku z jednoho či více .unl souborů, přetypuje ji dle hlavičky a rozšíří meta informace, viz nacti_tabulku."""
+        if isinstance(paths, str):
+            paths = [paths]
+        return self.nacti_tabulku(SpecifikaceUnl(paths, header, tabulka, encoding, strip))
+
+    def nacti_tabulku(self, spec):
+        """Načte tabulku dle specifikace 'spec', přetypuje ji dle hlavičky a rozšíří meta informace.
+
+        Vrací dvojici (přetypovaná tabulka, surová tabulka). Přetypovaná tabulka se ukládá do cache,
+        při opětovném načtení nezměněných souborů se parsování přeskočí. V takovém případě je
+        i surová tabulka již přetypovaná a sdílí data s přetypovanou tabulkou (jde o mělkou kopii, přidání či odebrání
+        sloupců se v ní neprojeví, změna hodnot na místě ano). Pokud byla tabulka načtena předem (viz predcti_tabulky),
+        vrátí se výsledek souběžného načtení. Nepožadované volitelné sloupce tabulky (viz volitelne_sloupce_tabulky)
+        se z .unl souborů vůbec nečtou.
+        """
+        spec, volitelne, vynechane = self.projekce_specifikace(spec)
+        self.projekce[spec.tabulka] = (tuple(volitelne), tuple(vynechane))
+        header = spec.header if spec.sloupce is None else {col: spec.header[col] for col in spec.sloupce}
+        self.rozsir_meta(header, tabulka=spec.tabulka, vlastni=False)
+        return self.planovac.vysledek(spec, self.precti_unl)
+
+    def projekce_specifikace(self, spec):
+        """Doplní do specifikace 'spec' načítané sloupce (bez nepožadovaných volitelných sloupců).
+
+        Vrací trojici (specifikace, volitelné sloupce, vynechané sloupce).
+        """
+        volitelne = [col for col in self.volitelne_sloupce_tabulky(spec.tabulka) if col in spec.header]
+        vynechane = self.vynechane_sloupce(volitelne)
+        sloupce = None if len(vynechane) == 0 else tuple(col for col in spec.header if col not in vynechane)
+        return spec._replace(sloupce=sloupce), volitelne, vynechane
+
+    def precti_unl(self, spec):
+        """Načte a přetypuje tabulku dle specifikace 'spec' (bez zápisu do objektu, lze volat z více vláken)."""
+        cache = self.cache_tabulek()
+        if cache is not None:
+            nazev = '+'.join([path.splitext(path.basename(p))[0] for p in spec.paths])
+            hlavicka = CacheTabulek.popis_hlavicky(spec.header, encoding=spec.encoding, strip=spec.strip)
+            if spec.sloupce is not None:
+                # Projekce se ukládá jako samostatný záznam, aby se s úplnou tabulkou navzájem nepřepisovaly
+                nazev = f"{nazev}-{CacheTabulek.podpis_sloupcu(spec.sloupce)}"
+                hlavicka['parametry']['sloupce'] = list(spec.sloupce)
+            _df = cache.nacti(nazev, spec.paths, hlavicka)
+            if _df is not None:
+                # Tabulka z cache je nový objekt, hlubokou kopii nepotřebujeme
+                return _df.copy(deep=False), _df
+
+        usecols = None if spec.sloupce is None else list(spec.sloupce)
+        frames = [pd.read_csv(p, sep="|", names=spec.header.keys(), usecols=usecols, index_col=False, encoding=spec.encoding) for p in spec.paths]
+        _df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        df = pretypuj(_df, spec.header, name=spec.tabulka)
+        if spec.strip:
+            df = strip_all_string_columns(df)
+
+        if cache is not None:
+            cache.uloz(nazev, spec.paths, hlavicka, df)
+
+        return df, _df
+
+    def specifikace_tabulek(self):
+        """Vrátí specifikace (SpecifikaceUnl) tabulek, které lze načíst předem.
+
+        Specifikace vrací metody 'specifikace_*' tříd 'Tabulka*Mixin', tytéž metody používají i načítací metody 'nacti_*'.
+        Metody 'specifikace_*' nemají vedlejší účinky, jen sestaví cesty k souborům a hlavičku tabulky.
+        """
+        metody = []
+        for cls in type(self).__mro__:
+            if cls.__name__.startswith('Tabulka'):
+                metody += [m for m in cls.__dict__ if m.startswith('specifikace_') and callable(cls.__dict__[m])]
+        return [self.projekce_specifikace(getattr(self, m)())[0] for m in dict.fromkeys(metody)]
+
+    def predcti_tabulky(self):
+        """Naplánuje souběžné načtení všech tabulek, jejichž soubory existují a které ještě nejsou načtené.
+
+        Vynechají se tabulky, které konstruktor nebude číst: uvedené v 'nepredcitat'
+        a převzaté ze sdíleného registru (v použitelné projekci, viz pouzitelna_projekce).
+        """
+        if self.planovac.soubezne_max == 1:
+            return
+        vynechat = set(self.parameters['nepredcitat'])
+        if self.parameters.get('registr', False):
+            vynechat |= registr_tabulek.tabulky(self.parameters['data_dir'], self.volebni_obdobi, pouzitelny=self.pouzitelna_projekce)
+        for spec in self.specifikace_tabulek():
+            if (spec.tabulka in self.tbl) or (spec.tabulka in vynechat) or (len(spec.paths) == 0) or not all(path.isfile(p) for p in spec.paths):
+                continue
+            self.planovac.naplanuj(spec, self.precti_unl)
+
+    def casy_nacitani(self):
+        """Vrátí tabulku s dobami načítání jednotlivých tabulek, viz PlanovacNacitani.casy."""
+        return self.planovac.casy()
 
     def rozsir_meta(self, header, tabulka=None, vlastni=None):
         for key, i in header.items():
@@ -198,9 +507,11 @@ class SnemovnaDataFrame(MyDataFrame):
             self.meta.nastav_hodnotu(key, val_dict)
 
 class SnemovnaZipDataMixin(object):
+    # Adresa, ze které se stahují zazipované tabulky. V testech lze nahradit lokálním HTTP serverem.
+    url_prefix = "https://www.psp.cz/eknih/cdrom/opendata/"
+
     def stahni_zip_data(self, nazev):
-        url_prefix = "https://www.psp.cz/eknih/cdrom/opendata/"
-        url = url_prefix + nazev + '.zip'
+        url = self.url_prefix + nazev + '.zip'
         data_dir = self.parameters['data_dir']
 
         a = urlparse(url)
@@ -208,11 +519,9 @@ class SnemovnaZipDataMixin(object):
         zip_path = f"{data_dir}/{filename}"
         log.debug(f"SnemovnaZipDataMixin: Nastavuji cestu k zip souboru na: {zip_path}")
 
-        # smaz starý zip soubor, pokud existuje
-        if os.path.isfile(zip_path):
-            os.remove(zip_path)
-
-        download_and_unzip(url, zip_path, data_dir)
-
-
-
+        # Starý zip soubor se nemaže, slouží k podmíněnému stažení (viz download_and_unzip).
+        zmena = download_and_unzip(url, zip_path, data_dir)
+        if zmena:
+            # Tabulky sdílené v rámci procesu mohou být zastaralé
+            registr_tabulek.zneplatni(data_dir=data_dir)
+        return zmena
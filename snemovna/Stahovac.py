@@ -0,0 +1,141 @@
+# Asynchronní stahování mnoha malých souborů (stenozáznamů) z jednoho serveru
+# Jedno sdílené spojení (keep-alive) pro všechny požadavky, omezený počet souběžných požadavků,
+# opakování s exponenciálním čekáním, navazování přerušených stahování a omezení počtu požadavků za sekundu.
+
+import os
+import json
+import time
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+
+from snemovna.setup_logger import log
+
+# Popis stažení jednoho souboru. Při zadání 'etag' nebo 'last_modified' se stahuje podmíněně.
+Uloha = namedtuple('Uloha', ['url', 'path', 'etag', 'last_modified'], defaults=[None, None])
+
+
+class Stahovac(object):
+    """Asynchronní stahovač souborů.
+
+    Metoda stahni() stáhne seznam úloh (Uloha) a pro každou vrátí slovník
+    se statusem odpovědi (304 = beze změny), cestou k souboru a validátory (ETag, Last-Modified).
+    Nedokončená stahování se ukládají do '{path}.part' a při dalším pokusu se navazují (hlavička Range).
+    Pokud navázání nelze použít (status 416, nebo odpověď nezačíná na konci '.part'), stáhne se soubor znovu celý.
+    """
+
+    # Statusy, u kterých má smysl požadavek opakovat
+    opakovat_statusy = {429, 500, 502, 503, 504}
+
+    def __init__(self, soubezne_max=12, pokusy=3, cekani=1.0, pozadavku_za_s=None, timeout=60):
+        self.soubezne_max = soubezne_max
+        self.pokusy = pokusy
+        self.cekani = cekani
+        self.interval = 0 if pozadavku_za_s in (None, -1) else 1 / pozadavku_za_s
+        self.timeout = timeout
+
+    def stahni(self, ulohy):
+        """Stáhne úlohy 'ulohy' a vrátí seznam výsledků ve stejném pořadí."""
+        ulohy = [Uloha(*u) if not isinstance(u, Uloha) else u for u in ulohy]
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._stahni_vse(ulohy))
+        # Běžící smyčka (např. v Jupyter notebooku): stahujeme v samostatném vlákně s vlastní smyčkou
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self._stahni_vse(ulohy)).result()
+
+    async def _stahni_vse(self, ulohy):
+        self._semafor = asyncio.Semaphore(self.soubezne_max)
+        self._zamek = asyncio.Lock()
+        self._posledni_pozadavek = 0
+        connector = aiohttp.TCPConnector(limit=self.soubezne_max)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            return await asyncio.gather(*[self._stahni_s_opakovanim(session, u) for u in ulohy])
+
+    async def _zdrzeni(self):
+        # Ohleduplnost k serveru: mezi začátky požadavků je alespoň 'interval' sekund
+        async with self._zamek:
+            cekej = self._posledni_pozadavek + self.interval - time.monotonic()
+            if cekej > 0:
+                await asyncio.sleep(cekej)
+            self._posledni_pozadavek = time.monotonic()
+
+    async def _stahni_s_opakovanim(self, session, uloha):
+        for pokus in range(self.pokusy):
+            try:
+                async with self._semafor:
+                    await self._zdrzeni()
+                    ret = await self._stahni(session, uloha)
+                if (ret['status'] not in self.opakovat_statusy) or (pokus == self.pokusy - 1):
+                    return ret
+                log.debug(f"Stahovač: '{uloha.url}' vrátil status {ret['status']}, pokus {pokus + 1}/{self.pokusy}.")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if pokus == self.pokusy - 1:
+                    log.error(f"Stahovač: '{uloha.url}' se nepodařilo stáhnout: {e!r}")
+                    return dict(status=None, path=uloha.path, etag=None, last_modified=None)
+                log.debug(f"Stahovač: Chyba při stahování '{uloha.url}': {e!r}, pokus {pokus + 1}/{self.pokusy}.")
+            await asyncio.sleep(self.cekani * 2 ** pokus)
+
+    @staticmethod
+    def _zahod_part(part, part_meta):
+        for p in (part, part_meta):
+            if os.path.exists(p):
+                os.remove(p)
+
+    @staticmethod
+    def _zacatek_rozsahu(content_range):
+        """Vrátí počáteční bajt z hlavičky Content-Range ('bytes 600-999/1000'), případně None."""
+        try:
+            return int(content_range.split()[1].split('-')[0])
+        except (AttributeError, IndexError, ValueError):
+            return None
+
+    async def _stahni(self, session, uloha):
+        part, part_meta = f"{uloha.path}.part", f"{uloha.path}.part.json"
+        headers = {}
+        validator = None
+        navazat = os.path.exists(part) and os.path.exists(part_meta)
+        if navazat:
+            # Navázání přerušeného stahování, pokud se soubor na serveru mezitím nezměnil (If-Range)
+            with open(part_meta) as f:
+                validator = json.load(f).get('validator')
+            if validator:
+                headers['Range'] = f"bytes={os.path.getsize(part)}-"
+                headers['If-Range'] = validator
+        else:
+            if uloha.etag:
+                headers['If-None-Match'] = uloha.etag
+            if uloha.last_modified:
+                headers['If-Modified-Since'] = uloha.last_modified
+
+        async with session.get(uloha.url, headers=headers) as r:
+            ret = dict(status=r.status, path=uloha.path, etag=r.headers.get('ETag'), last_modified=r.headers.get('Last-Modified'))
+            znovu = navazat and (
+                (r.status == 416) # '.part' je již celý (stahování přerušené před přejmenováním)
+                or ((r.status == 206) and (self._zacatek_rozsahu(r.headers.get('Content-Range')) != os.path.getsize(part)))
+            )
+            if znovu:
+                log.debug(f"Stahovač: '{uloha.url}' nelze navázat (status {r.status}), stahuji znovu celý.")
+            elif r.status not in (200, 206):
+                return ret
+            else:
+                os.makedirs(os.path.dirname(uloha.path), exist_ok=True)
+                with open(part_meta, 'w') as f:
+                    json.dump(dict(validator=ret['etag'] or ret['last_modified'] or validator), f)
+                with open(part, 'ab' if r.status == 206 else 'wb') as f:
+                    async for chunk in r.content.iter_chunked(1 << 16):
+                        f.write(chunk)
+
+        if znovu:
+            # Bez '.part' se další požadavek posílá bez Range, k opakovanému navazování tedy nedojde
+            self._zahod_part(part, part_meta)
+            return await self._stahni(session, uloha)
+
+        os.replace(part, uloha.path)
+        os.remove(part_meta)
+        ret['status'] = 200
+        return ret
@@ -20,6 +20,7 @@ from snemovna.Snemovna import *
 from snemovna.PoslanciOsoby import *
 from snemovna.Stenozaznamy import *
 from snemovna.TabulkyStenotexty import *
+from snemovna.Vyhledavani import IndexStenotextu
 
 from snemovna.setup_logger import log
 
@@ -29,16 +30,35 @@ from snemovna.setup_logger import log
 
 class Stenotexty(TabulkaStenotextyMixin, StenoRecnici, Steno, ZarazeniOsoby, Organy, Osoby, SnemovnaDataFrame):
 
-    def __init__(self, stahni=True, limit=-1, soubezne_stahovani_max=12, soubezne_zpracovani_max=-1, *args, **kwargs):
+    nepotrebne_sloupce = ['zmena']
+
+    def __init__(self, stahni=True, limit=-1, soubezne_stahovani_max=12, soubezne_zpracovani_max=-1, *args, zpracovani='vlakna', html_parser='html5lib', stahovani_pozadavku_za_s=10, inkrementalne=False, obnovit_schuze=1, vyber_schuze=None, vyber_osoby=None, vyber_od=None, vyber_do=None, sloupce_textu=None, texty_na_vyzadani=False, indexuj=False, **kwargs):
         log.debug('--> StenoTexty')
 
         super().__init__(stahni=stahni, *args, **kwargs)
 
         self.parameters['limit'] = limit
         self.parameters['soubezne_stahovani_max'] = soubezne_stahovani_max
+        self.parameters['stahovani_pozadavku_za_s'] = stahovani_pozadavku_za_s # ohleduplnost k serveru psp.cz, None = bez omezení
         self.parameters['soubezne_zpracovani_max'] = soubezne_zpracovani_max
-
-        if stahni == True:
+        self.parameters['zpracovani'] = zpracovani # 'vlakna' nebo 'procesy'
+        self.parameters['html_parser'] = html_parser # 'html5lib' nebo 'lxml'
+        self.parameters['inkrementalne'] = inkrementalne # stahují a zpracovávají se jen nové nebo změněné stenozáznamy, viz aktualizuj_steno_texty
+        self.parameters['obnovit_schuze'] = obnovit_schuze
+        # Výběr načítaných promluv (schůze, osoby, rozsah data) a sloupců, viz UlozisteStenotextu.nacti
+        self.parameters['vyber_schuze'] = vyber_schuze
+        self.parameters['vyber_osoby'] = vyber_osoby
+        self.parameters['vyber_od'] = vyber_od
+        self.parameters['vyber_do'] = vyber_do
+        self.parameters['sloupce_textu'] = sloupce_textu
+        # Texty promluv se nenačítají, v tabulce zůstává jen klíč promluvy (schuze, turn, poradi), texty viz metoda texty()
+        self.parameters['texty_na_vyzadani'] = texty_na_vyzadani
+        self.parameters['indexuj'] = indexuj # udržuje fulltextový index promluv, viz aktualizuj_index
+
+        zmenene = None
+        if (stahni == True) and (inkrementalne == True):
+            zmenene = self.aktualizuj_steno_texty()
+        elif stahni == True:
             self.stahni_steno_texty()
 
         self.nacti_steno_texty()
@@ -48,24 +68,24 @@ class Stenotexty(TabulkaStenotextyMixin, StenoRecnici, Steno, ZarazeniOsoby, Org
         # Tento stenozáznam je nutné vyhledat a uložit jeho číslo ('id_turn_surrogate') a číslo řečníka ('id_rec_surrogate').
         # V joinu se 'steno_rec' se pak použije 'id_rec_surrogate' místo 'id_rec' a 'id_turn_surrogate' místo 'id_turn' pro získání informací o osobě etc.
         # Pozor: naopak informace o času proslovu jsou navázány na 'turn'.
-        self.tbl['steno_texty'].loc[self.tbl['steno_texty'].id_rec.isna(), 'turn_surrogate'] = np.nan
-        self.tbl['steno_texty'].loc[~self.tbl['steno_texty'].id_rec.isna(), 'turn_surrogate'] = self.tbl['steno_texty'].turn
-        self.tbl['steno_texty']['turn_surrogate'] = self.tbl['steno_texty'].groupby("schuze")['turn_surrogate'].ffill().astype('Int64')
-        self.tbl['steno_texty']['id_rec_surrogate'] = self.tbl['steno_texty']['id_rec']
+        # Oba sloupce se počítají už při ukládání (resp. načítání) textů, viz dopln_surrogaty.
         self.meta.nastav_hodnotu('turn_surrogate', dict(popis='Číslo stenozáznamu (turn), ve kterém byla nalezena identifikace řečníka.', tabulka='df', vlastni=True))
-
-        self.tbl['steno_texty']['id_rec_surrogate'] = self.tbl['steno_texty'].groupby("schuze")['id_rec_surrogate'].ffill().astype('Int64')
         self.meta.nastav_hodnotu('id_rec_surrogate', dict(popis='Identifikace řečníka na základě zpětmého hledání v stenozáznamech (turn).', tabulka='df', vlastni=True))
 
         # připoj osobu ze steno_rec ... we simply add id_osoba to places where it's missing
         m = pd.merge(left=self.tbl['steno_texty'], right=self.tbl['steno_recnici'][['schuze', "turn", "aname", 'id_osoba']], left_on=["schuze", "turn_surrogate", "id_rec_surrogate"], right_on=["schuze", "turn", "aname"], how="left")
         ids = m[m.id_osoba_x.eq(m.id_osoba_y)].index
         ne_ids = set(m.index)-set(ids)
-        assert m[m.index.isin(ne_ids) & (~m.id_osoba_x.isna())].size / m[m.index.isin(ne_ids)].size < 0.1 # This is a consistency sanity check
+        nesouhlasi = m[m.index.isin(ne_ids)]
+        assert (len(nesouhlasi) == 0) or (nesouhlasi[~nesouhlasi.id_osoba_x.isna()].size / nesouhlasi.size < 0.1) # This is a consistency sanity check
         m['id_osoba'] = m['id_osoba_y']
         m['turn'] = m['turn_x']
         self.tbl['steno_texty'] = m.drop(labels=['id_osoba_x', 'id_osoba_y', 'turn_y', 'turn_x', 'aname'], axis=1)
 
+        # Při výběru osob se načítají i promluvy bez identifikace řečníka, vybíráme až podle doplněné osoby
+        if vyber_osoby is not None:
+            self.tbl['steno_texty'] = self.tbl['steno_texty'][self.tbl['steno_texty'].id_osoba.isin(vyber_osoby)].reset_index(drop=True)
+
         # Merge steno_recnici
         suffix = "__steno_recnici"
         self.tbl['steno_texty'] = pd.merge(left=self.tbl['steno_texty'], right=self.tbl['steno_recnici'], left_on=["schuze", "turn_surrogate", "id_rec_surrogate"], right_on=['schuze', 'turn', 'aname'], suffixes = ("", suffix), how='left')
@@ -96,16 +116,66 @@ class Stenotexty(TabulkaStenotextyMixin, StenoRecnici, Steno, ZarazeniOsoby, Org
         prebehlici = s[s > 1]
         #print("prebehlici: ", prebehlici)
 
-        for id_prebehlik in prebehlici.index:
-            for idx, row in zarazeni_osoby[ snemovna_cond & (zarazeni_osoby.id_osoba == id_prebehlik)].iterrows():
-                od, do, id_organ, zkratka =  row['od_o'], row['do_o'], row['id_organ'], row['zkratka']
-                #print(id_prebehlik, od, do, id_organ, zkratka)
-                self.tbl['steno_texty'].zkratka.mask((self.tbl['steno_texty'].date >= od) & (self.tbl['steno_texty'].date <= do) & (self.tbl['steno_texty'].id_osoba == id_prebehlik), zkratka, inplace=True)
+        # Přeběhlíkům přiřadíme klub platný v den projevu
+        st = self.tbl['steno_texty']
+        kluby = interval_join(
+            st, zarazeni_osoby[snemovna_cond & zarazeni_osoby.id_osoba.isin(prebehlici.index)],
+            on='date', by='id_osoba', start='od_o', end='do_o', columns=['zkratka'], indicator='nalezeno'
+        )
+        st.zkratka.mask(kluby.nalezeno.values, kluby.zkratka.values, inplace=True)
 
-        to_drop = ['zmena']
-        self.tbl['steno_texty'].drop(labels=to_drop, inplace=True, axis=1)
+        self.tbl['steno_texty'].drop(labels=self.nepotrebne_sloupce, inplace=True, axis=1, errors='ignore')
 
         self.nastav_dataframe(self.tbl['steno_texty'])
 
+        self.index_textu = None
+        if indexuj == True:
+            self.aktualizuj_index(stahni, zmenene)
+
         log.debug('<-- StenoTexty')
 
+    def aktualizuj_index(self, stahni, zmenene=None):
+        """Načte, případně vytvoří či aktualizuje fulltextový index promluv (IndexStenotextu) uložený u textů.
+
+        Po inkrementálním stažení se v indexu nahradí jen změněné stenozáznamy 'zmenene',
+        po úplném stažení (nebo pokud index chybí) se vytvoří znovu.
+        """
+        adresar = self.adresar_steno_textu()
+        index = IndexStenotextu.nacti(adresar)
+        if (index is not None) and ((stahni == False) or (zmenene is not None and len(zmenene) == 0)):
+            self.index_textu = index
+            return
+
+        # Index musí pokrývat všechny promluvy, z výběru jej proto nevytváříme
+        vyber = [k for k in ['vyber_schuze', 'vyber_osoby', 'vyber_od', 'vyber_do'] if self.parameters.get(k) is not None]
+        if (len(vyber) > 0) or (('text' not in self.columns) and (self.parameters.get('texty_na_vyzadani') != True)):
+            log.warning(f"Fulltextový index lze vytvořit jen z úplných textů (výběr: {vyber}), ponechávám původní.")
+            self.index_textu = index
+            return
+
+        df = pd.DataFrame({k: self[k] for k in ['schuze', 'turn', 'poradi', 'id_osoba', 'date']})
+        df['text'] = self['text'] if 'text' in self.columns else self.texty(['text']).text
+        if (index is None) or (zmenene is None):
+            index = IndexStenotextu.z_tabulky(df)
+        else:
+            index.aktualizuj(df, zmenene)
+        index.uloz(adresar)
+        self.index_textu = index
+
+    def texty(self, sloupce=None, radky=None):
+        """Vrátí texty promluv (sloupce 'text', 'text_s_poznamkami', nebo jen vybrané 'sloupce').
+
+        Texty se načítají z úložiště až při volání, a to jen pro řádky 'radky' (index tabulky, None = všechny).
+        Hodí se zejména s parametrem texty_na_vyzadani=True, kdy tabulka texty neobsahuje, např.:
+            st = Stenotexty(texty_na_vyzadani=True)
+            st.texty(['text'], radky=st[st.id_osoba == 5000].index)
+        """
+        klice = self[['schuze', 'turn', 'poradi']] if radky is None else self.loc[radky, ['schuze', 'turn', 'poradi']]
+        return self.nacti_texty(klice, sloupce)
+
+    def hledej(self, dotaz, vse=True):
+        """Vrátí promluvy (schuze, turn, poradi, id_osoba, date) odpovídající dotazu, viz IndexStenotextu.hledej."""
+        if self.index_textu is None:
+            self.index_textu = IndexStenotextu.nacti(self.adresar_steno_textu())
+        return self.index_textu.hledej(dotaz, vse=vse)
+
@@ -25,13 +25,16 @@ class Steno(TabulkaStenoMixin, StenoBase):
 
         super().__init__(*args, **kwargs)
 
+        self.sdilej('Steno', self.sestav_steno)
+
+        self.nastav_dataframe(self.tbl['steno'])
+
+    def sestav_steno(self):
         self.nacti_steno()
 
         if self.volebni_obdobi != -1:
             self.tbl['steno'] = self.tbl['steno'][self.tbl['steno'].id_organ == self.snemovna.id_organ]
 
-        self.nastav_dataframe(self.tbl['steno'])
-
 
 # Tabulka steno_bod
 # Obsahuje záznamy o začátku či pokračování projednávání bodu schůze. Nelze úplně předpokládat, že text stenozáznamu mezi dvěma po sobě následujícími začátky projednávání bodů pořadu schůze budou obsahovat pouze jednání o prvním bodu, tj. projednávání bodu může skončit a poté může následovat procedurální jednání či vystoupení mimo body pořadu schůze.
@@ -42,6 +45,13 @@ class StenoBod(TabulkaStenoBodMixin, Steno):
 
         super().__init__(*args, **kwargs)
 
+        self.sdilej('StenoBod', self.sestav_steno_bod)
+
+        self.nastav_dataframe(self.tbl['steno_bod'])
+
+        log.debug('<-- StenoBod')
+
+    def sestav_steno_bod(self):
         self.nacti_steno_bod()
 
         # Merge steno
@@ -52,10 +62,6 @@ class StenoBod(TabulkaStenoBodMixin, Steno):
         if self.volebni_obdobi != -1:
             self.tbl['steno_bod'] = self.tbl['steno_bod'][self.tbl['steno_bod'].id_organ == self.snemovna.id_organ]
 
-        self.nastav_dataframe(self.tbl['steno_bod'])
-
-        log.debug('<-- StenoBod')
-
 
 # Tabulka rec
 # Obsahuje záznamy o vystoupení řečníka.
@@ -72,6 +78,13 @@ class StenoRecnici(TabulkaStenoRecniciMixin, Steno, Osoby):
 
         super(StenoRecnici, self).__init__(*args, **kwargs)
 
+        self.sdilej('StenoRecnici', self.sestav_steno_recniky)
+
+        self.nastav_dataframe(self.tbl['steno_recnici'])
+
+        log.debug('<-- StenoRecnici')
+
+    def sestav_steno_recniky(self):
         self.nacti_steno_recniky()
 
         # Merge steno
@@ -91,8 +104,3 @@ class StenoRecnici(TabulkaStenoRecniciMixin, Steno, Osoby):
         #suffix = "__bod_schuze"
         #self.steno_rec = pd.merge(left=self.steno_rec, right=self.bod_schuze, on='id_bod', suffixes = ("", suffix), how='left')
         #self.steno_rec = self.drop_by_inconsistency(self.steno_rec, suffix, 0.1, 'steno_rec', 'bod_schuze')
-
-        self.nastav_dataframe(self.tbl['steno_recnici'])
-
-        log.debug('<-- StenoRecnici')
-
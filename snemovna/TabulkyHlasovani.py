@@ -2,6 +2,7 @@
   # Cesty k tabulkám, viz. https://www.psp.cz/sqw/hp.sqw?k=1302
 
 from glob import glob
+from collections import namedtuple
 import pytz
 
 import pandas as pd
@@ -15,10 +16,9 @@ from snemovna.setup_logger import log
 
 
 class TabulkaHlasovaniMixin(object):
-    def nacti_hlasovani(self):
+    def specifikace_hlasovani(self):
         # Souhrnné informace o hlasování
         path = f"{self.parameters['data_dir']}/hl{self.volebni_obdobi}s.unl"
-        self.paths['hlasovani'] = path
         header = {
             'id_hlasovani': MItem('Int64', 'Identifikátor hlasování'),
             'id_organ': MItem('Int64', 'Identifikátor orgánu, viz Organy:id_organ'),
@@ -40,12 +40,13 @@ class TabulkaHlasovaniMixin(object):
         }
 
         # Doporučené kódování 'cp1250' nefunguje, detekované 'ISO-8859-1' také nefunguje, 'ISO-8859-2' funguje.
-        _df = pd.read_csv(path, sep="|", names = header.keys(),  index_col=False, encoding='ISO-8859-2')
-        df = pretypuj(_df, header, name='hlasovani')
-        self.rozsir_meta(header, tabulka='hlasovani', vlastni=False)
+        # Whitespace z řetězců se odstraňuje už při načítání (strip=True).
+        return SpecifikaceUnl([path], header, 'hlasovani', encoding='ISO-8859-2', strip=True)
 
-        # Odstraň whitespace z řetězců
-        df = strip_all_string_columns(df)
+    def nacti_hlasovani(self):
+        spec = self.specifikace_hlasovani()
+        self.paths['hlasovani'] = spec.paths[0]
+        df, _df = self.nacti_tabulku(spec)
 
         # Přidej 'datum'
         df['datum'] = pd.to_datetime(df['datum__ORIG'] + ' ' + df['cas'], format='%d.%m.%Y %H:%M')
@@ -73,24 +74,24 @@ class TabulkaHlasovaniMixin(object):
         self.tbl['hlasovani'], self.tbl['_hlasovani'] = df, _df
 
 class TabulkaZmatecneHlasovaniMixin(object):
-    def nacti_zmatecne_hlasovani(self):
+    def specifikace_zmatecne(self):
         # Hlasování, která byla prohlášena za zmatečné, tj. na jejich výsledek nebyl brán zřetel
         path = f"{self.parameters['data_dir']}/zmatecne.unl"
-        self.paths['zmatecne_hlasovani'] = path
         header = {
             "id_hlasovani": MItem("Int64", 'Identifikátor hlasování.')
         }
+        return SpecifikaceUnl([path], header, 'zmatecne')
 
-        _df = pd.read_csv(path, sep="|", names = header.keys(),  index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, name='zmatecne')
-        self.rozsir_meta(header, tabulka='zmatecne', vlastni=False)
+    def nacti_zmatecne_hlasovani(self):
+        spec = self.specifikace_zmatecne()
+        self.paths['zmatecne_hlasovani'] = spec.paths[0]
+        df, _df = self.nacti_tabulku(spec)
         self.tbl['zmatecne'], self.tbl['_zmatecne'] = df, _df
 
 class TabulkaZpochybneniHlasovaniMixin(object):
     # Načti tabulku zpochybneni hlasovani (hl_check)
-    def nacti_zpochybneni_hlasovani(self):
+    def specifikace_zpochybneni(self):
         path = f"{self.parameters['data_dir']}/hl{self.volebni_obdobi}z.unl"
-        self.paths['zpochybneni_hlasovani'] = path
         header = {
             "id_hlasovani": MItem('Int64', 'Identifikátor hlasování, viz Hlasovani:id_hlasovani.'),
             "turn": MItem('Int64', 'Číslo stenozáznamu, ve kterém je první zmínka o zpochybnění hlasování.'),
@@ -98,10 +99,12 @@ class TabulkaZpochybneniHlasovaniMixin(object):
             "id_h2": MItem('Int64', 'Identifikátor hlasování o žádosti o opakování hlasování, viz hl_hlasovani:id_hlasovani. Zaznamenává se poslední takové, které nebylo zpochybněno.'),
             "id_h3": MItem('Int64', 'Identifikátor opakovaného hlasování, viz hl_hlasovani:id_hlasovani a hl_check:id_hlasovani. Zaznamenává se poslední takové, které nebylo zpochybněno.')
         }
+        return SpecifikaceUnl([path], header, 'zpochybneni')
 
-        _df = pd.read_csv(path, sep="|", names = header.keys(),  index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, name='zpochybneni')
-        self.rozsir_meta(header, tabulka='zpochybneni', vlastni=False)
+    def nacti_zpochybneni_hlasovani(self):
+        spec = self.specifikace_zpochybneni()
+        self.paths['zpochybneni_hlasovani'] = spec.paths[0]
+        df, _df = self.nacti_tabulku(spec)
 
         # 0 - žádost o opakování hlasování - v tomto případě se o této žádosti neprodleně hlasuje a teprve je-li tato žádost přijata, je hlasování opakováno;
         # 1 - pouze sdělení pro stenozáznam, není požadováno opakování hlasování.
@@ -132,19 +135,20 @@ class TabulkaZpochybneniHlasovaniMixin(object):
         self.tbl['zpochybneni'], self.tbl['_zpochybneni'] = df, _df
 
 class TabulkaHlasovaniVazbaStenozaznamMixin(object):
-    def nacti_hlasovani_vazba_stenozaznam(self):
-        ''' Načte tabulku vazeb hlasovani na stenozaznam.'''
+    def specifikace_vazba_stenozaznam(self):
+        ''' Tabulka vazeb hlasovani na stenozaznam.'''
         path = f"{self.parameters['data_dir']}/hl{self.volebni_obdobi}v.unl"
-        self.paths['hlasovani_vazba_stenozaznam'] = path
         header = {
             "id_hlasovani": MItem('Int64', 'Identifikátor hlasování, viz hl_hlasovani:id_hlasovani'),
             "turn": MItem('Int64', 'Číslo stenozáznamu'),
             "typ__ORIG": MItem('Int64', 'Typ vazby: 0 - hlasování je v textu explicitně zmíněno a lze tedy vytvořit odkaz přímo na začátek hlasování, 1 - hlasování není v textu explicitně zmíněno, odkaz lze vytvořit pouze na stenozáznam jako celek.')
         }
-        _df = pd.read_csv(path, sep="|", names = header.keys(),  index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, name='vazba_stenozaznam')
+        return SpecifikaceUnl([path], header, 'vazba_stenozaznam')
 
-        self.rozsir_meta(header, tabulka='vazba_stenozaznam', vlastni=False)
+    def nacti_hlasovani_vazba_stenozaznam(self):
+        spec = self.specifikace_vazba_stenozaznam()
+        self.paths['hlasovani_vazba_stenozaznam'] = spec.paths[0]
+        df, _df = self.nacti_tabulku(spec)
 
         # Interpretuj 'typ'
         df["typ"] = mask_by_values(df.typ__ORIG, {0: "hlasovani zmíněno v stenozáznamu", 1: "hlasování není zmíněno v stenozáznamu"}).astype('string')
@@ -154,30 +158,30 @@ class TabulkaHlasovaniVazbaStenozaznamMixin(object):
 
 
 class TabulkaZpochybneniPoslancemMixin(object):
-    def nacti_zpochybneni_poslancem(self):
+    def specifikace_zpochybneni_poslancem(self):
         # Poslanci, kteří oznámili zpochybnění hlasování
         path = f"{self.parameters['data_dir']}/hl{self.volebni_obdobi}x.unl"
-        self.paths['zpochybneni_poslancem'] = path
         header = {
             "id_hlasovani": MItem('Int64', 'Identifikátor hlasování, viz Hlasovani:id_hlasovani a ZpochybneniPoslancem:id_hlasovani, které bylo zpochybněno.'),
             "id_osoba": MItem('Int64', 'Identifikátor poslance, který zpochybnil hlasování; viz Osoby:id_osoba.'),
             "mode": MItem('Int64', 'Typ zpochybnění, viz ZpochybneniHlasovani:mode.')
         }
+        return SpecifikaceUnl([path], header, 'zpochybneni_poslancem')
 
-        _df = pd.read_csv(path, sep="|", names = header.keys(),  index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header)
-        self.rozsir_meta(header, tabulka='zpochybneni_poslancem', vlastni=False)
+    def nacti_zpochybneni_poslancem(self):
+        spec = self.specifikace_zpochybneni_poslancem()
+        self.paths['zpochybneni_poslancem'] = spec.paths[0]
+        df, _df = self.nacti_tabulku(spec)
         self.tbl['zpochybneni_poslancem'], self.tbl['_zpochybneni_poslancem'] = df, _df
 
 
 class TabulkaOmluvyMixin(object):
-    def nacti_omluvy(self):
+    def specifikace_omluvy(self):
         # Tabulka zaznamenává časové ohraničení omluv poslanců z jednání Poslanecké sněmovny.
         # Omluvy poslanců sděluje předsedající na začátku nebo v průběhu jednacího dne.
         # Data z tabulky se použijí pouze k nahrazení výsledku typu '@', tj. pokud výsledek hlasování jednotlivého poslance je nepřihlášen, pak pokud zároveň čas hlasování spadá do časového intervalu omluvy, pak se za výsledek považuje 'M', tj. omluven.
         #Pokud je poslanec omluven a zároveň je přihlášen, pak výsledek jeho hlasování má přednost před omluvou.
         path = f"{self.parameters['data_dir']}/omluvy.unl"
-        self.paths['omluvy'] = path
         header = {
             "id_organ": MItem('Int64', 'Identifikátor volebního období, viz Organy:id_organ'),
             "id_poslanec": MItem('Int64', 'Identifikátor poslance, viz Poslanci:id_poslanec'), # Pozor: v tabulce jsou i omluvy z období, kdy už osoba není poslancem
@@ -185,11 +189,13 @@ class TabulkaOmluvyMixin(object):
             "od__ORIG": MItem('string', 'Čas začátku omluvy, pokud je null, pak i omluvy:do je null a jedná se o omluvu na celý jednací den.'),
             "do__ORIG": MItem('string', 'Čas konce omluvy, pokud je null, pak i omluvy:od je null a jedná se o omluvu na celý jednací den.')
         }
+        return SpecifikaceUnl([path], header, 'omluvy')
 
-        _df = pd.read_csv(path, sep="|", names = header,  index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, 'omluvy')
+    def nacti_omluvy(self):
+        spec = self.specifikace_omluvy()
+        self.paths['omluvy'] = spec.paths[0]
+        df, _df = self.nacti_tabulku(spec)
         df.drop_duplicates(keep='first', inplace=True)
-        self.rozsir_meta(header, tabulka='omluvy', vlastni=False)
 
         df['od'] = format_to_datetime_and_report_skips(df, 'od__ORIG', to_format='%H:%M').dt.tz_localize(self.tzn).dt.time
         self.meta.nastav_hodnotu('od', dict(popis='Čas začátku omluvy.', tabulka='omluvy', vlastni=True))
@@ -207,29 +213,150 @@ class TabulkaOmluvyMixin(object):
 
 
 
+# Matice hlasování poslanců, viz TabulkaHlasovaniPoslanciMixin.matice
+MaticeHlasovani = namedtuple('MaticeHlasovani', ['hodnoty', 'id_poslanec', 'id_hlasovani', 'vysledky'])
+
 class TabulkaHlasovaniPoslanciMixin(object):
-    def nacti_hlasovani_poslanci(self):
+    # Převod kódů hlasování jednotlivých poslanců ('vysledek__ORIG') na popisy ('vysledek')
+    vysledky_hlasovani = {'A': 'ano', 'B': 'ne', 'N': 'ne', 'C': 'zdržení se', 'F': 'nehlasování', '@': 'nepřihlášení', 'M': 'omluva', 'W': 'hlasování bez slibu', 'K': 'zdržení/nehlasování'}
+
+    def specifikace_hlasovani_poslance(self):
         # V souborech uložena jako hlXXXXhN.unl, kde XXXX je reference volebního období a N je číslo části. V 6. a 7. volebním období obsahuje část č. 1 hlasování 1. až 50. schůze, část č. 2 hlasování od 51. schůze.
-        paths = glob(f"{self.parameters['data_dir']}/hl{self.volebni_obdobi}h*.unl")
-        self.paths['hlasovani_poslanci'] = paths
-        header = {
+        # Hlasovani poslance může být ve více souborech
+        paths = sorted(glob(f"{self.parameters['data_dir']}/hl{self.volebni_obdobi}h*.unl"))
+        return SpecifikaceUnl(paths, self.hlavicka_hlasovani_poslanci(), 'hlasovani_poslance')
+
+    def nacti_hlasovani_poslanci(self, kompaktni=False, davka=None, id_poslanec=None, id_hlasovani=None):
+        """Načte hlasování jednotlivých poslanců.
+
+        Při zadání 'davka' se soubory čtou po dávkách o daném počtu řádků (viz cti_hlasovani_poslanci),
+        přetypování, převod výsledků a filtry 'id_poslanec' a 'id_hlasovani' se aplikují na každou dávku zvlášť.
+        V tomto režimu se nepoužívá cache a surová tabulka se nepamatuje.
+        """
+        spec = self.specifikace_hlasovani_poslance()
+        self.paths['hlasovani_poslanci'] = spec.paths
+
+        if davka is None:
+            df, _df = self.nacti_tabulku(spec)
+            df = self.vyber_hlasovani_poslanci(df, id_poslanec, id_hlasovani)
+            df = self.dekoduj_hlasovani_poslanci(df, kompaktni)
+        else:
+            self.rozsir_meta(spec.header, tabulka='hlasovani_poslance', vlastni=False)
+            df = concat_chunks(self.cti_hlasovani_poslanci(davka, kompaktni, id_poslanec, id_hlasovani))
+            if kompaktni:
+                # Kategorie jednotlivých dávek se mohou lišit v neznámých kódech, sjednotíme je dle převodní tabulky
+                vysledky = self.tabulka_vysledku(df.vysledek__ORIG.cat.categories)
+                df['vysledek__ORIG'] = df.vysledek__ORIG.cat.set_categories(vysledky.vysledek__ORIG)
+                df['vysledek'] = df.vysledek.cat.set_categories(vysledky.vysledek.unique())
+                for col in ['id_poslanec', 'id_hlasovani']:
+                    df[col] = downcast_integers(df[col])
+            _df = None
+        self.meta.nastav_hodnotu('vysledek', dict(popis='Hlasování jednotlivého poslance.', tabulka='hlasovani_poslance', vlastni=True))
+
+        if kompaktni:
+            self.tbl['vysledky_hlasovani'] = self.tabulka_vysledku(df.vysledek__ORIG.cat.categories)
+        if kompaktni or (_df is None):
+            # Surovou tabulku si nepamatujeme, je nejnáročnější na paměť.
+            self.tbl['hlasovani_poslance'] = df
+        else:
+            self.tbl['hlasovani_poslance'], self.tbl['_hlasovani_poslance'] = df, _df
+
+    def hlavicka_hlasovani_poslanci(self):
+        return {
             'id_poslanec': MItem('Int64', 'Identifikátor poslance, viz Poslanci:id_poslanec'),
             'id_hlasovani': MItem('Int64', 'Identifikátor hlasování, viz Hlasovani:id_hlasovani'),
             'vysledek__ORIG': MItem('string',"Hlasování jednotlivého poslance. 'A' - ano, 'B' nebo 'N' - ne, 'C' - zdržel se (stiskl tlačítko X), 'F' - nehlasoval (byl přihlášen, ale nestiskl žádné tlačítko), '@' - nepřihlášen, 'M' - omluven, 'W' - hlasování před složením slibu poslance, 'K' - zdržel se/nehlasoval. Viz úvodní vysvětlení zpracování výsledků hlasování.")
         }
 
-        # Hlasovani poslance může být ve více souborech
-        frames = []
-        for f in paths:
-          frames.append(pd.read_csv(f, sep="|", names = header,  index_col=False, encoding='cp1250'))
-
-        _df = pd.concat(frames, ignore_index=True)
-        df = pretypuj(_df, header, name='hlasovani_poslance')
-        self.rozsir_meta(header, tabulka='hlasovani_poslance', vlastni=False)
-
-        mask = {'A': 'ano', 'B': 'ne', 'N': 'ne', 'C': 'zdržení se', 'F': 'nehlasování', '@': 'nepřihlášení', 'M': 'omluva', 'W': 'hlasování bez slibu', 'K': 'zdržení/nehlasování'}
-        df['vysledek'] = mask_by_values(df.vysledek__ORIG, mask).astype('string')
-        self.meta.nastav_hodnotu('vysledek', dict(popis='Hlasování jednotlivého poslance.', tabulka='hlasovani_poslance', vlastni=True))
-
-        self.tbl['hlasovani_poslance'], self.tbl['_hlasovani_poslance'] = df, _df
-
+    def cti_hlasovani_poslanci(self, davka, kompaktni=False, id_poslanec=None, id_hlasovani=None):
+        """Generátor, který postupně čte soubory hlXXXXhN.unl po 'davka' řádcích.
+
+        Každou dávku přetypuje, vyfiltruje dle 'id_poslanec' a 'id_hlasovani' a převede výsledky hlasování.
+        Dávky lze spojit pomocí concat_chunks, případně průběžně agregovat.
+        """
+        spec = self.specifikace_hlasovani_poslance()
+        for path in spec.paths:
+            log.debug(f"Čtu '{path}' po dávkách o {davka} řádcích.")
+            for chunk in pd.read_csv(path, sep="|", names=spec.header.keys(), index_col=False, encoding=spec.encoding, chunksize=davka):
+                df = pretypuj(chunk, spec.header, inplace=True)
+                df = self.vyber_hlasovani_poslanci(df, id_poslanec, id_hlasovani)
+                yield self.dekoduj_hlasovani_poslanci(df, kompaktni)
+
+    def vyber_hlasovani_poslanci(self, df, id_poslanec=None, id_hlasovani=None):
+        if id_poslanec is not None:
+            df = df[df.id_poslanec.isin(id_poslanec)].copy()
+        if id_hlasovani is not None:
+            df = df[df.id_hlasovani.isin(id_hlasovani)].copy()
+        return df
+
+    def dekoduj_hlasovani_poslanci(self, df, kompaktni=False):
+        """Převede kódy výsledků hlasování ('vysledek__ORIG') na popisy ('vysledek')."""
+        mask = self.vysledky_hlasovani
+        if kompaktni:
+            # Výsledky ukládáme jako kategorie (int8 kódy), identifikátory v nejmenším možném celočíselném typu.
+            vysledky = self.tabulka_vysledku(df.vysledek__ORIG.dropna().unique())
+            kody = vysledky.vysledek__ORIG.to_list()
+            df['vysledek__ORIG'] = df.vysledek__ORIG.astype(pd.CategoricalDtype(kody))
+            popisy = list(dict.fromkeys([mask.get(k, k) for k in kody]))
+            prevod = np.array([popisy.index(mask.get(k, k)) for k in kody] + [-1], dtype='int8') # kód -1 (NA) zůstane NA
+            df['vysledek'] = pd.Categorical.from_codes(prevod[df.vysledek__ORIG.cat.codes], categories=popisy)
+            for col in ['id_poslanec', 'id_hlasovani']:
+                df[col] = downcast_integers(df[col])
+        else:
+            df['vysledek'] = mask_by_values(df.vysledek__ORIG, mask).astype('string')
+        return df
+
+    def tabulka_vysledku(self, hodnoty=[]):
+        """Vrátí převodní tabulku kódů výsledků hlasování (int8) na 'vysledek__ORIG' a 'vysledek'.
+
+        Kódy neznámých hodnot z 'hodnoty' se přidají na konec tabulky.
+        """
+        mask = self.vysledky_hlasovani
+        kody = list(mask.keys()) + sorted(set(hodnoty) - set(mask.keys()))
+        return pd.DataFrame({
+            'kod': np.arange(len(kody), dtype='int8'),
+            'vysledek__ORIG': kody,
+            'vysledek': [mask.get(k, k) for k in kody]
+        })
+
+    def matice(self, soubor=None):
+        """Sestaví matici hlasování poslanců (poslanec x hlasování) přímo ze souborů hlXXXXhN.unl.
+
+        Hodnoty matice jsou kódy výsledků (int8) dle tabulky 'vysledky', -1 značí chybějící záznam.
+        Pokud je zadán 'soubor', matice se vytvoří jako memory-mapped soubor ve formátu .npy
+        (lze znovu otevřít pomocí np.load(soubor, mmap_mode='r')).
+
+        Vrací MaticeHlasovani, kde 'id_poslanec' a 'id_hlasovani' jsou indexy řádků a sloupců matice.
+        Pokud soubory hlXXXXhN.unl chybí, vyvolá FileNotFoundError.
+        """
+        paths = self.specifikace_hlasovani_poslance().paths
+        if len(paths) == 0:
+            raise FileNotFoundError(f"Nenalezeny soubory hlasování poslanců '{self.parameters['data_dir']}/hl{self.volebni_obdobi}h*.unl'.")
+        frames = [
+            pd.read_csv(p, sep="|", names=['id_poslanec', 'id_hlasovani', 'vysledek__ORIG'], index_col=False, encoding='cp1250',
+                dtype={'id_poslanec': 'int32', 'id_hlasovani': 'int32', 'vysledek__ORIG': 'category'})
+            for p in paths
+        ]
+
+        id_poslanec = np.unique(np.concatenate([f.id_poslanec.values for f in frames]))
+        id_hlasovani = np.unique(np.concatenate([f.id_hlasovani.values for f in frames]))
+        vysledky = self.tabulka_vysledku(set().union(*[f.vysledek__ORIG.cat.categories for f in frames]))
+        kody = pd.Series(vysledky.kod.values, index=vysledky.vysledek__ORIG)
+
+        shape = (len(id_poslanec), len(id_hlasovani))
+        if soubor is None:
+            hodnoty = np.full(shape, -1, dtype='int8')
+        else:
+            hodnoty = np.lib.format.open_memmap(soubor, mode='w+', dtype='int8', shape=shape)
+            hodnoty[:] = -1
+
+        for f in frames:
+            prevod = np.append(kody.reindex(f.vysledek__ORIG.cat.categories).fillna(-1).values.astype('int8'), np.int8(-1))
+            radky = np.searchsorted(id_poslanec, f.id_poslanec.values)
+            sloupce = np.searchsorted(id_hlasovani, f.id_hlasovani.values)
+            hodnoty[radky, sloupce] = prevod[f.vysledek__ORIG.cat.codes.values]
+
+        if soubor is not None:
+            hodnoty.flush()
+
+        return MaticeHlasovani(hodnoty, pd.Index(id_poslanec, name='id_poslanec'), pd.Index(id_hlasovani, name='id_hlasovani'), vysledky)
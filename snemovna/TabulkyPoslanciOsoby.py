@@ -12,7 +12,7 @@ from snemovna.setup_logger import log
 
 
 class TabulkaTypOrganMixin(object):
-    def nacti_typ_organ(self):
+    def specifikace_typ_organ(self):
         path = f"{self.parameters['data_dir']}/typ_organu.unl"
         header = {
             'id_typ_organ': MItem('Int64', 'Identifikátor typu orgánu'),
@@ -22,14 +22,15 @@ class TabulkaTypOrganMixin(object):
             'typ_organ_obecny': MItem('Int64', 'Obecný typ orgánu, pokud je vyplněný, odpovídá záznamu v TypOrgan:id_typ_organ. Pomocí tohoto sloupce lze najít např. všechny výbory v různých typech zastupitelských sborů.'),
             'priorita': MItem('Int64', 'Priorita při výpisu')
         }
-        _df = pd.read_csv(path, sep="|", names = header.keys(), index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, name='typ_organ')
-        self.rozsir_meta(header, tabulka='typ_organ', vlastni=False)
+        return SpecifikaceUnl([path], header, 'typ_organ')
+
+    def nacti_typ_organ(self):
+        df, _df = self.nacti_tabulku(self.specifikace_typ_organ())
         self.tbl['typ_organ'], self.tbl['_typ_organ'] = df, _df
 
 
 class TabulkaOrganyMixin(object):
-    def nacti_organy(self):
+    def specifikace_organy(self):
         path = f"{self.parameters['data_dir']}/organy.unl"
         header = {
             "id_organ": MItem('Int64', 'Identifikátor orgánu'),
@@ -43,15 +44,16 @@ class TabulkaOrganyMixin(object):
             "priorita": MItem('Int64', 'Priorita výpisu orgánů'),
             "cl_organ_base": MItem('Int64', 'Pokud je nastaveno na 1, pak při výpisu členů se nezobrazují záznamy v tabulkce zarazeni kde cl_funkce == 0. Toto chování odpovídá tomu, že v některých orgánech nejsou členové a teprve z nich se volí funkcionáři, ale přímo se volí do určité funkce.')
         }
-        _df = pd.read_csv(path, sep="|", names = header.keys(), index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, name='organy')
-        self.rozsir_meta(header, tabulka='organy', vlastni=False)
+        return SpecifikaceUnl([path], header, 'organy')
+
+    def nacti_organy(self):
+        df, _df = self.nacti_tabulku(self.specifikace_organy())
         df['od_organ'] = format_to_datetime_and_report_skips(df, 'od_organ', '%d.%m.%Y').dt.tz_localize(self.tzn)
         df['do_organ'] = format_to_datetime_and_report_skips(df, 'do_organ', '%d.%m.%Y').dt.tz_localize(self.tzn)
         self.tbl['organy'], self.tbl['_organy'] = df, _df
 
 class TabulkaTypFunkceMixin(object):
-    def nacti_typ_funkce(self):
+    def specifikace_typ_funkce(self):
         path = f"{self.parameters['data_dir']}/typ_funkce.unl"
         header = {
             'id_typ_funkce': MItem('Int64', 'Identifikator typu funkce'),
@@ -62,10 +64,10 @@ class TabulkaTypFunkceMixin(object):
             'typ_funkce_obecny__ORIG': MItem('Int64', 'Obecný typ funkce, 1 - předseda, 2 - místopředseda, 3 - ověřovatel, jiné hodnoty se nepoužívají.')
 
         }
+        return SpecifikaceUnl([path], header, 'typ_funkce')
 
-        _df = pd.read_csv(path, sep="|", names = header.keys(), index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, name='typ_funkce')
-        self.rozsir_meta(header, tabulka='typ_funkce', vlastni=False)
+    def nacti_typ_funkce(self):
+        df, _df = self.nacti_tabulku(self.specifikace_typ_funkce())
 
         mask = {1: "předseda", 2: "místopředseda", 3: "ověřovatel"}
         df['typ_funkce_obecny'] = mask_by_values(df.typ_funkce_obecny__ORIG, mask).astype('string')
@@ -75,7 +77,7 @@ class TabulkaTypFunkceMixin(object):
 
 
 class TabulkaFunkceMixin(object):
-    def nacti_funkce(self):
+    def specifikace_funkce(self):
         path = f"{self.parameters['data_dir']}/funkce.unl"
         header = {
             "id_funkce": MItem('Int64', 'Identifikátor funkce, používá se v ZarazeniOsoby:id_fo'),
@@ -84,10 +86,10 @@ class TabulkaFunkceMixin(object):
             "nazev_funkce_cz": MItem('string', 'Název funkce, pouze pro interní použití'),
             "priorita": MItem('Int64', 'Priorita výpisu')
         }
+        return SpecifikaceUnl([path], header, 'funkce')
 
-        _df = pd.read_csv(path, sep="|", names = header.keys(), index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, name='funkce')
-        self.rozsir_meta(header, tabulka='funkce', vlastni=False)
+    def nacti_funkce(self):
+        df, _df = self.nacti_tabulku(self.specifikace_funkce())
 
         self.tbl['funkce'], self.tbl['_funkce'] = df, _df
 
@@ -98,7 +100,10 @@ class TabulkaFunkceMixin(object):
 
 
 class TabulkaOsobyMixin(object):
-    def nacti_osoby(self):
+    # Sloupce, které se při sestavování tabulek nepoužívají, viz SnemovnaDataFrame.volitelne_sloupce_tabulky
+    volitelne_sloupce = {'osoby': ['zmena', 'umrti']}
+
+    def specifikace_osoby(self):
         # Obsahuje jména osob, které jsou zařazeni v orgánech.
         # Vzhledem k tomu, že k jednoznačnému rozlišení osob často není dostatek informací, je možné, že ne všechny záznamy odkazují na jedinečné osoby, tj. některé osoby jsou v tabulce vícekrát.
         path = f"{self.parameters['data_dir']}/osoby.unl"
@@ -113,9 +118,10 @@ class TabulkaOsobyMixin(object):
             "zmena": MItem('string', 'Datum posledni změny'),
             "umrti": MItem('string', 'Datum úmrtí')
         }
-        _df = pd.read_csv(path, sep="|", names = header.keys(), index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, 'osoby')
-        self.rozsir_meta(header, tabulka='osoby', vlastni=False)
+        return SpecifikaceUnl([path], header, 'osoby')
+
+    def nacti_osoby(self):
+        df, _df = self.nacti_tabulku(self.specifikace_osoby())
 
         df["pohlavi"] = mask_by_values(df.pohlavi__ORIG, {'M': "muž", 'Z': 'žena', 'Ž': 'žena'}).astype('string')
         self.meta.nastav_hodnotu('pohlavi', dict(popis='Pohlaví.', tabulka='osoby', vlastni=True))
@@ -126,15 +132,17 @@ class TabulkaOsobyMixin(object):
         df['narozeni'] = df.narozeni.mask(df.narozeni.dt.strftime("%d.%m.%Y") == '01.01.1900', pd.NaT)
 
         # Parsuj úmrtí, meta informace není třeba přidávat, jsou v hlavičce
-        df['umrti'] = format_to_datetime_and_report_skips(df, 'umrti', to_format="%d.%m.%Y").dt.tz_localize(self.tzn)
-        df['umrti'] = df.umrti.mask(df.umrti.dt.strftime("%d.%m.%Y") == '01.01.1900', pd.NaT)
+        if 'umrti' in df.columns:
+            df['umrti'] = format_to_datetime_and_report_skips(df, 'umrti', to_format="%d.%m.%Y").dt.tz_localize(self.tzn)
+            df['umrti'] = df.umrti.mask(df.umrti.dt.strftime("%d.%m.%Y") == '01.01.1900', pd.NaT)
         # Parsuj datum poslední změny záznamu, meta informace není třeba přidávat, jsou v hlavičce
-        df['zmena'] = format_to_datetime_and_report_skips(df, 'zmena', to_format="%d.%m.%Y").dt.tz_localize(self.tzn)
+        if 'zmena' in df.columns:
+            df['zmena'] = format_to_datetime_and_report_skips(df, 'zmena', to_format="%d.%m.%Y").dt.tz_localize(self.tzn)
 
         self.tbl['osoby'], self.tbl['_osoby'] = df, _df
 
 class TabulkaOsobaExtraMixin(object):
-    def nacti_osoba_extra(self):
+    def specifikace_osoba_extra(self):
     # Tabulka obsahuje vazby na externí systémy. Je-li typ = 1, pak jde o vazbu na evidenci senátorů na senat.cz
         path = f"{self.parameters['data_dir']}/osoba_extra.unl"
         header = {
@@ -145,15 +153,15 @@ class TabulkaOsobaExtraMixin(object):
             'strana': MItem('string', 'Je-li typ = 1, pak jde o název volební strany/hnutí či označení nezávislého kandidáta'),
             'id_external': MItem('Int64', 'Je-li typ = 1, pak je to identifikátor senátora na senat.cz')
         }
+        return SpecifikaceUnl([path], header, 'osoba_extra')
 
-        _df = pd.read_csv(path, sep="|", names = header.keys(), index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, 'osoba_extra')
-        self.rozsir_meta(header, tabulka='osoba_extra', vlastni=False)
+    def nacti_osoba_extra(self):
+        df, _df = self.nacti_tabulku(self.specifikace_osoba_extra())
         self.tbl['osoba_extra'], self.tbl['_osoba_extra'] = df, _df
 
 
 class TabulkaZarazeniOsobyMixin(object):
-    def nacti_zarazeni_osoby(self):
+    def specifikace_zarazeni_osoby(self):
         path = f"{self.parameters['data_dir']}/zarazeni.unl"
         header = {
             'id_osoba': MItem('Int64', 'Identifikátor osoby, viz Osoby:id_osoba'),
@@ -164,9 +172,10 @@ class TabulkaZarazeniOsobyMixin(object):
             'od_f': MItem('string', 'Mandát od. Nemusí být vyplněno a pokud je vyplněno, pak určuje datum vzniku mandátu a ZarazeniOsoby:od_o obsahuje datum volby. [date]'),
             'do_f': MItem('string', 'Mandát do. Nemusí být vyplněno a pokud je vyplněno, určuje datum konce mandátu a ZarazeniOsoby:do_o obsahuje datum ukončení zařazení. [date]')
         }
-        _df = pd.read_csv(path, sep="|", names = header.keys(), index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, 'zarazeni_osoby')
-        self.rozsir_meta(header, tabulka='zarazeni_osoby', vlastni=False)
+        return SpecifikaceUnl([path], header, 'zarazeni_osoby')
+
+    def nacti_zarazeni_osoby(self):
+        df, _df = self.nacti_tabulku(self.specifikace_zarazeni_osoby())
 
         df['od_o'] = format_to_datetime_and_report_skips(df, 'od_o', '%Y-%m-%d %H').dt.tz_localize(self.tzn)
         # Fix known errors
@@ -186,7 +195,9 @@ class TabulkaZarazeniOsobyMixin(object):
 class TabulkaPoslanciMixin(object):
         # Další informace o poslanci vzhledem k volebnímu období: kontaktní údaje, adresa regionální kanceláře a podobně.
         # Některé údaje jsou pouze v aktuálním volebním období.
-    def nacti_poslance(self):
+    volitelne_sloupce = {'poslanci': ['web', 'ulice', 'obec', 'psc', 'email', 'telefon', 'fax', 'psp_telefon', 'facebook', 'foto']}
+
+    def specifikace_poslanci(self):
         path = f"{self.parameters['data_dir']}/poslanec.unl"
         header = {
             "id_poslanec": MItem('Int64', 'Identifikátor poslance'),
@@ -205,14 +216,16 @@ class TabulkaPoslanciMixin(object):
             "facebook": MItem('string', 'URL stránky služby Facebook.'),
             "foto": MItem('Int64', 'Pokud je rovno 1, pak existuje fotografie poslance.')
         }
+        return SpecifikaceUnl([path], header, 'poslanci')
 
-        _df = pd.read_csv(path, sep="|", names = header.keys(), index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, 'poslanci')
-        self.rozsir_meta(header, tabulka='poslanci', vlastni=False)
+    def nacti_poslance(self):
+        df, _df = self.nacti_tabulku(self.specifikace_poslanci())
         self.tbl['poslanci'], self.tbl['_poslanci'] = df, _df
 
 class TabulkaPoslanciPkgpsMixin(object):
-    def nacti_poslanci_pkgps(self):
+    volitelne_sloupce = {'poslanci_pkgps': ['adresa', 'sirka', 'delka']}
+
+    def specifikace_poslanci_pkgps(self):
         # Obsahuje GPS souřadnice regionálních kanceláří poslanců.
         path = f"{self.parameters['data_dir']}/pkgps.unl"
         header = {
@@ -221,8 +234,9 @@ class TabulkaPoslanciPkgpsMixin(object):
             'sirka': MItem('string', 'Severní šířka, WGS 84, formát GG.AABBCCC, GG = stupně, AA - minuty, BB - vteřiny, CCC - tisíciny vteřin'),
             'delka': MItem('string', 'Východní délka, WGS 84, formát GG.AABBCCC, GG = stupně, AA - minuty, BB - vteřiny, CCC - tisíciny vteřin')
         }
-        _df = pd.read_csv(path, sep="|", names = header.keys(), index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, 'poslanci_pkgps')
-        self.rozsir_meta(header, tabulka='poslanci_pkgps', vlastni=False)
+        return SpecifikaceUnl([path], header, 'poslanci_pkgps')
+
+    def nacti_poslanci_pkgps(self):
+        df, _df = self.nacti_tabulku(self.specifikace_poslanci_pkgps())
         self.tbl['poslanci_pkgps'], self.tbl['_poslanci_pkgps'] = df, _df
 
@@ -3,6 +3,7 @@ import pandas as pd
 
 from snemovna.utility import pretypuj, mask_by_values, format_to_datetime_and_report_skips
 from snemovna.Helpers import MItem
+from snemovna.Planovac import SpecifikaceUnl
 
 #from snemovna.Snemovna import *
 #from snemovna.PoslanciOsoby import *
@@ -12,7 +13,7 @@ from snemovna.setup_logger import log
 # Informace k tabulkám, viz. https://www.psp.cz/sqw/hp.sqw?k=1308
 
 class TabulkaSchuzeMixin(object):
-    def nacti_schuze(self):
+    def specifikace_schuze(self):
         # Obsahuje záznamy o schůzích.
         # Pro každou schůzi jsou v tabulce nejvýše dva záznamy, jeden vztahující se k návrhu pořadu, druhý ke schválenému pořadu.
         # I v případě neschválení pořadu schůze jsou dva záznamy, viz schuze:pozvanka a schuze_stav:stav.
@@ -26,10 +27,10 @@ class TabulkaSchuzeMixin(object):
           'aktualizace': MItem('string', 'Datum a čas poslední aktualizace.'),
           'pozvanka__ORIG': MItem('Int64', 'Druh záznamu: null - schválený pořad, 1 - navržený pořad.')
         }
+        return SpecifikaceUnl([path], header, 'schuze')
 
-        _df = pd.read_csv(path, sep="|", names = header,  index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, 'schuze')
-        self.rozsir_meta(header, tabulka='schuze', vlastni=False)
+    def nacti_schuze(self):
+        df, _df = self.nacti_tabulku(self.specifikace_schuze())
 
         # Oprava známých chybných hodnot (očividných překlepů)
         #df.at[768, 'od_schuze'] = "2020-05-31 09:00"
@@ -50,7 +51,7 @@ class TabulkaSchuzeMixin(object):
         self.tbl['schuze'], self.tbl['_schuze'] = df, _df
 
 class TabulkaSchuzeStavMixin(object):
-   def nacti_schuze_stav(self):
+   def specifikace_schuze_stav(self):
         path = f"{self.parameters['data_dir']}/schuze_stav.unl"
         header = {
             'id_schuze': MItem('Int64', 'Identifikátor schůze, viz Schuze:id_schuze.'),
@@ -60,10 +61,10 @@ class TabulkaSchuzeStavMixin(object):
             'text_st': MItem('string', 'Text stavu schůze, obvykle informace o přerušení.'),
             'tm_line': MItem('string', 'Podobné jako SchuzeStav:text_st, pouze psáno na začátku s velkým písmenem a ukončeno tečkou.')
         }
+        return SpecifikaceUnl([path], header, 'schuze_stav')
 
-        _df = pd.read_csv(path, sep="|", names = header,  index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, 'schuze_stav')
-        self.rozsir_meta(header, tabulka='schuze_stav', vlastni=False)
+   def nacti_schuze_stav(self):
+        df, _df = self.nacti_tabulku(self.specifikace_schuze_stav())
 
         mask = {1:"OK", 2:"pořad neschválen, schůze ukončena"}
         df['stav'] = mask_by_values(df.stav__ORIG, mask).astype('string')
@@ -77,16 +78,16 @@ class TabulkaSchuzeStavMixin(object):
 
 
 class TabulkaBodStavMixin(object):
-    def nacti_bod_stav(self):
+    def specifikace_bod_stav(self):
         path = f"{self.parameters['data_dir']}/bod_stav.unl"
         header = {
             'id_bod_stav': MItem('Int64', 'Typ stavu bodu schůze: typ 3 - neprojednatelný znamená vyřazen z pořadu či neprojednatelný z důvodu legislativního procesu.'),
             'popis': MItem('string', 'Popis stavu bodu.')
         }
+        return SpecifikaceUnl([path], header, 'bod_stav')
 
-        _df = pd.read_csv(path, sep="|", names = header,  index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, 'bod_stav')
-        self.rozsir_meta(header, tabulka='bod_stav', vlastni=False)
+    def nacti_bod_stav(self):
+        df, _df = self.nacti_tabulku(self.specifikace_bod_stav())
 
         df['id_bod_stav__KAT'] = df.id_bod_stav.astype(str).mask(df.id_bod_stav == 3, 'neprojednatelný')
         self.meta.nastav_hodnotu('id_bod_stav__KAT', dict(popis='Typ stavu bodu schůze.', tabulka='bod_stav', vlastni=True))
@@ -97,7 +98,7 @@ class TabulkaBodStavMixin(object):
 # Obsahuje záznamy o bodech pořadu schůze. Body typu odpověď na písemnou interpelaci (bod_schuze:id_typ == 6) se obvykle nezobrazují, viz dále.
 #Při zobrazení bodu se použijí položky bod_schuze:uplny_naz. Pokud je bod_schuze:id_tisk nebo bod_schuze:id_sd vyplněno, pak se dále použije bod_schuze:uplny_kon, případně text závislý na bod_schuze.id_typ. Poté následuje bod_schuze:poznamka.
 class TabulkaBodSchuzeMixin(object):
-    def nacti_bod_schuze(self):
+    def specifikace_bod_schuze(self):
         path = f"{self.parameters['data_dir']}/bod_schuze.unl"
         header = {
             'id_bod': MItem('Int64', 'Identifikátor bodu pořadu schůze, není to primární klíč, je nutno používat i položku bod_schuze:pozvanka. Záznamy se stejným id_bod odkazují na stejný bod, i když číslo bodu může být rozdílné (během schvalování pořadu schůze se pořadí bodů může změnit).'),
@@ -116,10 +117,10 @@ class TabulkaBodSchuzeMixin(object):
             'id_sd': MItem('Int64', 'Identifikátor sněmovního dokumentu, viz sd_dokument:id_dokument. Pokud není null, při výpisu se zobrazuje BodSchuze:uplny_kon.'),
             'zkratka': MItem('string', 'Zkrácený název bodu, neoficiální.')
         }
+        return SpecifikaceUnl([path], header, 'bod_schuze')
 
-        _df = pd.read_csv(path, sep="|", names = header,  index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, 'bod_schuze')
-        self.rozsir_meta(header, tabulka='bod_schuze', vlastni=False)
+    def nacti_bod_schuze(self):
+        df, _df = self.nacti_tabulku(self.specifikace_bod_schuze())
 
         self.tbl['bod_schuze'], self.tbl['_bod_schuze'] = df, _df
 
@@ -1,20 +1,21 @@
 import re
 from collections import namedtuple
 
-#import numpy as np
+import numpy as np
 import pandas as pd
 
-from html2text import html2text
 from bs4 import BeautifulSoup, NavigableString
 
 import os
-import requests
+import pytz
+import hashlib
 from time import time
 from pathlib import Path
-from urllib.parse import urlparse
 from joblib import Parallel, delayed, cpu_count
 
 from snemovna.Helpers import MItem
+from snemovna.Stahovac import Stahovac, Uloha
+from snemovna.Uloziste import UlozisteStenotextu
 from snemovna.utility import pretypuj, flatten
 
 from snemovna.setup_logger import log
@@ -22,268 +23,434 @@ from snemovna.setup_logger import log
 Rec = namedtuple("Rec", ['id_rec', 'id_osoba'])
 Promluva = namedtuple('Promluva', ["text", "recnik", "rid", "cas_od", "cas_do"])
 Cas = namedtuple('Cas', ['typ', 'hodina', 'minuta'])
+# Předkompilované vzory pro rozklad paragrafů stenozáznamu, viz TabulkaStenotextyMixin.rozloz_tag
+RE_JE_POZNAMKA = re.compile(r'^\s*\**\s*(\(.*?\))\s*\**\s*$') # * (poznámka) **
+RE_POZNAMKY = re.compile(r'\((.*?)\)') # Musím vás poprosit o klid. (V sále je hluk.)
+RE_CAS = re.compile(r'.*[^0-9]+([0-9]{1,2})\s*[.:]\s*([0-9]{2}).*hod') # (9.20 hodin)
+# Typy času podle klíčového slova v poznámce, v pořadí priority. Pokud žádné nesedí, jde o obecnou časovou značku.
+RE_TYPY_CASU = [
+    (slovo, typ, re.compile(rf'.*{slovo}.*[^0-9]+([0-9]{{1,2}})\s*[.:]\s*([0-9]{{2}}).*hod'))
+    for slovo, typ in [('zaháj', 'zahájení'), ('přer', 'přerušení'), ('pokrač', 'pokračování'), ('konč', 'ukončení')]
+]
+RE_RECNIK_ID = re.compile(r'^r([0-9]+)$') # id=r6  & href=https://www.psp.cz/sqw/detail.sqw?id=6452 ...
+RE_RECNIK_HREF = re.compile(r'\/sqw\/detail.sqw\?id\=([0-9]+)$')
+RE_HLASOVANI_ID = re.compile(r'^h([0-9]+)$') # https://www.psp.cz/sqw/hlasy.sqw?G=74037
+RE_HLASOVANI_HREF = re.compile(r'\/sqw\/hlasy.sqw\?G\=([0-9]+)$')
+RE_TISK_HREF = re.compile(r'\/sqw\/historie.sqw\?T\=([0-9]+)\&O=([0-9])+$') # https://www.psp.cz/sqw/historie.sqw?T=922&O=8
+
+# Sloupce tabulky steno_texty a jejich typy. Parsování stenozáznamu vrací sloupcovou dávku s těmito typy (bez 'schuze' a 'turn'),
+# viz TabulkaStenotextyMixin.davka_promluv a results2df. Sloupec 'date' má navíc časovou zónu.
+SLOUPCE_STENO_TEXTU = {
+    'text': 'string', 'text_s_poznamkami': 'string', 'schuze': 'Int64', 'turn': 'Int64', 'id_osoba': 'Int64', 'id_rec': 'Int64',
+    'poznamka': 'string', 'je_poznamka': 'bool', 'cas': 'string', 'typ_casu': 'string', 'date': 'datetime64[ns]',
+    'hlasovani': 'Int64', 'cislo_hlasovani': 'Int64'
+}
+# Oddělovač více poznámek jedné promluvy ve sloupci 'poznamka'
+ODDELOVAC_POZNAMEK = ' | '
+
+# Parsování stenozáznamu v samostatném procesu, viz TabulkaStenotextyMixin.zpracuj_steno_texty.
+# Do procesu se předává jen cesta k souboru, parser a časová zóna, zpět se vrací sloupcová dávka promluv.
+def zpracuj_stenozaznam_v_procesu(filename, html_parser='html5lib', tzn='Europe/Prague'):
+    parser = TabulkaStenotextyMixin()
+    parser.parameters = {'html_parser': html_parser}
+    parser.tzn = pytz.timezone(tzn)
+    return parser.davka_stenozaznamu(filename)
 
 class TabulkaStenotextyMixin(object):
+    # Adresa, ze které se stahují stenozáznamy (před cestou www.psp.cz/...). V testech lze nahradit lokálním HTTP serverem.
+    url_prefix = "https://"
+    # Sloupce steno_texty, které se načítají vždy (i při výběru sloupců), potřebuje je Stenotexty k doplnění řečníků
+    klicove_sloupce_textu = ['schuze', 'turn', 'poradi', 'id_osoba', 'id_rec', 'date', 'turn_surrogate', 'id_rec_surrogate']
+    # Sloupce s texty promluv, při načítání textů na vyžádání (parametr 'texty_na_vyzadani') se vynechávají, viz nacti_texty
+    textove_sloupce = ['text', 'text_s_poznamkami']
+
     def nacti_steno_texty(self):
         header = {
             'text': MItem('string', 'Text promluvy s odstraněnými poznámkami (tj. bez textu v závorkách atp.)'),
             'text_s_poznamkami': MItem('string', 'Text promluvy včetně poznámek'),
             'schuze': MItem('Int64', 'Číslo schůze.'),
             'turn': MItem('Int64', 'Číslo stenozáznamu v rámci schůze.'),
+            'poradi': MItem('Int64', 'Pořadí promluvy ve stenozáznamu (turn), spolu se schůzí a stenozáznamem identifikuje promluvu.'),
             'id_osoba': MItem('Int64', 'Identifikátor osoby, viz Osoby:id_osoba.'),
             "id_rec": MItem('Int64', 'Identifikátor řečníka, viz StenoRecnici: id_rec'),
-            'poznamka': MItem('string', 'Poznámka extrahovaá ze stenozáznamu.'),
+            'poznamka': MItem('string', 'Poznámky extrahované ze stenozáznamu (oddělené " | ").'),
             'je_poznamka': MItem('bool', 'Příznak, že celá promluva je poznámka.'),
             'cas': MItem('string', "Čas extrahovaný ze stenozáznamu."),
             'typ_casu': MItem('string', 'Typ času extrahovaného ze stenozáznamu [začátek, přerušení pokračování, ukončení, obecný].'),
             "date": MItem('string', 'Datum extrahované ze stenozáznamu.'),
-            'hlasovani': MItem('Int64', 'Identifikátor hlasování (pole).'),
-            'cislo_hlasovani': MItem('Int64', 'Číslo hlasování (pole).'),
+            'hlasovani': MItem('Int64', 'Identifikátor hlasování.'),
+            'cislo_hlasovani': MItem('Int64', 'Číslo hlasování.'),
         }
-        path = f"{self.parameters['data_dir']}/steno_texty-{self.volebni_obdobi}.pkl"
-        df = pd.read_pickle(path)
+        vyber = dict(
+            schuze=self.parameters.get('vyber_schuze'), osoby=self.parameters.get('vyber_osoby'),
+            od=self.parameters.get('vyber_od'), do=self.parameters.get('vyber_do')
+        )
+        sloupce = self.parameters.get('sloupce_textu')
+        if sloupce is not None:
+            sloupce = self.klicove_sloupce_textu + [s for s in sloupce if s not in self.klicove_sloupce_textu]
+        vynechat = self.textove_sloupce if self.parameters.get('texty_na_vyzadani') == True else []
+
+        uloziste = self.uloziste_steno_textu()
+        if not uloziste.je_prazdne():
+            sloupce = uloziste.sloupce() if (sloupce is None) and (len(vynechat) > 0) else sloupce
+            if sloupce is not None:
+                sloupce = [s for s in sloupce if s not in vynechat]
+            df = uloziste.nacti(**vyber, sloupce=sloupce, tzn=self.tzn)
+        else:
+            # Starší formát: jedna tabulka za celé volební období
+            path = f"{self.parameters['data_dir']}/steno_texty-{self.volebni_obdobi}.pkl"
+            log.info(f"Úložiště '{uloziste.adresar}' je prázdné, načítám '{path}'.")
+            df = pd.read_pickle(path)
+            self.dopln_poradi(df)
+            self.dopln_surrogaty(df)
+            df = self.vyber_promluvy(df, **vyber)
+            if sloupce is not None:
+                df = df[sloupce]
+            df = df.drop(columns=vynechat, errors='ignore')
+
+        if 'cisla_hlasovani' in df.columns:
+            # Texty uložené staršími verzemi mají sloupec 'cislo_hlasovani' pod jménem 'cisla_hlasovani'
+            df.rename(columns={'cisla_hlasovani': 'cislo_hlasovani'}, inplace=True)
+
+        header = {k: v for k, v in header.items() if k in df.columns}
         self.rozsir_meta(header, tabulka='steno_texty', vlastni=False)
 
         self.tbl['steno_texty'], self.tbl['_steno_texty'] = df, df
 
     def stahni_steno_texty(self):
-        path = f"{self.parameters['data_dir']}/steno_texty-{self.volebni_obdobi}.pkl"
         # scraping z webu
         self.stahni_html_data()
         # parsování html
         results, args = self.zpracuj_steno_texty()
         # tvorba pandas tabulky
         _steno_texty = self.results2df(results, args)
-        # ulož lokálně výslednou tabulku
-        _steno_texty.to_pickle(path)
+        # ulož lokálně výslednou tabulku, po schůzích
+        uloziste = self.uloziste_steno_textu()
+        for schuze, oddil in _steno_texty.groupby('schuze'):
+            self.zapis_oddil(uloziste, schuze, oddil)
+
+    def adresar_steno_textu(self):
+        return f"{self.parameters['data_dir']}/steno_texty-{self.volebni_obdobi}"
+
+    def uloziste_steno_textu(self):
+        return UlozisteStenotextu(self.adresar_steno_textu())
+
+    def zapis_oddil(self, uloziste, schuze, df):
+        """Zapíše promluvy schůze 'schuze' do úložiště, včetně identifikace přetahujících řečníků (viz dopln_surrogaty)."""
+        df = df.drop(columns=['poradi', 'turn_surrogate', 'id_rec_surrogate'], errors='ignore').sort_values('turn', kind='stable', ignore_index=True)
+        self.dopln_poradi(df)
+        self.dopln_surrogaty(df)
+        uloziste.zapis(schuze, df)
+
+    def dopln_poradi(self, df):
+        """Doplní do 'df' sloupec 'poradi' (pořadí promluvy ve stenozáznamu), klíč promluvy je (schuze, turn, poradi)."""
+        df['poradi'] = df.groupby(['schuze', 'turn']).cumcount().astype('Int64')
+
+    def nacti_texty(self, klice, sloupce=None):
+        """Načte texty promluv určených klíči (tabulka se sloupci 'schuze', 'turn' a 'poradi').
+
+        Vrací tabulku se sloupci 'sloupce' (None = textove_sloupce) a se stejným indexem jako 'klice'.
+        Čtou se jen oddíly schůzí, které se v 'klice' vyskytují.
+        """
+        sloupce = self.textove_sloupce if sloupce is None else list(sloupce)
+        klic = ['schuze', 'turn', 'poradi']
+        schuze = [int(s) for s in klice.schuze.dropna().unique()]
+
+        uloziste = self.uloziste_steno_textu()
+        if not uloziste.je_prazdne():
+            texty = uloziste.nacti(schuze=schuze, sloupce=klic + sloupce)
+        else:
+            texty = pd.read_pickle(f"{self.parameters['data_dir']}/steno_texty-{self.volebni_obdobi}.pkl")
+            self.dopln_poradi(texty)
+            texty = texty[texty.schuze.isin(schuze)][klic + sloupce]
+
+        klice = klice[klic].astype('Int64')
+        ret = pd.merge(klice.reset_index(drop=True), texty.astype({k: 'Int64' for k in klic}), on=klic, how='left')[sloupce]
+        ret.index = klice.index
+        return ret
+
+    def dopln_surrogaty(self, df):
+        """Doplní do 'df' sloupce 'turn_surrogate' a 'id_rec_surrogate'.
+
+        Přetahující řečník nemá v aktuálním stenozáznamu identifikátor, přebírá se z posledního
+        předchozího stenozáznamu téže schůze, ve kterém byl řečník nalezen (viz Stenotexty).
+        Počítá se po schůzích, lze jej proto uložit s oddílem úložiště a při výběru osob použít i pro nevybrané řádky.
+        """
+        df.loc[df.id_rec.isna(), 'turn_surrogate'] = np.nan
+        df.loc[~df.id_rec.isna(), 'turn_surrogate'] = df.turn
+        df['turn_surrogate'] = df.groupby("schuze")['turn_surrogate'].ffill().astype('Int64')
+        df['id_rec_surrogate'] = df['id_rec']
+        df['id_rec_surrogate'] = df.groupby("schuze")['id_rec_surrogate'].ffill().astype('Int64')
+
+    def vyber_promluvy(self, df, schuze=None, osoby=None, od=None, do=None):
+        """Výběr promluv v paměti se stejným významem jako UlozisteStenotextu.nacti."""
+        maska = pd.Series(True, index=df.index)
+        if schuze is not None:
+            maska &= df.schuze.isin(schuze)
+        if osoby is not None:
+            maska &= df.id_osoba.isin(osoby) | df.id_osoba.isna()
+        for hranice, porovnej in [(od, lambda c, t: c >= t), (do, lambda c, t: c <= t)]:
+            if hranice is not None:
+                t = pd.Timestamp(hranice)
+                maska &= porovnej(df.date, t.tz_localize(self.tzn) if t.tzinfo is None else t)
+        return df if maska.all() else df[maska].reset_index(drop=True)
+
+    def nacti_manifest(self):
+        """Vrátí manifest zpracovaných stenozáznamů (schuze, turn) -> otisk zdrojového html a počet promluv."""
+        path = f"{self.adresar_steno_textu()}/manifest.pkl"
+        if os.path.exists(path):
+            return pd.read_pickle(path)
+        return pd.DataFrame(columns=['schuze', 'turn', 'hash', 'etag', 'last_modified', 'promluv', 'aktualizovano'])
+
+    def otisk_souboru(self, path):
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    def aktualizuj_steno_texty(self):
+        """Inkrementální varianta stahni_steno_texty.
+
+        Stahuje a zpracovává jen stenozáznamy, které chybí v manifestu nebo se od posledního zpracování změnily.
+        Stenozáznamy posledních 'obnovit_schuze' schůzí z manifestu se znovu stahují podmíněně (ETag, Last-Modified),
+        zpracují se však jen tehdy, pokud se změnil otisk html. Promluvy se ukládají do oddílů po schůzích
+        (viz UlozisteStenotextu), přepisují se jen oddíly schůzí se změněnými stenozáznamy.
+        """
+        adresar = self.adresar_steno_textu()
+        Path(adresar).mkdir(parents=True, exist_ok=True)
+        manifest = self.nacti_manifest()
+        sloupce = manifest.columns
+        manifest = {(z['schuze'], z['turn']): z for z in manifest.to_dict('records')}
+
+        # Starší schůze se už nemění, podmíněně kontrolujeme jen ty poslední
+        obnovit = set(sorted(set(s for s, t in manifest))[-self.parameters.get('obnovit_schuze', 1):]) if len(manifest) > 0 else set()
+        ke_stazeni = [t for t in self.turny() if (t not in manifest) or (t[0] in obnovit)]
+        log.info(f"K podmíněnému stažení: {len(ke_stazeni)} souborů.")
+
+        stazene = self.stahovac().stahni([
+            self.uloha(t, manifest.get(t, {}).get('etag'), manifest.get(t, {}).get('last_modified')) for t in ke_stazeni
+        ])
+
+        zmenene, stav = [], {}
+        for turn, r in zip(ke_stazeni, stazene):
+            if r['status'] == 304:
+                continue
+            if r['status'] != 200:
+                log.warning(f"Stenozáznam {turn} se nepodařilo stáhnout (status {r['status']}), přeskakuji.")
+                continue
+            stav[turn] = dict(schuze=turn[0], turn=turn[1], hash=self.otisk_souboru(r['path']), etag=r['etag'], last_modified=r['last_modified'])
+            if (turn in manifest) and (manifest[turn]['hash'] == stav[turn]['hash']):
+                manifest[turn].update(etag=r['etag'], last_modified=r['last_modified'])
+            else:
+                zmenene.append(turn)
+        log.info(f"Nových nebo změněných stenozáznamů: {len(zmenene)}.")
+
+        if len(zmenene) > 0:
+            results, args = self.zpracuj_steno_texty(turny=zmenene)
+            df = self.results2df(results, args)
+            zpracovane = [(a['schuze'], a['turn']) for r, a in zip(results, args) if r is not None]
+
+            # Nejdřív oddíly, pak manifest: po přerušení se stenozáznam zpracuje znovu, ale neztratí se.
+            uloziste = self.uloziste_steno_textu()
+            for schuze in sorted(set(s for s, t in zpracovane)):
+                casti = []
+                stare = uloziste.nacti_oddil(schuze)
+                if stare is not None:
+                    casti.append(stare[~stare.turn.isin([t for s, t in zpracovane if s == schuze])])
+                casti.append(df[df.schuze == schuze])
+                self.zapis_oddil(uloziste, schuze, pd.concat(casti, ignore_index=True))
+
+            promluv = df.groupby(['schuze', 'turn']).size()
+            aktualizovano = pd.Timestamp.now(tz=self.tzn)
+            for turn in zpracovane:
+                manifest[turn] = dict(stav[turn], promluv=promluv.get(turn, 0), aktualizovano=aktualizovano)
+
+        manifest = pd.DataFrame(list(manifest.values()), columns=sloupce)
+        manifest.sort_values(['schuze', 'turn'], ignore_index=True).to_pickle(f"{adresar}/manifest.pkl")
+        return zmenene
+
+    def turny(self):
+        """Vrátí seznam stenozáznamů (schuze, turn) k zpracování, s ohledem na parametr 'limit'."""
+        turny = list(self.tbl['steno'].groupby(['schuze', 'turn']).groups.keys()) # Do we need some kind of sort here?
+        if ('limit' in self.parameters) and (self.parameters['limit'] != -1):
+            turny = turny[:self.parameters['limit']]
+        return turny
 
     def results2df(self, results, args):
-        texty = []
-        texty_s_poznamkami = []
-        schuze = []
-        turns = []
-        id_osoby = []
-        id_reci = []
-        poznamky = []
-        je_poznamka = []
-        cas = []
-        typ_casu = []
-        dates = []
-        hlasovani = []
-        cisla_hlasovani = []
-        for result, arg in zip(results,  args):
-            for r in result:
-                id_osoba, id_rec = None, None
-                if len(r['meta']['recnici']) > 0:
-                    if r['meta']['recnici'][0].id_osoba != None:
-                        id_osoba = int(r['meta']['recnici'][0].id_osoba)
-
-                    if r['meta']['recnici'][0].id_rec != None:
-                        id_rec = int(r['meta']['recnici'][0].id_rec)
-
-                text = r['text']
-
-                if len(r['meta']['poznamky']) > 0:
-                    poznamka = r['meta']['poznamky']
-                else:
-                    poznamka = None
-
-                if len(r['meta']['je_poznamka']) > 0:
-                    je_poznamka_item = r['meta']['je_poznamka'][0]
-                else:
-                    je_poznamka_item = False
-
-                if len(r['meta']['cas']) > 0:
-                    c = f"{r['meta']['cas'][0].hodina}:{r['meta']['cas'][0].minuta}"
-                    tc = r['meta']['cas'][0].typ
-                else:
-                    c, tc = None, None
-
-                texty.append(r['text'])
-                texty_s_poznamkami.append(r['meta']['text_s_poznamkami'])
-                schuze.append(arg['schuze'])
-                turns.append(arg['turn'])
-                id_osoby.append(id_osoba)
-                id_reci.append(id_rec)
-                poznamky.append(poznamka)
-                je_poznamka.append(je_poznamka_item)
-                cas.append(c)
-                typ_casu.append(tc)
-                dates.append(r['meta']['date'])
-                hlasovani.append(r['meta']['hlasovani'])
-                cisla_hlasovani.append(r['meta']['cislo_hlasovani'])
-
-        df = pd.DataFrame({'text': texty, 'text_s_poznamkami': texty_s_poznamkami, 'schuze': schuze, 'turn': turns, 'id_osoba': id_osoby, "id_rec": id_reci, 'poznamka': poznamky, 'je_poznamka': je_poznamka, 'cas': cas, 'typ_casu': typ_casu, "date": dates, 'hlasovani': hlasovani, 'cisla_hlasovani': cisla_hlasovani})
+        davky = []
+        for davka, arg in zip(results,  args):
+            if davka is None:
+                continue
+            davka.insert(2, 'schuze', pd.array([arg['schuze']] * len(davka), dtype='Int64'))
+            davka.insert(3, 'turn', pd.array([arg['turn']] * len(davka), dtype='Int64'))
+            davky.append(davka)
+
+        if len(davky) == 0:
+            davka = self.davka_promluv([])
+            davka.insert(2, 'schuze', pd.array([], dtype='Int64'))
+            davka.insert(3, 'turn', pd.array([], dtype='Int64'))
+            davky.append(davka)
+
+        df = pd.concat(davky, ignore_index=True)
 
         return df
 
+    def davka_promluv(self, rows):
+        """Převede promluvy z rozloz_paragraf na sloupcovou dávku (DataFrame s typy dle SLOUPCE_STENO_TEXTU, bez 'schuze' a 'turn')."""
+        sloupce = {k: [] for k in SLOUPCE_STENO_TEXTU if k not in ['schuze', 'turn']}
+        for r in rows:
+            meta = r['meta']
+            recnik = meta['recnici'][0] if len(meta['recnici']) > 0 else Rec(None, None)
+            cas = meta['cas'][0] if len(meta['cas']) > 0 else None
+
+            sloupce['text'].append(r['text'])
+            sloupce['text_s_poznamkami'].append(meta['text_s_poznamkami'])
+            sloupce['id_osoba'].append(None if recnik.id_osoba is None else int(recnik.id_osoba))
+            sloupce['id_rec'].append(None if recnik.id_rec is None else int(recnik.id_rec))
+            sloupce['poznamka'].append(ODDELOVAC_POZNAMEK.join(meta['poznamky']) if len(meta['poznamky']) > 0 else None)
+            sloupce['je_poznamka'].append(len(meta['je_poznamka']) > 0)
+            sloupce['cas'].append(None if cas is None else f"{cas.hodina}:{cas.minuta}")
+            sloupce['typ_casu'].append(None if cas is None else cas.typ)
+            sloupce['date'].append(meta['date'])
+            sloupce['hlasovani'].append(None if meta['hlasovani'] is None else int(meta['hlasovani']))
+            sloupce['cislo_hlasovani'].append(None if meta['cislo_hlasovani'] is None else int(meta['cislo_hlasovani']))
+
+        typy = dict(SLOUPCE_STENO_TEXTU, date=pd.DatetimeTZDtype(tz=self.tzn))
+        return pd.DataFrame({k: pd.array(v, dtype=typy[k]) for k, v in sloupce.items()})
+
+    def davka_stenozaznamu(self, filename):
+        """Zpracuje stenozáznam a vrátí sloupcovou dávku jeho promluv (None, pokud soubor nelze zpracovat)."""
+        rows = self.zpracuj_stenozaznam(filename)
+        if rows is None:
+            return None
+        return self.davka_promluv(rows)
+
     def cesta(self, schuze, turn):
         return f"www.psp.cz/eknih/{self.volebni_obdobi}ps/stenprot/{schuze:03d}schuz/s{schuze:03d}{turn:03d}.htm"
 
-    def zpracuj_steno_texty(self):
+    def zpracuj_steno_texty(self, turny=None):
         args = [{
             "path": self.parameters['data_dir'] + '/' + self.cesta(item[0], item[1]),
             "schuze": item[0],
             "turn": item[1]
-        } for item in self.tbl['steno'].groupby(['schuze', 'turn']).groups.keys()]# Do we need some kind of sort here?
-
-        if ('limit' in self.parameters) and (self.parameters['limit'] != -1):
-            args = args[:self.parameters['limit']]
+        } for item in (self.turny() if turny is None else turny)]
 
         paths = [item['path'] for item in args]
 
         log.info(f"K zpracování: {len(paths)} souborů.")
-        #n_jobs = max([12, 3*cpu_count()])
-        #results = Parallel(n_jobs=-1, verbose=1, backend="threading")(delayed(self.zpracuj_stenozaznam)(item) for item in paths)
-        results = Parallel(n_jobs=self.parameters['soubezne_zpracovani_max'], verbose=1, backend="threading")(delayed(self.zpracuj_stenozaznam)(item) for item in paths)
+        n_jobs = self.parameters['soubezne_zpracovani_max']
+        zpracovani = self.parameters.get('zpracovani', 'vlakna')
+        if zpracovani == 'procesy':
+            # Parsování (BeautifulSoup) drží GIL, ve vláknech se proto nezrychlí. Procesům předáváme jen cesty k souborům.
+            html_parser = self.parameters.get('html_parser', 'html5lib')
+            results = Parallel(n_jobs=n_jobs, verbose=1, backend="loky")(delayed(zpracuj_stenozaznam_v_procesu)(item, html_parser, self.tzn.zone) for item in paths)
+        elif zpracovani == 'vlakna':
+            results = Parallel(n_jobs=n_jobs, verbose=1, backend="threading")(delayed(self.davka_stenozaznamu)(item) for item in paths)
+        else:
+            raise ValueError(f"Neznámý způsob zpracování: {zpracovani}")
 
         return results, args
 
     def stahni_html_data(self):
-        args = [["https://" + self.cesta(item[0], item[1]), self.parameters['data_dir'] ] for item in self.tbl['steno'].groupby(['schuze', 'turn']).groups.keys()]
-
-        if ('limit' in self.parameters) and (self.parameters['limit'] != -1):
-            args = args[:self.parameters['limit']]
-
-        log.info(f"K stažení: {len(args)} souborů.")
-        #n_jobs = max([12, 3*cpu_count()])
-        #n_jobs = max([self.parameters['soubezne_stahovani_max'], 3*cpu_count()])
-        n_jobs = self.parameters['soubezne_stahovani_max']
-        Parallel(n_jobs=n_jobs, verbose=1, backend="threading")(delayed(self.stahni_url)(item) for item in args)
-
-    def stahni_url(self, arg):
-        url, dir_prefix = arg
-        u = urlparse(url)
-        n = u.netloc
-        p = u.path
-        filename = os.path.basename(p)
-        d = os.path.dirname(p)
-        dirname = dir_prefix + '/' + n + d
-        path = dirname + '/' + filename
-        #log.debug(f"path: '{path}'")
-        Path(dirname).mkdir(parents=True, exist_ok=True)
-        r = requests.get(url, stream = True)
-        with open(path, 'wb') as f:
-            for ch in r:
-                f.write(ch)
+        ulohy = [self.uloha(turn) for turn in self.turny()]
+        log.info(f"K stažení: {len(ulohy)} souborů.")
+        for uloha, r in zip(ulohy, self.stahovac().stahni(ulohy)):
+            if r['status'] != 200:
+                log.warning(f"Soubor '{uloha.url}' se nepodařilo stáhnout (status {r['status']}).")
+
+    def stahovac(self):
+        return Stahovac(
+            soubezne_max=self.parameters['soubezne_stahovani_max'],
+            pozadavku_za_s=self.parameters.get('stahovani_pozadavku_za_s', None)
+        )
+
+    def uloha(self, turn, etag=None, last_modified=None):
+        """Vrátí úlohu pro stažení stenozáznamu 'turn' = (schuze, turn) do data_dir."""
+        cesta = self.cesta(*turn)
+        return Uloha(
+            self.url_prefix + cesta, self.parameters['data_dir'] + '/' + cesta,
+            None if pd.isna(etag) else etag, None if pd.isna(last_modified) else last_modified
+        )
 
     def load_soup(self, filename):
-        data = open(filename, 'r', encoding='cp1250').read()
-        return BeautifulSoup(data, 'html5lib') # Další varianty: 'lxml', 'html.parser'
+        with open(filename, 'r', encoding='cp1250') as f:
+            data = f.read()
+        # 'html5lib' je nejtolerantnější k chybám v html, 'lxml' je výrazně rychlejší. Další varianta: 'html.parser'
+        html_parser = self.parameters.get('html_parser', 'html5lib')
+        return BeautifulSoup(data, html_parser)
 
     def polish(self, text):
-        text = text.strip()
-        text = re.sub(r'\n', ' ', text)
-        text = re.sub(r'[ ]+', r' ', text)
-        return text
+        # Texty uzlů už mají normalizované mezery (viz text_uzlu), stačí oříznout a sloučit mezery po jejich spojení
+        return ' '.join(text.split())
 
-    # * (poznámka) **
-    def je_poznamka(self, tag):
-        return re.match('^\s*\**\s*(\(.*?\))\s*\**\s*$', tag.string) != None
+    def text_uzlu(self, s):
+        """Text uzlu stenozáznamu s normalizovanými mezerami.
 
-    # Musím vás poprosit o klid. (V sále je hluk.)
-    def najdi_poznamky(self, tag):
-        return re.findall('\((.*?)\)', tag.string)
+        Bílé znaky (včetně nezlomitelné mezery, tabulátoru a konců řádků) nahradí jednou mezerou a text ořízne,
+        stejně jako dříve používaný html2text. Na rozdíl od něj text znovu neinterpretuje jako html či markdown
+        (neescapuje např. '1.' na začátku řádku a nezalamuje dlouhé řádky).
+        """
+        return ' '.join(s.split())
 
     # (9.20 hodin)
-    def najdi_cas(self, tag):
-        s = tag.string
-        if self.je_poznamka(tag):
-            # čas zahájení
-            m = re.match(r'.*zaháj.*[^0-9]+([0-9]{1,2})\s*[.:]\s*([0-9]{2}).*hod', s)
-            if m:
-                return Cas('zahájení', m.groups()[0], m.groups()[1])
-
-            # čas přerušení
-            m = re.match(r'.*přer.*[^0-9]+([0-9]{1,2})\s*[.:]\s*([0-9]{2}).*hod', s)
-            if m:
-                return Cas('přerušení', m.groups()[0], m.groups()[1])
-
-            # čas pokračování
-            m = re.match(r'.*pokrač.*[^0-9]+([0-9]{1,2})\s*[.:]\s*([0-9]{2}).*hod', s)
-            if m:
-                return Cas('pokračování', m.groups()[0], m.groups()[1])
-
-            # čas ukončení
-            m = re.match(r'.*konč.*[^0-9]+([0-9]{1,2})\s*[.:]\s*([0-9]{2}).*hod', s)
-            if m:
-                return Cas('ukončení', m.groups()[0], m.groups()[1])
-
-            # obecná časová značka
-            m = re.match(r'.*[^0-9]+([0-9]{1,2})\s*[.:]\s*([0-9]{2}).*hod', s)
+    def najdi_cas(self, s):
+        """Vrátí čas (Cas) z poznámky 's', např. '(Jednání zahájeno v 9.02 hodin.)', případně None."""
+        m = RE_CAS.match(s)
+        if m is None:
+            # Bez obecné časové značky nemůže sedět ani žádný z konkrétních vzorů
+            return None
+        for slovo, typ, vzor in RE_TYPY_CASU:
+            if slovo in s:
+                mt = vzor.match(s)
+                if mt:
+                    return Cas(typ, *mt.groups())
+        return Cas('obecně', *m.groups())
+
+    def klasifikuj_odkaz(self, tag, meta):
+        """Z odkazu (tag 'a') vytáhne řečníka, hlasování nebo tisk a uloží je do 'meta'."""
+        id_, href = tag.attrs.get('id'), tag.attrs.get('href')
+        if id_:
+            m = RE_RECNIK_ID.match(id_)
             if m:
-                return Cas('obecně', m.groups()[0], m.groups()[1])
-
-        return None
-
-    # id=r6  & href=https://www.psp.cz/sqw/detail.sqw?id=6452 ...
-    # někdy se stane, že není možné identifikovat řečníka, ačkoliv lze určit id řeči
-    def najdi_recnika(self, tag):
-        if (tag.name == 'a') and tag.attrs and  tag.attrs.get('id') and (re.match(r'^r[0-9]+$', tag.attrs.get('id'))):
-            id_rec = re.match(r'^r([0-9]+)$', tag.attrs.get('id')).groups()[0]
-            id_osoba = None
-            if tag.attrs.get('href'):
-                m = re.match(r'\/sqw\/detail.sqw\?id\=([0-9]+)$', tag.attrs.get('href'))
+                # někdy se stane, že není možné identifikovat řečníka, ačkoliv lze určit id řeči
+                mh = RE_RECNIK_HREF.match(href) if href else None
+                meta['recnici'].append(Rec(id_rec=m.group(1), id_osoba=mh.group(1) if mh else None))
+                # Promluvy jsou uvozeny jmény řečníků, která je nutné odstranit.
+                # Samotné odstranění se provádí až ve volající funkci, protože se potřebujeme zbavit ':', která není součástí aktuálního tagu.
+                if len(meta['odstran']) == 0:
+                    meta['odstran'].append(self.text_uzlu(tag.string) + ' : ')
+            else:
+                m = RE_HLASOVANI_ID.match(id_)
                 if m:
-                    id_osoba = m.groups()[0]
-            return Rec(id_rec=id_rec, id_osoba=id_osoba)
-        return None
-
-    #https://www.psp.cz/sqw/historie.sqw?T=922&O=8
-    def najdi_tisk(self, tag):
-        if (tag.name == 'a') and tag.attrs.get('href'):
-            m = re.match(r'\/sqw\/historie.sqw\?T\=([0-9]+)\&O=([0-9])+$', tag.attrs.get('href'))
+                    mh = RE_HLASOVANI_HREF.match(href) if href else None
+                    meta['cislo_hlasovani'].append(m.group(1))
+                    meta['hlasovani'].append(mh.group(1) if mh else None)
+        if href:
+            m = RE_TISK_HREF.match(href)
             if m:
-                return m.groups()[0], m.groups()[1]
-        return None
-
-    # https://www.psp.cz/sqw/hlasy.sqw?G=74037
-    def najdi_hlasovani(self, tag):
-        if (tag.name == 'a') and tag.attrs.get('id') and (re.match(r'^h[0-9]+$', tag.attrs.get('id'))):
-            hid = re.match(r'^h([0-9]+)$', tag.attrs.get('id')).groups()[0]
-            G = None
-            if tag.attrs.get('href'):
-                m = re.match(r'\/sqw\/hlasy.sqw\?G\=([0-9]+)$', tag.attrs.get('href'))
-                if m:
-                    G = m.groups()[0]
-            return hid, G
-        return None
+                meta['tisky'].append(m.groups())
+
+    def klasifikuj_text(self, s, meta):
+        """Z textu 's' vytáhne poznámky v závorkách a případně i čas a uloží je do 'meta'."""
+        if '(' not in s:
+            return
+        if RE_JE_POZNAMKA.match(s):
+            meta['je_poznamka'].append(True)
+            cas = self.najdi_cas(s)
+            if cas:
+                meta['cas'].append(cas)
+        # V jedné promluvě může být víc poznámek
+        meta['poznamky'].extend(RE_POZNAMKY.findall(s))
 
     def rozloz_tag(self, tag, text, meta):
+        # Jeden průchod stromem: odkazy se klasifikují podle atributů, text (listy stromu) podle obsahu.
         for child in tag.contents:
             if (child == None) or (child.string == None):
                 continue
-            for fce, klic in [
-                [self.najdi_cas, 'cas'],
-                [self.najdi_recnika, 'recnici'],
-                [self.najdi_tisk, 'tisky'],
-                [self.najdi_hlasovani, 'hlasovani'],
-                [self.je_poznamka, 'je_poznamka'],
-                [self.najdi_poznamky, 'poznamky']
-            ]:
-                ret = fce(child)
-                if ret:
-                    if (klic == 'hlasovani') and len(ret) > 0:
-                        hid, G = ret
-                        meta['cislo_hlasovani'].append(hid)
-                        meta['hlasovani'].append(G)
-                        continue
-                    meta[klic].append(ret)
-
-                # Promluvy jsou uvozeny jmény řečníků, která je nutné odstranit.
-                # Děláme to tady hodně neohrabaně tak, že nastavíme příznak pro odstranění.
-                # Samotné odstranění se provádí až ve volající funkci, protože se potřebujeme zbavit ':', která není součástí aktuálního tagu.
-                if (klic == 'recnici') and (len(meta['recnici']) > 0) and (len(meta['odstran']) == 0):
-                    meta['odstran'].append(self.polish(html2text(child.string)) + ' : ')
-
-                # V jedné promluvě může být víc poznámek
-                if (klic == 'poznamky') and (len(meta['poznamky']) > 0):
-                    meta['poznamky'] = flatten(meta['poznamky'])
-
             if type(child) == NavigableString:
-                t = html2text(child.string)
-                text.append(t)
+                self.klasifikuj_text(child.string, meta)
+                text.append(self.text_uzlu(child.string))
             else:
+                if child.name == 'a':
+                    self.klasifikuj_odkaz(child, meta)
                 self.rozloz_tag(child, text, meta)
         return
 
@@ -5,7 +5,7 @@ from snemovna.Schuze import *
 from snemovna.setup_logger import log
 
 class TabulkaStenoMixin(object):
-    def nacti_steno(self):
+    def specifikace_steno(self):
         path = f"{self.parameters['data_dir']}/steno.unl"
         header = {
             'id_steno': MItem('Int64', 'Identifikátor stenozáznamu'),
@@ -17,10 +17,10 @@ class TabulkaStenoMixin(object):
             'od_t': MItem('Int64', 'Čas začátku stenozáznamu v minutách od začátku kalendářního dne; pokud je null či menší než nula, není známo. Tj. převod na čas typu H:M je pomocí H = div(od_t, 60), M = mod(od_t, 60).'),
             'do_t': MItem('Int64', 'Čas konce stenozáznamu v minutách od začátku kalendářního dne; pokud je null či menší než nula, není známo. V některých případech může být od_t == do_t; v některých případech může být i od_t > do_t -- platné pouze v případě, že během stena dojde k změně kalendářního dne (například 23:50 - 00:00).'),
         }
+        return SpecifikaceUnl([path], header, 'steno')
 
-        _df = pd.read_csv(path, sep="|", names = header,  index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, 'steno')
-        self.rozsir_meta(header, tabulka='steno', vlastni=False)
+    def nacti_steno(self):
+        df, _df = self.nacti_tabulku(self.specifikace_steno())
 
         # TODO: zkombinul od_steno a od_t !!!
         # Přidej sloupec 'od_schuze' typu datetime
@@ -31,23 +31,23 @@ class TabulkaStenoMixin(object):
 
 
 class TabulkaStenoBodMixin(object):
-    def nacti_steno_bod(self):
+    def specifikace_steno_bod(self):
         path = f"{self.parameters['data_dir']}/steno_bod.unl"
         header = {
                 'id_steno': MItem('Int64', 'Identifikátor stenozáznamu, viz steno:id_steno.'),
                 'aname': MItem('Int64', 'Pozice v indexu jednacího dne.'),
                 'id_bod': MItem('Int64', 'Identifikace bodu pořadu schůze, viz bod_schuze:id_bod. Je-li null či 0, pak pro daný úsek stenozáznamů není známo číslo bodu (např. každé přerušení schůze znamená při automatickém zpracování neznámé číslo bodu).')
         }
+        return SpecifikaceUnl([path], header, 'steno_bod')
 
-        _df = pd.read_csv(path, sep="|", names = header,  index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, 'steno_bod')
-        self.rozsir_meta(header, tabulka='steno_bod', vlastni=False)
+    def nacti_steno_bod(self):
+        df, _df = self.nacti_tabulku(self.specifikace_steno_bod())
 
         self.tbl['steno_bod'], self.tbl['_steno_bod'] = df, _df
 
 
 class TabulkaStenoRecniciMixin(object):
-    def nacti_steno_recniky(self):
+    def specifikace_steno_recnici(self):
         path = f"{self.parameters['data_dir']}/rec.unl"
         header = {
                 'id_steno': MItem('Int64', 'Identifikátor stenozáznamu, viz Steno:id_steno.'),
@@ -56,10 +56,10 @@ class TabulkaStenoRecniciMixin(object):
                 'id_bod': MItem('Int64', 'Identifikace bodu pořadu schůze, viz bod_schuze:id_bod. Je-li null či 0, pak pro daný úsek stenozáznamů není známo číslo bodu (např. každé přerušení schůze znamená při automatickém zpracování neznámé číslo bodu).'),
                 'druh__ORIG': MItem('Int64', 'Druh vystoupení řečníka: 0 či null - neznámo, 1 - nezpracováno, 2 - předsedající (ověřeno), 3 - řečník (ověřeno), 4 - předsedající, 5 - řečník.'),
         }
+        return SpecifikaceUnl([path], header, 'steno_recnici')
 
-        _df = pd.read_csv(path, sep="|", names = header,  index_col=False, encoding='cp1250')
-        df = pretypuj(_df, header, 'steno_recnici')
-        self.rozsir_meta(header, tabulka='steno_recnici', vlastni=False)
+    def nacti_steno_recniky(self):
+        df, _df = self.nacti_tabulku(self.specifikace_steno_recnici())
 
         mask = { None: 'neznámo', 0: 'neznámo', 1: 'nezpracováno', 2: 'předsedající (ověřeno)',
             3: 'řečník (ověřeno)', 4: 'předsedající', 5: 'řečník' }
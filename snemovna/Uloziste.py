@@ -0,0 +1,86 @@
+# Úložiště textů stenozáznamů
+# Texty promluv se ukládají ve formátu Parquet rozdělené do oddílů po schůzích.
+# Při načítání lze vybrat jen některé schůze (vynechají se celé soubory), osoby a období (filtr se vyhodnocuje v pyarrow
+# při čtení, nevybrané řádky se do pandas vůbec nepřevádí) a jen některé sloupce (ostatní se nečtou).
+
+import os
+import re
+import glob
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.dataset as ds
+
+from snemovna.setup_logger import log
+
+
+class UlozisteStenotextu(object):
+    """Úložiště tabulky steno_texty v adresáři 'adresar'.
+
+    Každá schůze má vlastní soubor 'schuze-XXX.parquet', oddíl se zapisuje vždy celý (viz zapis()).
+    Výběr při načítání viz nacti().
+    """
+
+    def __init__(self, adresar):
+        self.adresar = adresar
+
+    def cesta(self, schuze):
+        return f"{self.adresar}/schuze-{schuze:03d}.parquet"
+
+    def schuze(self):
+        """Vrátí seřazený seznam schůzí, které jsou v úložišti."""
+        soubory = glob.glob(f"{self.adresar}/schuze-*.parquet")
+        return sorted(int(re.match(r'schuze-([0-9]+)\.parquet$', os.path.basename(s)).group(1)) for s in soubory)
+
+    def sloupce(self):
+        """Vrátí seznam sloupců uložené tabulky (podle prvního oddílu), případně None, pokud je úložiště prázdné."""
+        schuze = self.schuze()
+        if len(schuze) == 0:
+            return None
+        return ds.dataset(self.cesta(schuze[0]), format='parquet').schema.names
+
+    def je_prazdne(self):
+        return len(self.schuze()) == 0
+
+    def zapis(self, schuze, df):
+        """Zapíše (přepíše) oddíl schůze 'schuze'."""
+        Path(self.adresar).mkdir(parents=True, exist_ok=True)
+        path = self.cesta(schuze)
+        df.to_parquet(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+
+    def nacti_oddil(self, schuze):
+        """Vrátí celý oddíl schůze 'schuze', případně None, pokud v úložišti chybí."""
+        path = self.cesta(schuze)
+        if not os.path.exists(path):
+            return None
+        return pd.read_parquet(path)
+
+    def nacti(self, schuze=None, osoby=None, od=None, do=None, sloupce=None, tzn=None):
+        """Načte promluvy z úložiště.
+
+        schuze : seznam schůzí, None = všechny
+        osoby : seznam id_osoba; načtou se i promluvy bez id_osoba (řečník se doplňuje až dodatečně, viz Stenotexty)
+        od, do : rozsah sloupce 'date' (včetně), None = neomezeno; časy bez časové zóny se lokalizují do 'tzn'
+        sloupce : seznam načítaných sloupců, None = všechny
+        """
+        vybrane = self.schuze() if schuze is None else [s for s in self.schuze() if s in set(schuze)]
+        log.debug(f"UlozisteStenotextu: Načítám {len(vybrane)} oddílů z '{self.adresar}'.")
+        # Bez vybraných oddílů čteme (prázdný výběr) z prvního oddílu, aby měl výsledek správné sloupce a typy
+        dataset = ds.dataset([self.cesta(s) for s in (vybrane if len(vybrane) > 0 else self.schuze()[:1])], format='parquet')
+
+        podminka = None
+        def a_zaroven(podminka, p):
+            return p if podminka is None else podminka & p
+
+        if schuze is not None:
+            podminka = a_zaroven(podminka, ds.field('schuze').isin(list(schuze)))
+        if osoby is not None:
+            podminka = a_zaroven(podminka, ds.field('id_osoba').isin(list(osoby)) | ds.field('id_osoba').is_null())
+        for hranice, porovnej in [(od, lambda f, t: f >= t), (do, lambda f, t: f <= t)]:
+            if hranice is not None:
+                t = pd.Timestamp(hranice)
+                t = t.tz_localize(tzn) if (t.tzinfo is None) and (tzn is not None) else t
+                podminka = a_zaroven(podminka, porovnej(ds.field('date'), t))
+
+        return dataset.to_table(columns=sloupce, filter=podminka).to_pandas()
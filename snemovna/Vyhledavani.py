@@ -0,0 +1,126 @@
+# Fulltextové vyhledávání v textech stenozáznamů
+# Invertovaný index: pro každé slovo (token) seřazený seznam promluv, ve kterých se vyskytuje.
+# Slova se normalizují na malá písmena bez diakritiky, dotaz 'zákon' tedy najde i 'Zákon' a 'zakon'.
+# Dotaz na začátek slova se zapisuje s hvězdičkou, např. 'zákon*' najde i 'zákona', 'zákonů' atp.
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from snemovna.setup_logger import log
+
+
+def normalizuj(texty):
+    """Převede texty (pd.Series) na malá písmena bez diakritiky."""
+    return texty.astype('string').str.lower().str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+
+
+def tokenizuj(texty):
+    """Rozdělí texty (pd.Series) na slova, vrátí pd.Series slov s indexem původního textu."""
+    return normalizuj(texty).str.findall(r'[a-z0-9]+').explode().dropna()
+
+
+class IndexStenotextu(object):
+    """Invertovaný index nad promluvami (tabulka Stenotexty).
+
+    Promluva je identifikována číslem 'doc', k němu tabulka 'dokumenty' drží
+    schůzi, stenozáznam (turn), pořadí promluvy ve stenozáznamu, osobu a datum.
+    Výskyty slov jsou uloženy ve tvaru CSR: seřazený slovník 'tokeny', začátky
+    seznamů promluv 'zacatky' a zřetězené seznamy promluv 'docs'.
+    """
+
+    def __init__(self, dokumenty, vyskyty):
+        self.dokumenty = dokumenty.set_index('doc', drop=False).sort_index()
+        vyskyty = vyskyty.sort_values(['token', 'doc'], ignore_index=True)
+        self.tokeny, zacatky = np.unique(vyskyty.token.to_numpy(dtype=object), return_index=True)
+        self.zacatky = np.append(zacatky, len(vyskyty))
+        self.docs = vyskyty.doc.to_numpy(dtype=np.int64)
+
+    @classmethod
+    def z_tabulky(cls, df, prvni_doc=0):
+        """Vytvoří index z tabulky promluv se sloupci 'schuze', 'turn', 'id_osoba', 'date', 'text' a případně 'poradi'."""
+        df = df.reset_index(drop=True)
+        dokumenty = pd.DataFrame({
+            'doc': np.arange(prvni_doc, prvni_doc + len(df), dtype=np.int64),
+            'schuze': df.schuze.astype('Int64'),
+            'turn': df.turn.astype('Int64'),
+            'poradi': (df.poradi if 'poradi' in df.columns else df.groupby(['schuze', 'turn']).cumcount()).astype('Int64'),
+            'id_osoba': df.id_osoba.astype('Int64'),
+            'date': df.date,
+        })
+        slova = tokenizuj(df.text)
+        vyskyty = pd.DataFrame({'token': slova.to_numpy(dtype=object), 'doc': dokumenty.doc.to_numpy()[slova.index]}).drop_duplicates()
+        log.debug(f"IndexStenotextu: {len(dokumenty)} promluv, {len(vyskyty)} výskytů slov.")
+        return cls(dokumenty, vyskyty)
+
+    def vyskyty(self):
+        """Vrátí výskyty slov jako tabulku (token, doc)."""
+        return pd.DataFrame({'token': np.repeat(self.tokeny, np.diff(self.zacatky)), 'doc': self.docs})
+
+    def aktualizuj(self, df, turny):
+        """Nahradí promluvy stenozáznamů 'turny' = [(schuze, turn), ...] promluvami z tabulky 'df'."""
+        turny = pd.MultiIndex.from_tuples(list(turny), names=['schuze', 'turn'])
+        klic = pd.MultiIndex.from_frame(self.dokumenty[['schuze', 'turn']].astype('int64'))
+        stare = self.dokumenty.doc[klic.isin(turny)].to_numpy()
+
+        df = df[pd.MultiIndex.from_frame(df[['schuze', 'turn']].astype('int64')).isin(turny)]
+        novy = self.z_tabulky(df, prvni_doc=int(self.dokumenty.doc.max()) + 1 if len(self.dokumenty) > 0 else 0)
+
+        vyskyty = self.vyskyty()
+        dokumenty = pd.concat([self.dokumenty[~self.dokumenty.doc.isin(stare)], novy.dokumenty], ignore_index=True)
+        vyskyty = pd.concat([vyskyty[~vyskyty.doc.isin(stare)], novy.vyskyty()], ignore_index=True)
+        self.__init__(dokumenty, vyskyty)
+
+    def najdi_token(self, token):
+        """Vrátí seřazené promluvy (doc) obsahující normalizované slovo 'token'; 'token*' hledá začátek slova."""
+        if token.endswith('*'):
+            zacatek = token[:-1]
+            od = np.searchsorted(self.tokeny, zacatek, side='left')
+            do = np.searchsorted(self.tokeny, zacatek + '\x7f', side='left') # tokeny obsahují jen znaky ASCII
+            return np.unique(self.docs[self.zacatky[od]:self.zacatky[do]])
+        i = np.searchsorted(self.tokeny, token)
+        if (i == len(self.tokeny)) or (self.tokeny[i] != token):
+            return np.array([], dtype=np.int64)
+        return self.docs[self.zacatky[i]:self.zacatky[i + 1]]
+
+    def hledej(self, dotaz, vse=True):
+        """Vrátí promluvy obsahující všechna slova dotazu (vse=True), nebo alespoň jedno z nich (vse=False)."""
+        slova = [s for s in dotaz.split() if len(s) > 0]
+        tokeny = []
+        for s in slova:
+            t = tokenizuj(pd.Series([s.rstrip('*')])).to_list()
+            if s.endswith('*') and len(t) > 0:
+                t[-1] += '*'
+            tokeny += t
+
+        vysledek = None
+        for t in tokeny:
+            docs = self.najdi_token(t)
+            if vysledek is None:
+                vysledek = docs
+            else:
+                vysledek = np.intersect1d(vysledek, docs) if vse else np.union1d(vysledek, docs)
+        if vysledek is None:
+            vysledek = np.array([], dtype=np.int64)
+
+        return self.dokumenty.loc[vysledek].sort_values(['schuze', 'turn', 'poradi']).reset_index(drop=True)
+
+    @staticmethod
+    def cesty(adresar):
+        return f"{adresar}/index-dokumenty.parquet", f"{adresar}/index-vyskyty.parquet"
+
+    def uloz(self, adresar):
+        Path(adresar).mkdir(parents=True, exist_ok=True)
+        for df, path in zip([self.dokumenty.reset_index(drop=True), self.vyskyty()], self.cesty(adresar)):
+            df.to_parquet(f"{path}.tmp", index=False)
+            os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def nacti(cls, adresar):
+        """Načte index uložený v adresáři 'adresar', případně vrátí None, pokud tam není."""
+        dokumenty, vyskyty = cls.cesty(adresar)
+        if not (os.path.exists(dokumenty) and os.path.exists(vyskyty)):
+            return None
+        return cls(pd.read_parquet(dokumenty), pd.read_parquet(vyskyty))
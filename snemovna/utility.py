@@ -1,16 +1,21 @@
 
+import os
+import json
+import hashlib
 import requests
+from os import path
 from pathlib import Path
 from os import listdir #, path # TODO: asi stačí buď jen Path, nebo path
 import zipfile
 
 import pandas as pd
 from IPython.display import display
-#import numpy as np
+import numpy as np
 
 import plotly.graph_objects as go
 
 from snemovna.Helpers import *
+from snemovna.Hierarchie import Hierarchie
 from snemovna.setup_logger import log
 
 
@@ -18,20 +23,93 @@ from snemovna.setup_logger import log
 # Stahování dat
 
 def download_and_unzip(url, zip_file_name, data_dir):
-    log.info(f"Stahuji '{url}'.")
+    """
+    Stáhne zip soubor z 'url' a rozbalí ho do 'data_dir'.
+
+    Validátory odpovědi serveru (ETag, Last-Modified) a hash staženého souboru se ukládají vedle zipu
+    do '{zip_file_name}.json'. Při dalším stahování se posílá podmíněný požadavek
+    (If-None-Match, If-Modified-Since); pokud se archiv nezměnil, nestahuje se ani nerozbaluje znovu.
+    Vrací True, pokud byla data nově rozbalena.
+    """
     log.debug(f"Vytvářím adresář: '{data_dir}'")
     Path(data_dir).mkdir(parents=True, exist_ok=True)
 
-    log.debug(f"Stahuji data z: '{url}'")
-    r = requests.get(url)
-    with open(zip_file_name, 'wb') as f:
-        f.write(r.content)
-    log.debug(f"Status: {r.status_code}, headers: {r.headers['content-type']}, encoding: {r.encoding}")
+    validators_path = f"{zip_file_name}.json"
+    validators = load_download_validators(validators_path) if path.isfile(zip_file_name) else {}
 
+    headers = {}
+    if validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+
+    log.debug(f"Stahuji data z: '{url}', podmínky: {headers}")
+    r = requests.get(url, headers=headers, stream=True)
+
+    if r.status_code == 304:
+        r.close()
+        log.info(f"Data '{url}' se od posledního stažení nezměnila.")
+        if is_unzipped(zip_file_name, data_dir):
+            return False
+        log.debug(f"Rozbalená data v '{data_dir}' chybí, rozbaluji znovu.")
+        unzip(zip_file_name, data_dir)
+        return True
+
+    r.raise_for_status()
+    log.info(f"Stahuji '{url}'.")
+    log.debug(f"Status: {r.status_code}, headers: {r.headers.get('content-type')}, encoding: {r.encoding}")
+
+    h = hashlib.sha1()
+    tmp_file_name = f"{zip_file_name}.part"
+    with open(tmp_file_name, 'wb') as f:
+        for chunk in r.iter_content(chunk_size=1 << 20):
+            f.write(chunk)
+            h.update(chunk)
+    os.replace(tmp_file_name, zip_file_name)
+
+    sha1 = h.hexdigest()
+    zmena = (sha1 != validators.get('sha1')) or (not is_unzipped(zip_file_name, data_dir))
+    if zmena:
+        unzip(zip_file_name, data_dir)
+    else:
+        log.info(f"Obsah '{url}' se nezměnil, rozbalení přeskakuji.")
+
+    save_download_validators(validators_path, dict(
+        url=url,
+        etag=r.headers.get('ETag'),
+        last_modified=r.headers.get('Last-Modified'),
+        sha1=sha1
+    ))
+    return zmena
+
+def unzip(zip_file_name, data_dir):
     log.debug(f"Rozbaluji data do: '{data_dir}'")
     with zipfile.ZipFile(zip_file_name, 'r') as zip_ref:
         zip_ref.extractall(data_dir)
 
+def is_unzipped(zip_file_name, data_dir):
+    """Ověří, že v 'data_dir' existují všechny soubory ze zip archivu."""
+    try:
+        with zipfile.ZipFile(zip_file_name, 'r') as zip_ref:
+            names = [n for n in zip_ref.namelist() if not n.endswith('/')]
+    except (OSError, zipfile.BadZipFile):
+        return False
+    return all(path.isfile(path.join(data_dir, n)) for n in names)
+
+def load_download_validators(validators_path):
+    if not path.isfile(validators_path):
+        return {}
+    try:
+        with open(validators_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        log.warning(f"Nelze načíst validátory stahování z '{validators_path}': {e}")
+        return {}
+
+def save_download_validators(validators_path, validators):
+    with open(validators_path, 'w', encoding='utf-8') as f:
+        json.dump(validators, f)
+
 
 #######################################################################
 # Popis dat v pandas tabulkách
@@ -61,8 +139,9 @@ def popis_tabulku(frame, meta=None, schovej=[]):
     })#.set_index('sloupec')#sort_values(by="počet unikátních hodnot", ascending=False)
 
     if isinstance(meta, pd.DataFrame):
+        meta = meta.reindex(out.sloupec)
         for column in meta:
-            out[column] = meta[column]
+            out[column] = meta[column].values
 
     sloupce_s_jedinou_hodnotou = out[out["počet unikátních hodnot"] == 1]
     if len(sloupce_s_jedinou_hodnotou) == 0:
@@ -155,19 +234,54 @@ def strip_all_string_columns(df):
 
 def mask_by_values(series, mask):
     """
-    Masks the values of a series according to adictionary
+    Masks the values of a series according to a dictionary.
+
+    Values missing in the dictionary are kept. Missing values (NA) are kept as well,
+    unless the dictionary has a None key, in which case they are masked by its value.
+    The series is factorized first, so the dictionary is consulted only once per unique value.
     """
-    if True: #(series.dtype == pd.Int64Dtype()):
-        series = series.astype(object)
+    na_keys = [k for k in mask.keys() if pd.isna(k)]
+    codes, uniques = pd.factorize(series)
 
-    new_series = series.copy()
+    values = np.empty(len(uniques) + 1, dtype=object)
+    values[:-1] = [mask.get(u, u) for u in uniques]
+    values[-1] = mask[na_keys[0]] if len(na_keys) > 0 else np.nan # kód -1 (NA)
+    new_series = pd.Series(values[codes], index=series.index, name=series.name)
 
-    for val_to_mask in series.unique():
-        if val_to_mask in mask.keys(): # mask it
-            new_series = new_series.mask(series == val_to_mask, mask[val_to_mask])
+    if len(na_keys) == 0:
+        na = codes == -1
+        if na.any():
+            new_series[na] = series[na].astype(object)
 
     return new_series
 
+def downcast_integers(series):
+    """
+    Převede celočíselný sloupec na nejmenší celočíselný typ, do kterého se vejdou jeho hodnoty.
+    Sloupce s chybějícími hodnotami zůstanou nullable (např. 'Int16'), ostatní se převedou na numpy typy (např. 'int16').
+    """
+    has_na = series.isna().any()
+    values = series.dropna()
+    lo, hi = (int(values.min()), int(values.max())) if len(values) > 0 else (0, 0)
+    for dtype in ['int8', 'int16', 'int32', 'int64']:
+        info = np.iinfo(dtype)
+        if (info.min <= lo) and (hi <= info.max):
+            break
+    return series.astype(dtype.capitalize() if has_na else dtype)
+
+def concat_chunks(chunks):
+    """
+    Spojí tabulky (např. dávky z generátoru) do jedné tabulky s novým indexem.
+    Kategorické sloupce zůstanou kategorické, jejich kategorie se sjednotí v pořadí prvního výskytu.
+    """
+    chunks = list(chunks)
+    categorical = [col for col in chunks[0].columns if pd.api.types.is_categorical_dtype(chunks[0][col])] if len(chunks) > 0 else []
+    for col in categorical:
+        categories = list(dict.fromkeys(c for chunk in chunks for c in chunk[col].cat.categories))
+        for chunk in chunks:
+            chunk[col] = chunk[col].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
 def format_to_datetime_and_report_skips(df, col, to_format):
     srs = df[col]
     new_srs = pd.to_datetime(srs[~srs.isna()], format=to_format, errors="coerce")
@@ -190,6 +304,75 @@ def sort_column_by_predefined_order(column, ordered_list, how='head'):
     return column.map(correspondence)
 
 
+#######################################################################
+# Spojování tabulek podle časových intervalů
+
+def _datetime_to_int(srs, fill):
+    """Převede sloupec typu datetime na int64 (ns od epochy, UTC), NaT nahradí hodnotou 'fill'."""
+    if getattr(srs.dt, 'tz', None) is not None:
+        srs = srs.dt.tz_convert('UTC').dt.tz_localize(None)
+    values = srs.values.astype('datetime64[ns]').view('int64')
+    return np.where(srs.isna().values, fill, values)
+
+def interval_join(df, intervals, on, by, start, end, columns, indicator=None):
+    """
+    Ke každému řádku tabulky 'df' najde interval z tabulky 'intervals' se stejnou hodnotou klíče 'by',
+    do kterého spadá čas 'on' (start <= on <= end), a připojí z něj sloupce 'columns'.
+
+    Hledá se pomocí as-of joinu (pd.merge_asof) nad tabulkami seřazenými podle času, tj. pro každý řádek
+    se vezme interval s nejpozdějším začátkem před časem 'on'. Předpokládá se, že se intervaly
+    pro daný klíč nepřekrývají. Chybějící začátek či konec intervalu (NaT) znamená otevřený interval.
+    Časy s časovou zónou se porovnávají v UTC, kombinace časů s časovou zónou a bez ní není povolena.
+    Náročnost je O(n log n) v počtu řádků obou tabulek (namísto O(n * m) při maskování po intervalech).
+
+    Vrací tabulku se sloupci 'columns' a indexem tabulky 'df'. Kde interval nebyl nalezen, jsou hodnoty NA.
+    Pokud je zadán 'indicator', přidá se sloupec tohoto jména s příznakem nalezení intervalu.
+    """
+    tz = {c: getattr(srs.dt, 'tz', None) is not None for c, srs in [(on, df[on]), (start, intervals[start]), (end, intervals[end])]}
+    if len(set(tz.values())) > 1:
+        raise ValueError(f"Nelze porovnávat časy s časovou zónou a bez ní: {tz}")
+
+    intervals = intervals.reset_index(drop=True)
+
+    # Klíče převedeme na společné celočíselné kódy (-1 pro NA či chybějící klíč), merge_asof si neporadí s typy jako 'Int64'
+    categories = pd.unique(intervals[by].dropna())
+    left_by = pd.Categorical(df[by], categories=categories).codes
+    right_by = pd.Categorical(intervals[by], categories=categories).codes
+
+    left = pd.DataFrame({
+        '_by': left_by,
+        '_t': _datetime_to_int(df[on], np.iinfo('int64').min),
+        '_row': np.arange(len(df))
+    })[(left_by >= 0) & df[on].notna().values]
+
+    ends = _datetime_to_int(intervals[end], np.iinfo('int64').max)
+    right = pd.DataFrame({
+        '_by': right_by,
+        '_start': _datetime_to_int(intervals[start], np.iinfo('int64').min),
+        '_interval': np.arange(len(intervals))
+    })[right_by >= 0]
+
+    m = pd.merge_asof(
+        left.sort_values('_t'), right.sort_values('_start'),
+        left_on='_t', right_on='_start', by='_by',
+        direction='backward', allow_exact_matches=True
+    )
+    m = m[m._interval.notna()]
+    rows, found = m._row.values, m._interval.values.astype('int64')
+
+    # Konec intervalu kontrolujeme až po joinu (bez převodu na float, který by ztratil přesnost)
+    inside = m._t.values <= ends[found]
+
+    positions = np.full(len(df), -1, dtype='int64')
+    positions[rows[inside]] = found[inside]
+
+    ret = intervals[columns].reindex(positions)
+    ret.index = df.index
+    if indicator is not None:
+        ret[indicator] = positions >= 0
+    return ret
+
+
 #######################################################################
 # Zobrazování dat v pandas tabulkách
 
@@ -226,12 +409,8 @@ def groupby_bar(df, by, xlabel=None, ylabel=None, title=''):
 #    return ids
 
 def expand_hierarchy(df, id_field, parent_field, to_expand):
-    children = df[df[parent_field].isin(to_expand)]
-    if len(children) > 0:
-        new_to_expand = [child[id_field] for idx, child in children.iterrows()]
-        return to_expand + expand_hierarchy(df, id_field, parent_field, new_to_expand)
-    else:
-        return to_expand
+    """Vrátí identifikátory 'to_expand' a všech jejich (i nepřímých) potomků. Pro opakované dotazy viz Hierarchie."""
+    return list(Hierarchie.z_tabulky(df, id_field, parent_field).potomci(to_expand))
 
 
 #######################################################################
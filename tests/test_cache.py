@@ -0,0 +1,65 @@
+import os
+import unittest
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from snemovna.Cache import CacheTabulek
+from snemovna.Helpers import MItem
+from snemovna.Snemovna import SnemovnaDataFrame
+from snemovna.Planovac import SpecifikaceUnl
+
+class TestCacheTabulek(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = f"{self.tmp.name}/tabulka.unl"
+        with open(self.path, 'w', encoding='cp1250') as f:
+            f.write("1|a|\n2|b|\n")
+        self.cache = CacheTabulek(f"{self.tmp.name}/cache")
+        self.hlavicka = CacheTabulek.popis_hlavicky({'id': MItem('Int64', 'Identifikátor'), 'x': MItem('string', 'Hodnota')})
+        self.df = pd.DataFrame({'id': [1, 2], 'x': ['a', 'b']}).astype({'id': 'Int64', 'x': 'string'})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_nacti_ulozenou_tabulku(self):
+        self.assertIsNone(self.cache.nacti('tabulka', [self.path], self.hlavicka))
+        self.cache.uloz('tabulka', [self.path], self.hlavicka, self.df)
+        pd.testing.assert_frame_equal(self.cache.nacti('tabulka', [self.path], self.hlavicka), self.df)
+
+    def test_zmena_casu_bez_zmeny_obsahu(self):
+        self.cache.uloz('tabulka', [self.path], self.hlavicka, self.df)
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertIsNotNone(self.cache.nacti('tabulka', [self.path], self.hlavicka))
+
+    def test_zmena_obsahu(self):
+        self.cache.uloz('tabulka', [self.path], self.hlavicka, self.df)
+        st = os.stat(self.path)
+        with open(self.path, 'w', encoding='cp1250') as f:
+            f.write("1|a|\n3|b|\n")
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertIsNone(self.cache.nacti('tabulka', [self.path], self.hlavicka))
+
+    def test_zmena_hlavicky(self):
+        self.cache.uloz('tabulka', [self.path], self.hlavicka, self.df)
+        hlavicka = CacheTabulek.popis_hlavicky({'id': MItem('Int64', 'Identifikátor'), 'x': MItem('string', 'Hodnota')}, encoding='ISO-8859-2')
+        self.assertIsNone(self.cache.nacti('tabulka', [self.path], hlavicka))
+
+    def test_precti_unl_z_cache(self):
+        sdf = SnemovnaDataFrame(data_dir=self.tmp.name)
+        spec = SpecifikaceUnl([self.path], {'id': MItem('Int64', 'Identifikátor'), 'x': MItem('string', 'Hodnota')}, 'tabulka')
+        sdf.precti_unl(spec)
+        df, _df = sdf.precti_unl(spec)
+        pd.testing.assert_frame_equal(df, self.df)
+
+        # Z cache se vrací mělká kopie: data se sdílí, sloupce přidané do přetypované tabulky se v surové neobjeví
+        self.assertIsNot(df, _df)
+        self.assertTrue(np.shares_memory(df.id.array._data, _df.id.array._data))
+        df['novy'] = 1
+        self.assertNotIn('novy', _df.columns)
+
+if __name__ == '__main__':
+    unittest.main()
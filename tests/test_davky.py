@@ -0,0 +1,40 @@
+import unittest
+import tempfile
+
+import pandas as pd
+
+from snemovna.utility import concat_chunks
+from snemovna.TabulkyHlasovani import TabulkaHlasovaniPoslanciMixin
+
+class TestCteniPoDavkach(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with open(f"{self.tmp.name}/hl2017h1.unl", 'w', encoding='cp1250') as f:
+            f.write("10|100|A|\n11|100|N|\n10|101|@|\n11|101|A|\n")
+        with open(f"{self.tmp.name}/hl2017h2.unl", 'w', encoding='cp1250') as f:
+            f.write("10|102|X|\n12|102|A|\n")
+
+        self.hp = TabulkaHlasovaniPoslanciMixin()
+        self.hp.parameters = {'data_dir': self.tmp.name}
+        self.hp.volebni_obdobi = 2017
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_davky(self):
+        davky = list(self.hp.cti_hlasovani_poslanci(3, id_poslanec=[10, 11]))
+        self.assertEqual([len(d) for d in davky], [3, 1, 1])
+
+        df = concat_chunks(davky)
+        self.assertEqual(df.id_poslanec.to_list(), [10, 11, 10, 11, 10])
+        self.assertEqual(df.vysledek.to_list(), ['ano', 'ne', 'nepřihlášení', 'ano', 'X'])
+
+    def test_kompaktni_davky(self):
+        df = concat_chunks(self.hp.cti_hlasovani_poslanci(2, kompaktni=True, id_hlasovani=[101, 102]))
+        self.assertTrue(pd.api.types.is_categorical_dtype(df.vysledek__ORIG))
+        self.assertEqual(df.vysledek__ORIG.to_list(), ['@', 'A', 'X', 'A'])
+        self.assertEqual(df.vysledek.to_list(), ['nepřihlášení', 'ano', 'X', 'ano'])
+
+if __name__ == '__main__':
+    unittest.main()
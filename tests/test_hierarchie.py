@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from snemovna.Hierarchie import Hierarchie
+from snemovna.utility import expand_hierarchy
+
+# Původní rekurzivní rozbalení hierarchie (před zavedením indexu Hierarchie)
+def rozbal(df, to_expand):
+    children = df[df.organ_id_organ.isin(to_expand)]
+    if len(children) > 0:
+        return to_expand + rozbal(df, list(children.id_organ))
+    return to_expand
+
+class TestHierarchie(unittest.TestCase):
+
+    def setUp(self):
+        # 1 (parlament) -> 10 (sněmovna) -> 100, 101 (výbory) -> 1000 (podvýbor); 2 samostatný kořen
+        self.df = pd.DataFrame({
+            'id_organ': pd.array([1, 10, 100, 101, 1000, 2], dtype='Int64'),
+            'organ_id_organ': pd.array([None, 1, 10, 10, 100, None], dtype='Int64'),
+        })
+        self.h = Hierarchie.z_tabulky(self.df)
+
+    def test_dotazy(self):
+        self.assertEqual(self.h.potomci([10]).tolist(), [10, 100, 101, 1000])
+        self.assertEqual(self.h.potomci([10], vcetne=False).tolist(), [100, 101, 1000])
+        self.assertEqual(self.h.potomci([101, 2, 5]).tolist(), [2, 5, 101])
+        self.assertEqual(self.h.predci(1000), [100, 10, 1])
+        self.assertEqual(self.h.je_potomek([1000, 101, 10, 2, 7], 10).tolist(), [True, True, False, False, False])
+        self.assertEqual(self.h.koren([1000, 2, 7]).tolist(), [1, 2, 7])
+        self.assertEqual(sorted(expand_hierarchy(self.df, 'id_organ', 'organ_id_organ', [100])), [100, 1000])
+
+    def test_cyklus(self):
+        df = pd.DataFrame({'id_organ': [1, 2, 3, 4], 'organ_id_organ': pd.array([3, 1, 2, 2], dtype='Int64')})
+        h = Hierarchie.z_tabulky(df)
+        self.assertEqual(h.potomci([1]).tolist(), [1, 2, 3, 4])
+        self.assertEqual(len(h.predci(4)), len(set(h.predci(4))))
+
+    def test_shoda_s_rekurzi(self):
+        rng = np.random.default_rng(0)
+        n = 300
+        ids = rng.permutation(np.arange(1, n + 1) * 7)
+        rodice = [None] + [int(ids[rng.integers(0, i)]) if rng.random() > 0.05 else None for i in range(1, n)]
+        df = pd.DataFrame({'id_organ': pd.array(ids, dtype='Int64'), 'organ_id_organ': pd.array(rodice, dtype='Int64')})
+        h = Hierarchie.z_tabulky(df)
+        for koren in rng.choice(ids, 20):
+            self.assertEqual(h.potomci([koren]).tolist(), sorted(set(rozbal(df, [koren]))))
+            potomci = h.potomci([koren], vcetne=False)
+            self.assertTrue(h.je_potomek(potomci, koren).all())
+            self.assertEqual(h.je_potomek(ids, koren).sum(), len(potomci))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,7 @@ import unittest
 
 import pandas as pd
 
-from snemovna.Hlasovani import Hlasovani
+from snemovna.Hlasovani import Hlasovani, HlasovaniPoslanci
 
 class TestHlasovani(unittest.TestCase):
 
@@ -31,6 +31,51 @@ class TestHlasovani(unittest.TestCase):
         #self.assertIsInstance(TestHlasovani.tbl['_hlasovani'], pd.core.frame.DataFrame)
         pass
 
+# Původní oprava klubů po zařazeních (před zavedením interval_join)
+def oprav_smyckou(hp, zarazeni_osoby_kluby):
+    s = zarazeni_osoby_kluby.groupby('id_osoba').size()
+    for id_osoba in s[s > 1].index:
+        for idx, row in zarazeni_osoby_kluby[zarazeni_osoby_kluby.id_osoba == id_osoba].iterrows():
+            mask = (hp.id_osoba == id_osoba) & (hp.datum >= row['od_klub']) & ((hp.datum <= row['do_klub']) | pd.isna(row['do_klub']))
+            for col in ['id_klub', 'nazev_klub_cz', 'zkratka_klub']:
+                hp[col] = hp[col].mask(mask, row[col])
+
+class TestOpravKlubu(unittest.TestCase):
+
+    def setUp(self):
+        tz = 'Europe/Prague'
+        cas = lambda x: pd.to_datetime(x).tz_localize(tz)
+        # Osoba 1 přestoupila z klubu 10 do klubu 11, osoba 2 byla jen v klubu 12, osoba 3 z klubu 10 do 13 a pak byla nezařazená
+        self.zarazeni = pd.DataFrame({
+            'id_osoba': pd.array([1, 1, 2, 3, 3], dtype='Int64'),
+            'id_klub': pd.array([10, 11, 12, 10, 13], dtype='Int64'),
+            'nazev_klub_cz': pd.array(['Klub 10', 'Klub 11', 'Klub 12', 'Klub 10', 'Klub 13'], dtype='string'),
+            'zkratka_klub': pd.array(['K10', 'K11', 'K12', 'K10', 'K13'], dtype='string'),
+            'od_klub': cas(['2017-10-26', '2019-01-02', '2017-10-26', '2017-10-26', '2018-07-01']),
+            'do_klub': cas(['2019-01-01', None, None, '2018-06-30', '2018-12-31']),
+        })
+        # Před opravou mají všechna hlasování poslední klub osoby
+        posledni = self.zarazeni.groupby('id_osoba').tail(1).set_index('id_osoba')
+        self.hp = pd.DataFrame({
+            'id_osoba': pd.array([1, 1, 1, 1, 1, 2, 3, 3], dtype='Int64'),
+            'datum': cas([
+                '2018-05-05 10:00', '2019-01-01 00:00', '2019-01-01 12:00', '2019-01-02 00:00', '2030-01-01 10:00',
+                '2016-01-01 10:00', '2018-06-30 00:00', '2019-03-01 10:00'
+            ]),
+        }, index=[20, 21, 22, 23, 24, 25, 26, 27])
+        for col in ['id_klub', 'nazev_klub_cz', 'zkratka_klub']:
+            self.hp[col] = self.hp.id_osoba.map(posledni[col]).astype(posledni[col].dtype)
+
+    def test_kluby_dle_data(self):
+        ocekavane = self.hp.copy()
+        oprav_smyckou(ocekavane, self.zarazeni)
+
+        HlasovaniPoslanci.oprav_kluby_dle_data(self.hp, self.zarazeni)
+        # Více klubů, hlasování v krajní den zařazení (včetně), mezera mezi kluby (beze změny) a otevřený konec zařazení
+        self.assertEqual(list(self.hp.id_klub), [10, 10, 11, 11, 11, 12, 10, 13])
+        self.assertEqual(list(self.hp.zkratka_klub), ['K10', 'K10', 'K11', 'K11', 'K11', 'K12', 'K10', 'K13'])
+        pd.testing.assert_frame_equal(self.hp, ocekavane)
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,49 @@
+import unittest
+import tempfile
+
+import numpy as np
+
+from snemovna.TabulkyHlasovani import TabulkaHlasovaniPoslanciMixin
+
+class TestMaticeHlasovani(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with open(f"{self.tmp.name}/hl2017h1.unl", 'w', encoding='cp1250') as f:
+            f.write("10|100|A|\n11|100|N|\n10|101|@|\n")
+        with open(f"{self.tmp.name}/hl2017h2.unl", 'w', encoding='cp1250') as f:
+            f.write("12|102|X|\n")
+
+        self.hp = TabulkaHlasovaniPoslanciMixin()
+        self.hp.parameters = {'data_dir': self.tmp.name}
+        self.hp.volebni_obdobi = 2017
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_matice(self):
+        m = self.hp.matice()
+        self.assertEqual(m.hodnoty.dtype, np.int8)
+        self.assertEqual(list(m.id_poslanec), [10, 11, 12])
+        self.assertEqual(list(m.id_hlasovani), [100, 101, 102])
+
+        kod = dict(zip(m.vysledky.vysledek__ORIG, m.vysledky.kod))
+        self.assertEqual(m.hodnoty.tolist(), [
+            [kod['A'], kod['@'], -1],
+            [kod['N'], -1, -1],
+            [-1, -1, kod['X']]
+        ])
+        self.assertEqual(m.vysledky.set_index('vysledek__ORIG').vysledek['N'], 'ne')
+
+    def test_memmap(self):
+        soubor = f"{self.tmp.name}/matice.npy"
+        m = self.hp.matice(soubor=soubor)
+        self.assertTrue(np.array_equal(np.load(soubor, mmap_mode='r'), np.asarray(m.hodnoty)))
+
+    def test_chybejici_soubory(self):
+        self.hp.volebni_obdobi = 2013
+        with self.assertRaisesRegex(FileNotFoundError, 'hl2013h'):
+            self.hp.matice()
+
+if __name__ == '__main__':
+    unittest.main()
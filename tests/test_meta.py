@@ -0,0 +1,44 @@
+import unittest
+
+from snemovna.Snemovna import SnemovnaMeta
+
+class TestSnemovnaMeta(unittest.TestCase):
+
+    def setUp(self):
+        self.meta = SnemovnaMeta(
+            index_name='sloupec',
+            dtypes=dict(popis='string', tabulka='string', vlastni='bool', aktivni='bool'),
+            defaults=dict(popis=None, tabulka=None, vlastni=None, aktivni=None),
+        )
+        self.meta.nastav_hodnotu('id_osoba', dict(popis='Identifikátor osoby', tabulka='osoby', vlastni=False))
+        self.meta.nastav_hodnotu('jmeno', dict(popis='Jméno', tabulka='osoby', vlastni=False))
+
+    def test_zapis(self):
+        self.assertIn('id_osoba', self.meta)
+        self.assertEqual(self.meta['jmeno'], dict(popis='Jméno', tabulka='osoby', vlastni=False, aktivni=None))
+        self.assertIsNone(self.meta['neexistuje'])
+
+        # nastav_hodnotu přepíše všechny hodnoty, uprav jen zadané
+        self.meta.uprav('jmeno', aktivni=True)
+        self.assertEqual(self.meta['jmeno']['popis'], 'Jméno')
+        self.meta.nastav_hodnotu('jmeno', dict(tabulka='poslanci'))
+        self.assertEqual(self.meta['jmeno'], dict(popis=None, tabulka='poslanci', vlastni=None, aktivni=None))
+
+        with self.assertRaises(ValueError):
+            self.meta.nastav_hodnotu('jmeno', dict(neznamy_klic=1))
+
+    def test_zaznam_a_popis(self):
+        self.meta._zaznam = []
+        self.meta.nastav_hodnotu('prijmeni', dict(popis='Příjmení'))
+        self.assertEqual(self.meta._zaznam, [('prijmeni', dict(popis='Příjmení'))])
+        self.assertIsNone(self.meta.copy()._zaznam)
+
+        self.meta.serad(['prijmeni'])
+        df = self.meta.popis()
+        self.assertEqual(list(df.index), ['prijmeni', 'id_osoba', 'jmeno'])
+        self.assertEqual(df.index.name, 'sloupec')
+        self.assertEqual(df.popis.dtype, 'string')
+        self.assertEqual(df.vlastni.dtype, 'boolean')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import threading
+
+from snemovna.Planovac import PlanovacNacitani, SpecifikaceUnl
+
+class TestPlanovacNacitani(unittest.TestCase):
+
+    def setUp(self):
+        self.volani = []
+        self.lock = threading.Lock()
+
+    def nacti(self, spec):
+        with self.lock:
+            self.volani.append(spec.tabulka)
+        return spec.tabulka.upper()
+
+    def spec(self, tabulka):
+        return SpecifikaceUnl([f"{tabulka}.unl"], {}, tabulka, 'cp1250', False)
+
+    def test_soubezne_nacteni(self):
+        planovac = PlanovacNacitani(soubezne_max=2)
+        for tabulka in ['osoby', 'organy']:
+            planovac.naplanuj(self.spec(tabulka), self.nacti)
+        planovac.naplanuj(self.spec('osoby'), self.nacti)
+
+        self.assertEqual(planovac.vysledek(self.spec('osoby'), self.nacti), 'OSOBY')
+        self.assertEqual(planovac.vysledek(self.spec('organy'), self.nacti), 'ORGANY')
+        self.assertEqual(sorted(self.volani), ['organy', 'osoby'])
+
+        # Po vyzvednutí všech načtení se executor ukončí
+        self.assertIsNone(planovac.executor)
+
+        # Již načtená tabulka se znovu neplánuje
+        planovac.naplanuj(self.spec('osoby'), self.nacti)
+        self.assertEqual(len(planovac.ulohy), 0)
+        self.assertIsNone(planovac.executor)
+
+        casy = planovac.casy()
+        self.assertEqual(sorted(casy.tabulka), ['organy', 'osoby'])
+        self.assertTrue(casy.soubezne.all())
+
+    def test_postupne_nacteni(self):
+        planovac = PlanovacNacitani(soubezne_max=1)
+        self.assertEqual(planovac.vysledek(self.spec('osoby'), self.nacti), 'OSOBY')
+        self.assertFalse(planovac.casy().soubezne.any())
+
+    def test_zahod(self):
+        planovac = PlanovacNacitani(soubezne_max=2)
+        planovac.naplanuj(self.spec('osoby'), self.nacti)
+        planovac.zahod(['osoby'])
+        self.assertEqual(len(planovac.ulohy), 0)
+        self.assertIsNone(planovac.executor)
+
+    def test_ukonci(self):
+        planovac = PlanovacNacitani(soubezne_max=2)
+        for tabulka in ['osoby', 'organy']:
+            planovac.naplanuj(self.spec(tabulka), self.nacti)
+        executor = planovac.executor
+        planovac.ukonci()
+        self.assertEqual(len(planovac.ulohy), 0)
+        self.assertIsNone(planovac.executor)
+        self.assertTrue(executor._shutdown)
+
+        # Po ukončení lze znovu plánovat
+        planovac.naplanuj(self.spec('funkce'), self.nacti)
+        self.assertEqual(planovac.vysledek(self.spec('funkce'), self.nacti), 'FUNKCE')
+        self.assertIsNone(planovac.executor)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from snemovna.Registr import RegistrTabulek, ZaznamKroku
+
+class TestRegistrTabulek(unittest.TestCase):
+
+    def setUp(self):
+        self.registr = RegistrTabulek()
+        self.zaznam = ZaznamKroku(tbl={'organy': None}, paths={}, meta=[], atributy={})
+
+    def test_najdi_ulozeny_krok(self):
+        self.assertIsNone(self.registr.najdi('./data', 2017, 'Organy'))
+        self.registr.uloz('./data', 2017, 'Organy', self.zaznam)
+        self.assertIs(self.registr.najdi('data', 2017, 'Organy'), self.zaznam)
+        self.assertIsNone(self.registr.najdi('./data', 2013, 'Organy'))
+
+    def test_varianty(self):
+        uplny = self.zaznam
+        projekce = ZaznamKroku(tbl={'osoby': None}, paths={}, meta=[], atributy={}, projekce=(('osoby', (('umrti',), ('umrti',))),))
+        self.registr.uloz('./data', 2017, 'Osoby', uplny)
+        self.registr.uloz('./data', 2017, 'Osoby', projekce)
+        self.assertIs(self.registr.najdi('./data', 2017, 'Osoby', pouzitelny=lambda z: len(z.projekce) > 0), projekce)
+        self.assertIs(self.registr.najdi('./data', 2017, 'Osoby', pouzitelny=lambda z: len(z.projekce) == 0), uplny)
+
+        # Varianta se stejnou projekcí se nahradí
+        self.registr.uloz('./data', 2017, 'Osoby', projekce._replace(tbl={}))
+        self.assertEqual(self.registr.najdi('./data', 2017, 'Osoby', pouzitelny=lambda z: len(z.projekce) > 0).tbl, {})
+
+    def test_zneplatni(self):
+        self.registr.uloz('./data', 2017, 'Organy', self.zaznam)
+        self.registr.uloz('./data', 2013, 'Organy', self.zaznam)
+        self.registr.uloz('./jina_data', 2017, 'Organy', self.zaznam)
+
+        self.registr.zneplatni(data_dir='./data', volebni_obdobi=2013)
+        self.assertNotIn(('./data', 2013), self.registr)
+        self.assertIn(('./data', 2017), self.registr)
+
+        self.registr.zneplatni(data_dir='./data')
+        self.assertNotIn(('./data', 2017), self.registr)
+        self.assertIn(('./jina_data', 2017), self.registr)
+
+        self.registr.zneplatni()
+        self.assertNotIn(('./jina_data', 2017), self.registr)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from snemovna.Snemovna import SnemovnaDataFrame, PREVZETI_BLOKU
+
+class TestNastavDataframe(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = pd.DataFrame({
+            'id_osoba': pd.array([5000, 5001, None], dtype='Int64'),
+            'skore': np.array([1.0, 2.0, 3.0]),
+            'poradi': np.array([3, 2, 1]),
+            'jmeno': pd.array(['Jan', 'Jana', None], dtype='string'),
+            'jmeno__ORIG': ['Jan', 'Jana', None],
+        }, index=[10, 11, 12])
+        self.df = SnemovnaDataFrame()
+        for col in self.frame.columns:
+            self.df.meta.nastav_hodnotu(col, dict(popis=col, tabulka='test', vlastni=False))
+
+    def test_vyber_a_odstran(self):
+        self.df.nastav_dataframe(self.frame, odstran=['jmeno__ORIG'], vyber=['jmeno', 'poradi'])
+        self.assertEqual(list(self.df.columns), ['jmeno', 'poradi', 'id_osoba', 'skore'])
+        pd.testing.assert_frame_equal(pd.DataFrame(self.df), self.frame[['jmeno', 'poradi', 'id_osoba', 'skore']])
+        self.assertEqual(list(self.df.meta.index[:2]), ['jmeno', 'poradi'])
+        self.assertFalse(self.df.meta['jmeno__ORIG']['aktivni'])
+
+    def test_bez_kopirovani(self):
+        puvodni = self.frame.copy()
+        self.df.nastav_dataframe(self.frame)
+        self.assertTrue(np.shares_memory(self.df.skore.values, self.frame.skore.values))
+        self.assertTrue(np.shares_memory(self.df.id_osoba.array._data, self.frame.id_osoba.array._data))
+        # I bez výběru sloupců má objekt vlastní seznam sloupců
+        self.df['novy'] = 1
+        self.assertNotIn('novy', self.frame.columns)
+
+        for odstran in [[], ['jmeno__ORIG']]:
+            self.df.nastav_dataframe(self.frame, odstran=odstran, vyber=['poradi'])
+            if PREVZETI_BLOKU:
+                self.assertTrue(np.shares_memory(self.df.skore.values, self.frame.skore.values))
+                self.assertTrue(np.shares_memory(self.df.poradi.values, self.frame.poradi.values))
+                self.assertTrue(np.shares_memory(self.df.id_osoba.array._data, self.frame.id_osoba.array._data))
+
+        # Výběr sloupců ani přidání sloupce původní tabulku nezmění
+        self.df['novy'] = 1
+        pd.testing.assert_frame_equal(self.frame, puvodni)
+
+class TestDropByInconsistency(unittest.TestCase):
+
+    def setUp(self):
+        n = 100
+        self.frame = pd.DataFrame({
+            'id_organ': np.arange(n),
+            'zkratka': pd.array(['ANO'] * n, dtype='string'),
+            'zkratka__ORG': pd.array(['ANO'] * (n - 2) + ['ODS', None], dtype='string'),
+            'od': np.arange(n, dtype=float),
+            'od__ORG': np.where(np.arange(n) < 50, np.arange(n, dtype=float), -1.0),
+            'do': pd.array([None] * n, dtype='Int64'),
+            'do__ORG': pd.array([None] * n, dtype='Int64'),
+        }, index=np.arange(n) + 1000)
+        self.frame.loc[1010, ['od', 'od__ORG']] = np.nan
+
+    def test_uplna(self):
+        df = SnemovnaDataFrame()
+        ret = df.drop_by_inconsistency(self.frame, '__ORG', 0.1, 'organy', 'organy_org')
+        self.assertEqual(list(ret.columns), ['id_organ', 'zkratka', 'do'])
+        self.assertEqual(len(self.frame.columns), 7)
+
+        souhrn = df.souhrn_nekonzistence().set_index('sloupec')
+        self.assertEqual(list(souhrn.index), ['zkratka', 'od'])
+        self.assertEqual(souhrn.rozdilnych.to_list(), [1, 50])
+        self.assertEqual(souhrn.odstranen.to_list(), [False, True])
+        self.assertEqual((souhrn.loc['zkratka', 'priklad'], souhrn.loc['zkratka', 'hodnota_pripojena']), (1098, 'ODS'))
+        self.assertEqual((souhrn.loc['od', 'priklad'], souhrn.loc['od', 'hodnota']), (1050, 50.0))
+        self.assertFalse(souhrn.vzorek.any())
+
+    def test_vzorek_a_vypnuta(self):
+        df = SnemovnaDataFrame(kontrola_konzistence='vzorek', vzorek_konzistence=20)
+        df.drop_by_inconsistency(self.frame, '__ORG', 0.1, inplace=True)
+        self.assertEqual(list(self.frame.columns), ['id_organ', 'zkratka', 'do'])
+        souhrn = df.souhrn_nekonzistence()
+        self.assertTrue((souhrn.radku == 20).all() and souhrn.vzorek.all())
+
+        frame = self.frame.copy()
+        frame['zkratka__ORG'] = 'ODS'
+        df = SnemovnaDataFrame(kontrola_konzistence='vypnuta')
+        self.assertEqual(list(df.drop_by_inconsistency(frame, '__ORG', 0.1).columns), ['id_organ', 'zkratka', 'do'])
+        self.assertEqual(len(df.souhrn_nekonzistence()), 0)
+
+        with self.assertRaises(ValueError):
+            SnemovnaDataFrame(kontrola_konzistence='castecna')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import json
+import hashlib
+import unittest
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from snemovna.Stahovac import Stahovac, Uloha
+
+class LokalniServer(object):
+    """Lokální HTTP server se stránkami ze slovníku 'stranky' (cesta -> bytes).
+
+    Podporuje ETag/If-None-Match, Range/If-Range a prvních 'chyby[cesta]' požadavků odpoví statusem 503.
+    Při 'ignoruj_range=True' odpovídá na Range od začátku souboru (status 206 s Content-Range od 0).
+    """
+
+    def __init__(self):
+        self.stranky, self.chyby, self.pozadavky = {}, {}, []
+        self.ignoruj_range = False
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server.pozadavky.append((self.path, dict(self.headers)))
+                if server.chyby.get(self.path, 0) > 0:
+                    server.chyby[self.path] -= 1
+                    return self.odpovez(503)
+                if self.path not in server.stranky:
+                    return self.odpovez(404)
+                data = server.stranky[self.path]
+                etag = '"' + hashlib.sha1(data).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    return self.odpovez(304, etag=etag)
+                rng = self.headers.get('Range')
+                if rng and (self.headers.get('If-Range') == etag):
+                    od = 0 if server.ignoruj_range else int(rng[len('bytes='):-1])
+                    if od >= len(data):
+                        return self.odpovez(416, content_range=f"bytes */{len(data)}")
+                    return self.odpovez(206, data[od:], etag, f"bytes {od}-{len(data) - 1}/{len(data)}")
+                self.odpovez(200, data, etag)
+
+            def odpovez(self, status, data=b'', etag=None, content_range=None):
+                self.send_response(status)
+                if etag:
+                    self.send_header('ETag', etag)
+                if content_range:
+                    self.send_header('Content-Range', content_range)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def zastav(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class TestStahovac(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = LokalniServer()
+        self.server.stranky = {'/a.htm': b'a' * 1000, '/b.htm': b'b' * 10}
+        self.stahovac = Stahovac(soubezne_max=2, cekani=0.01, pozadavku_za_s=1000)
+
+    def tearDown(self):
+        self.server.zastav()
+        self.tmp.cleanup()
+
+    def uloha(self, nazev, etag=None):
+        return Uloha(self.server.url + nazev, f"{self.tmp.name}/x/{nazev}", etag)
+
+    def test_stazeni_a_podminene_stazeni(self):
+        self.server.chyby['/b.htm'] = 2
+        a, b, c = self.stahovac.stahni([self.uloha('a.htm'), self.uloha('b.htm'), self.uloha('c.htm')])
+        self.assertEqual((a['status'], b['status'], c['status']), (200, 200, 404))
+        with open(b['path'], 'rb') as f:
+            self.assertEqual(f.read(), b'b' * 10)
+        self.assertFalse(os.path.exists(c['path']))
+
+        a2, = self.stahovac.stahni([self.uloha('a.htm', etag=a['etag'])])
+        self.assertEqual(a2['status'], 304)
+
+    def priprav_part(self, uloha, data):
+        os.makedirs(os.path.dirname(uloha.path), exist_ok=True)
+        etag = '"' + hashlib.sha1(self.server.stranky['/' + os.path.basename(uloha.path)]).hexdigest() + '"'
+        with open(f"{uloha.path}.part", 'wb') as f:
+            f.write(data)
+        with open(f"{uloha.path}.part.json", 'w') as f:
+            json.dump(dict(validator=etag), f)
+
+    def test_navazani(self):
+        uloha = self.uloha('a.htm')
+        self.priprav_part(uloha, b'a' * 600)
+
+        r, = self.stahovac.stahni([uloha])
+        self.assertEqual(r['status'], 200)
+        self.assertEqual(self.server.pozadavky[-1][1]['Range'], 'bytes=600-')
+        with open(uloha.path, 'rb') as f:
+            self.assertEqual(f.read(), b'a' * 1000)
+        self.assertFalse(os.path.exists(f"{uloha.path}.part"))
+
+    def test_kompletni_part(self):
+        # Stahování přerušené po zápisu celého souboru, ale před přejmenováním '.part'
+        uloha = self.uloha('a.htm')
+        self.priprav_part(uloha, b'a' * 1000)
+
+        r, = self.stahovac.stahni([uloha])
+        self.assertEqual(r['status'], 200)
+        self.assertEqual([h.get('Range') for _, h in self.server.pozadavky], ['bytes=1000-', None])
+        with open(uloha.path, 'rb') as f:
+            self.assertEqual(f.read(), b'a' * 1000)
+        self.assertFalse(os.path.exists(f"{uloha.path}.part"))
+        self.assertFalse(os.path.exists(f"{uloha.path}.part.json"))
+
+    def test_nesouhlasi_content_range(self):
+        self.server.ignoruj_range = True
+        uloha = self.uloha('a.htm')
+        self.priprav_part(uloha, b'a' * 600)
+
+        r, = self.stahovac.stahni([uloha])
+        self.assertEqual(r['status'], 200)
+        self.assertEqual(len(self.server.pozadavky), 2)
+        with open(uloha.path, 'rb') as f:
+            self.assertEqual(f.read(), b'a' * 1000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import unittest
+import tempfile
+import zipfile
+import threading
+from functools import partial
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+
+from snemovna.utility import download_and_unzip
+
+class TichyHandler(SimpleHTTPRequestHandler):
+    odpovedi = []
+
+    def send_response(self, code, message=None):
+        TichyHandler.odpovedi.append(code)
+        super().send_response(code, message)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestStahovani(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server_dir = f"{self.tmp.name}/server"
+        self.data_dir = f"{self.tmp.name}/data"
+        os.makedirs(self.server_dir)
+        self.vytvor_zip("1|a|\n")
+
+        TichyHandler.odpovedi = []
+        self.server = HTTPServer(('127.0.0.1', 0), partial(TichyHandler, directory=self.server_dir))
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/poslanci.zip"
+        self.zip_path = f"{self.data_dir}/poslanci.zip"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def vytvor_zip(self, obsah, mtime=None):
+        zip_path = f"{self.server_dir}/poslanci.zip"
+        with zipfile.ZipFile(zip_path, 'w') as z:
+            z.writestr('osoby.unl', obsah)
+        if mtime is not None:
+            os.utime(zip_path, (mtime, mtime))
+
+    def test_podminene_stazeni(self):
+        self.assertTrue(download_and_unzip(self.url, self.zip_path, self.data_dir))
+        self.assertTrue(os.path.isfile(f"{self.data_dir}/osoby.unl"))
+
+        # Nezměněný archiv se znovu nestahuje ani nerozbaluje
+        self.assertFalse(download_and_unzip(self.url, self.zip_path, self.data_dir))
+        self.assertEqual(TichyHandler.odpovedi, [200, 304])
+
+        # Chybějící rozbalená data se doplní i bez stahování
+        os.remove(f"{self.data_dir}/osoby.unl")
+        self.assertTrue(download_and_unzip(self.url, self.zip_path, self.data_dir))
+        self.assertTrue(os.path.isfile(f"{self.data_dir}/osoby.unl"))
+
+    def test_zmeneny_archiv(self):
+        download_and_unzip(self.url, self.zip_path, self.data_dir)
+        self.vytvor_zip("2|b|\n", mtime=os.stat(f"{self.server_dir}/poslanci.zip").st_mtime + 10)
+
+        self.assertTrue(download_and_unzip(self.url, self.zip_path, self.data_dir))
+        with open(f"{self.data_dir}/osoby.unl") as f:
+            self.assertEqual(f.read(), "2|b|\n")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import os
+import unittest
+import tempfile
+
+import pandas as pd
+import pytz
+from bs4 import BeautifulSoup
+from html2text import html2text
+
+from snemovna.TabulkyStenotexty import TabulkaStenotextyMixin, SLOUPCE_STENO_TEXTU, Cas
+from tests.test_stahovac import LokalniServer
+
+HTML = """<html><body><div id="body">
+<p class="date">Středa 22. listopadu 2017</p>
+<p align="justify">(Jednání zahájeno v 9.02 hodin.)</p>
+<p align="justify"><a id="r1" href="/sqw/detail.sqw?id=5000">Předseda PSP Radek Vondráček</a>: Zahajuji schůzi. (V sále je hluk.)</p>
+<p align="justify">Budeme hlasovat. <a id="h1" href="/sqw/hlasy.sqw?G=70001">hlasování číslo 1</a></p>
+<p align="justify"><a id="r2" href="/sqw/detail.sqw?id=5002">Poslanec Jan Novák</a>: Děkuji za slovo.</p>
+</div></body></html>
+"""
+
+class TestZpracovaniStenotextu(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.st = TabulkaStenotextyMixin()
+        self.st.volebni_obdobi = 2017
+        self.st.tzn = pytz.timezone('Europe/Prague')
+        self.st.parameters = {'data_dir': self.tmp.name, 'soubezne_zpracovani_max': 1}
+        self.st.tbl = {'steno': pd.DataFrame({'schuze': [1], 'turn': [1]})}
+        path = f"{self.tmp.name}/{self.st.cesta(1, 1)}"
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'w', encoding='cp1250') as f:
+            f.write(HTML)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def zpracuj(self, zpracovani, html_parser):
+        self.st.parameters.update(zpracovani=zpracovani, html_parser=html_parser)
+        return self.st.results2df(*self.st.zpracuj_steno_texty())
+
+    def test_zpracovani(self):
+        df = self.zpracuj('vlakna', 'html5lib')
+        self.assertEqual(df.id_osoba.to_list()[1:], [5000, 5000, 5002])
+        self.assertEqual(df.text.to_list()[1:], ['Zahajuji schůzi. ', 'Budeme hlasovat. hlasování číslo 1', 'Děkuji za slovo.'])
+        self.assertEqual((df.typ_casu[0], df.cas[0]), ('zahájení', '9:02'))
+        self.assertEqual(df.poznamka[1], 'V sále je hluk.')
+        self.assertEqual(df.hlasovani.fillna(-1).to_list(), [-1, -1, 70001, -1])
+        self.assertEqual(df.dtypes.astype(str).to_dict(), dict(SLOUPCE_STENO_TEXTU, date='datetime64[ns, Europe/Prague]'))
+
+        for zpracovani, html_parser in [('procesy', 'html5lib'), ('vlakna', 'lxml'), ('procesy', 'lxml')]:
+            pd.testing.assert_frame_equal(df, self.zpracuj(zpracovani, html_parser))
+
+
+# Paragrafy, na kterých musí rychlá extrakce textu dávat stejný výsledek jako původní html2text
+ZLATE_PARAGRAFY = [
+    '<a id="r1" href="/sqw/detail.sqw?id=5000">Předseda\nPSP Radek\xa0Vondráček</a>: Zahajuji\tschůzi. (V sále je hluk.)',
+    '  (Jednání zahájeno v\xa09.02 hodin.)  ',
+    'Budeme hlasovat. <a id="h1" href="/sqw/hlasy.sqw?G=70001">hlasování\r\nčíslo 1</a>',
+    '<b>Poslanec <i>Jan Novák</i></b>: Děkuji za slovo, paní\u2009předsedající.<br/>Další věta.',
+    '<a id="r2" href="/sqw/detail.sqw?id=5002">Poslanec Jan Novák</a>: ' + ' '.join(['Vážené paní poslankyně, vážení páni poslanci, dovolte mi, abych vás seznámil s návrhem zákona.'] * 5),
+    'Sněmovní tisk <a href="/sqw/historie.sqw?T=123&amp;O=8">123</a> (Potlesk z lavic ANO.) (Hluk v sále.)',
+    '   ',
+]
+
+class TabulkaStenotextyHtml2text(TabulkaStenotextyMixin):
+    def text_uzlu(self, s):
+        return html2text(s).strip()
+
+class TestTextUzlu(unittest.TestCase):
+
+    def test_shoda_s_html2text(self):
+        st, ref = TabulkaStenotextyMixin(), TabulkaStenotextyHtml2text()
+        for html in ZLATE_PARAGRAFY:
+            for html_parser in ['html5lib', 'lxml']:
+                p = BeautifulSoup(f'<p align="justify">{html}</p>', html_parser).find('p')
+                self.assertEqual(st.rozloz_paragraf(p), ref.rozloz_paragraf(p), html)
+
+    def test_bez_markdownu(self):
+        st = TabulkaStenotextyMixin()
+        self.assertEqual(st.text_uzlu('\n1. Návrh zákona - první\xa0čtení '), '1. Návrh zákona - první čtení')
+        self.assertEqual(html2text('\n1. Návrh zákona - první\xa0čtení ').strip(), '1\\. Návrh zákona - první čtení')
+
+
+class TestKlasifikace(unittest.TestCase):
+
+    def test_poznamky_a_cas(self):
+        # Poznámka uvnitř tagu, poznámka uprostřed věty a poznámka s časem
+        html = ('<a id="r1" href="/sqw/detail.sqw?id=5000">Poslanec Jan Novák</a>: Děkuji. <i>(Potlesk z lavic ANO.)</i> '
+            'Pokračuji (hluk) dál.<br/><b>(Jednání přerušeno v 10.15 hodin.)</b>')
+        st = TabulkaStenotextyMixin()
+        for html_parser in ['html5lib', 'lxml']:
+            p = BeautifulSoup(f'<p align="justify">{html}</p>', html_parser).find('p')
+            meta = st.rozloz_paragraf(p)['meta']
+            self.assertEqual(meta['poznamky'], ['Potlesk z lavic ANO.', 'hluk', 'Jednání přerušeno v 10.15 hodin.'])
+            self.assertEqual(meta['cas'], [Cas('přerušení', '10', '15')])
+            self.assertEqual(meta['je_poznamka'], [True, True])
+            self.assertEqual(meta['recnici'][0].id_osoba, '5000')
+
+
+class TestInkrementalniAktualizace(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = LokalniServer()
+        self.st = TabulkaStenotextyMixin()
+        self.st.url_prefix = self.server.url
+        self.st.volebni_obdobi = 2017
+        self.st.tzn = pytz.timezone('Europe/Prague')
+        self.st.parameters = {'data_dir': self.tmp.name, 'soubezne_zpracovani_max': 1, 'soubezne_stahovani_max': 2, 'inkrementalne': True}
+        self.st.tbl = {'steno': pd.DataFrame({'schuze': [1, 1, 2], 'turn': [1, 2, 1]})}
+        for s, t in [(1, 1), (1, 2), (2, 1)]:
+            self.nastav_stranku(s, t, HTML)
+        self.st.rozsir_meta = lambda *args, **kwargs: None
+
+    def tearDown(self):
+        self.server.zastav()
+        self.tmp.cleanup()
+
+    def nastav_stranku(self, schuze, turn, html):
+        self.server.stranky['/' + self.st.cesta(schuze, turn)] = html.encode('cp1250')
+
+    def stazene(self):
+        return [cesta for cesta, headers in self.server.pozadavky]
+
+    def test_aktualizace(self):
+        self.assertEqual(self.st.aktualizuj_steno_texty(), [(1, 1), (1, 2), (2, 1)])
+        self.st.nacti_steno_texty()
+        self.assertEqual(len(self.st.tbl['steno_texty']), 3 * 4)
+
+        # Beze změny se znovu stahuje (podmíněně) jen poslední schůze a nic se nezpracovává
+        self.server.pozadavky = []
+        self.assertEqual(self.st.aktualizuj_steno_texty(), [])
+        self.assertEqual(self.stazene(), ['/' + self.st.cesta(2, 1)])
+        self.assertIn('If-None-Match', self.server.pozadavky[0][1])
+
+        # Nový stenozáznam a změna v poslední schůzi
+        self.st.tbl['steno'] = pd.DataFrame({'schuze': [1, 1, 2, 2], 'turn': [1, 2, 1, 2]})
+        self.nastav_stranku(2, 2, HTML)
+        self.nastav_stranku(2, 1, HTML.replace('Děkuji za slovo.', 'Děkuji.'))
+        self.assertEqual(self.st.aktualizuj_steno_texty(), [(2, 1), (2, 2)])
+
+        self.st.nacti_steno_texty()
+        df = self.st.tbl['steno_texty']
+        self.assertEqual(df[['schuze', 'turn']].drop_duplicates().values.tolist(), [[1, 1], [1, 2], [2, 1], [2, 2]])
+        self.assertEqual(df[(df.schuze == 2) & (df.id_osoba == 5002)].text.to_list(), ['Děkuji.', 'Děkuji za slovo.'])
+        self.assertEqual(self.st.nacti_manifest().promluv.to_list(), [4, 4, 4, 4])
+
+    def test_texty_na_vyzadani(self):
+        self.st.aktualizuj_steno_texty()
+        self.st.parameters['texty_na_vyzadani'] = True
+        self.st.nacti_steno_texty()
+        df = self.st.tbl['steno_texty']
+        self.assertNotIn('text', df.columns)
+        self.assertEqual(df[df.schuze == 2].poradi.to_list(), [0, 1, 2, 3])
+
+        vyber = df[df.id_osoba == 5002]
+        texty = self.st.nacti_texty(vyber, ['text'])
+        self.assertEqual(list(texty.index), list(vyber.index))
+        self.assertEqual(texty.text.to_list(), ['Děkuji za slovo.'] * 3)
+
+if __name__ == '__main__':
+    unittest.main()
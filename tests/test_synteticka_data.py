@@ -0,0 +1,97 @@
+import unittest
+import tempfile
+
+from snemovna.PoslanciOsoby import Organy, Poslanci
+from snemovna.Hlasovani import HlasovaniPoslanci, Omluvy
+from snemovna.Schuze import Schuze
+from snemovna.Stenozaznamy import StenoRecnici
+from snemovna.Stenotexty import Stenotexty
+from benchmarks.synteticka_data import vytvor_data, VOLEBNI_OBDOBI
+from benchmarks.bench_konstrukce import priprav_steno_texty
+
+# Tabulky nad syntetickými daty (viz benchmarks.synteticka_data), bez přístupu k síti
+class TestSyntetickaData(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.data_dir = cls.tmp.name
+        vytvor_data(cls.data_dir, n_poslancu=20, n_schuzi=2, n_hlasovani=10, n_turnu=3, n_odstavcu=16)
+        priprav_steno_texty(cls.data_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def vytvor(self, trida):
+        obj = trida(volebni_obdobi=VOLEBNI_OBDOBI, data_dir=self.data_dir, stahni=False)
+        # Předem se načítají jen tabulky, které konstruktor přečte, po jeho skončení nezůstanou běžet vlákna
+        self.assertEqual(len(obj.planovac.ulohy), 0)
+        self.assertIsNone(obj.planovac.executor)
+        return obj
+
+    def test_poslanci(self):
+        organy = self.vytvor(Organy)
+        self.assertEqual((organy.nazev_typ_organ_cz == 'Klub').sum(), 5) # kluby předchozího volebního období se vynechají
+        poslanci = self.vytvor(Poslanci)
+        self.assertEqual(len(poslanci), 20)
+        self.assertEqual(poslanci.id_osoba.nunique(), 20)
+
+    def test_sdileni_pres_registr(self):
+        # Druhý objekt převezme tabulky z registru, sloupec přidaný do prvního objektu v nich nesmí být
+        organy = self.vytvor(Organy)
+        organy['novy'] = 1
+        organy2 = self.vytvor(Organy)
+        self.assertEqual(len(organy2.casy_nacitani()), 0) # tabulky převzaté z registru se předem nenačítají
+        self.assertNotIn('novy', organy2.columns)
+        self.assertNotIn('novy', organy2.tbl['organy'].columns)
+        self.assertIs(organy2.tbl['organy'], organy.tbl['organy'])
+
+    def test_hlasovani(self):
+        self.assertEqual(len(self.vytvor(HlasovaniPoslanci)), 2 * 10 * 20)
+        self.assertEqual(len(self.vytvor(Omluvy)), 2 * 2)
+
+        # První poziční parametr je 'stahni' (jako u ostatních tabulek), 'kompaktni' a 'davka' lze zadat jen jménem
+        hp = HlasovaniPoslanci(False, volebni_obdobi=VOLEBNI_OBDOBI, data_dir=self.data_dir, kompaktni=True)
+        self.assertEqual(len(hp), 2 * 10 * 20)
+        self.assertTrue(hp.parameters['kompaktni'])
+
+    def test_projekce(self):
+        sloupce = ['id_hlasovani', 'id_osoba', 'vysledek', 'prijmeni', 'email']
+        hp = HlasovaniPoslanci(volebni_obdobi=VOLEBNI_OBDOBI, data_dir=self.data_dir, stahni=False, sloupce=sloupce)
+        self.assertEqual(list(hp.columns), ['id_hlasovani', 'vysledek', 'id_osoba', 'prijmeni', 'email'])
+        self.assertEqual(len(hp), 2 * 10 * 20)
+        self.assertNotIn('web', hp.tbl['poslanci'].columns)
+        self.assertNotIn('umrti', hp.tbl['osoby'].columns)
+
+        # Výchozí HlasovaniPoslanci kontaktní údaje nenačítá, Poslanci ano (i po převzetí kroků z registru)
+        self.assertNotIn('email', self.vytvor(HlasovaniPoslanci).tbl['poslanci'].columns)
+        poslanci = self.vytvor(Poslanci)
+        self.assertTrue({'web', 'email', 'umrti', 'sirka'}.issubset(poslanci.columns))
+
+    def test_specifikace_tabulek(self):
+        hp = self.vytvor(HlasovaniPoslanci)
+        paths, meta = dict(hp.paths), hp.meta.copy()
+        spec = {s.tabulka: s for s in hp.specifikace_tabulek()}
+
+        # Zjištění specifikací nemění stav objektu
+        self.assertEqual(hp.paths, paths)
+        self.assertEqual(len(hp.meta), len(meta))
+        self.assertEqual(spec['hlasovani_poslance'].paths, hp.paths['hlasovani_poslanci'])
+        self.assertEqual(spec['hlasovani'].encoding, 'ISO-8859-2')
+        self.assertNotIn('web', spec['poslanci'].sloupce)
+
+    def test_schuze(self):
+        self.assertEqual(len(self.vytvor(Schuze)), 2)
+
+    def test_stenozaznamy(self):
+        self.assertEqual(len(self.vytvor(StenoRecnici)), 2 * 3 * 2)
+        st = self.vytvor(Stenotexty)
+        self.assertEqual(len(st), 2 * 3 * 16)
+        self.assertFalse(st.id_osoba.isna().any())
+        # Každý sloupec tabulky steno_texty má metadata
+        self.assertEqual(st.meta['cislo_hlasovani']['popis'], 'Číslo hlasování.')
+        self.assertEqual([c for c in st.columns if c not in st.meta], [])
+
+if __name__ == '__main__':
+    unittest.main()
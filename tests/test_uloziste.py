@@ -0,0 +1,42 @@
+import unittest
+import tempfile
+
+import pandas as pd
+
+from snemovna.Uloziste import UlozisteStenotextu
+
+class TestUlozisteStenotextu(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.uloziste = UlozisteStenotextu(f"{self.tmp.name}/steno_texty-2017")
+        for schuze, datum in [(1, '2017-11-20'), (2, '2017-12-05')]:
+            self.uloziste.zapis(schuze, pd.DataFrame({
+                'text': pd.array(['a', 'b', 'c'], dtype='string'),
+                'schuze': pd.array([schuze] * 3, dtype='Int64'),
+                'id_osoba': pd.array([5000, None, 5002], dtype='Int64'),
+                'date': pd.to_datetime([datum] * 3).tz_localize('Europe/Prague'),
+            }))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_vyber(self):
+        self.assertEqual(self.uloziste.schuze(), [1, 2])
+        df = self.uloziste.nacti()
+        self.assertEqual(len(df), 6)
+        self.assertEqual(df.text.dtype, 'string')
+        self.assertEqual(df.id_osoba.dtype, 'Int64')
+
+        df = self.uloziste.nacti(schuze=[2], osoby=[5002], sloupce=['schuze', 'id_osoba'])
+        self.assertEqual(list(df.columns), ['schuze', 'id_osoba'])
+        self.assertEqual(df.id_osoba.fillna(-1).to_list(), [-1, 5002])
+
+        df = self.uloziste.nacti(od='2017-12-01', tzn='Europe/Prague')
+        self.assertEqual(df.schuze.to_list(), [2, 2, 2])
+
+        df = self.uloziste.nacti(schuze=[3])
+        self.assertEqual((len(df), df.id_osoba.dtype), (0, 'Int64'))
+
+if __name__ == '__main__':
+    unittest.main()
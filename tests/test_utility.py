@@ -0,0 +1,72 @@
+import unittest
+
+import pandas as pd
+
+from snemovna.utility import interval_join, downcast_integers, mask_by_values
+
+class TestIntervalJoin(unittest.TestCase):
+
+    def setUp(self):
+        self.intervals = pd.DataFrame({
+            'id_osoba': pd.Series([1, 1, 2, 3], dtype='Int64'),
+            'od': pd.to_datetime(['2017-10-01', '2019-01-01', None, '2018-01-01']),
+            'do': pd.to_datetime(['2018-12-31', None, '2018-06-30', '2018-01-31']),
+            'klub': ['A', 'B', 'C', 'D']
+        })
+
+    def spoj(self, df, **kwargs):
+        return interval_join(df, self.intervals, on='den', by='id_osoba', start='od', end='do', columns=['klub'], indicator='nalezeno', **kwargs)
+
+    def test_intervaly(self):
+        df = pd.DataFrame({
+            'id_osoba': pd.array([1, 1, 1, 2, 2, 3, 3, 4, None], dtype='Int64'),
+            'den': pd.to_datetime(['2017-09-30', '2018-12-31', '2030-01-01', '1990-01-01', '2018-07-01', '2018-01-31', '2018-02-01', '2018-01-15', '2018-01-15'])
+        }, index=[10, 11, 12, 13, 14, 15, 16, 17, 18])
+        ret = self.spoj(df)
+
+        self.assertEqual(list(ret.index), list(df.index))
+        self.assertEqual(list(ret.nalezeno), [False, True, True, True, False, True, False, False, False])
+        self.assertEqual(list(ret.klub.fillna('-')), ['-', 'A', 'B', 'C', '-', 'D', '-', '-', '-'])
+
+    def test_chybejici_cas(self):
+        df = pd.DataFrame({'id_osoba': pd.Series([1], dtype='Int64'), 'den': pd.to_datetime([None])})
+        self.assertFalse(self.spoj(df).nalezeno.iloc[0])
+
+    def test_casove_zony(self):
+        tz = 'Europe/Prague'
+        self.intervals['od'] = self.intervals.od.dt.tz_localize(tz)
+        self.intervals['do'] = self.intervals.do.dt.tz_localize(tz)
+
+        # Konec intervalu je 2018-12-31 00:00 pražského času, výsledek nesmí záviset na časové zóně sloupce 'den'
+        df = pd.DataFrame({
+            'id_osoba': pd.Series([1, 1], dtype='Int64'),
+            'den': pd.to_datetime(['2018-12-31 00:00', '2018-12-31 00:30']).tz_localize(tz).tz_convert('UTC')
+        })
+        self.assertEqual(list(self.spoj(df).klub.fillna('-')), ['A', '-'])
+
+        df['den'] = df.den.dt.tz_localize(None)
+        with self.assertRaises(ValueError):
+            self.spoj(df)
+
+class TestMaskByValues(unittest.TestCase):
+
+    def test_nezname_a_chybejici_hodnoty(self):
+        srs = pd.Series(['A', 'B', 'X', None], dtype='string', index=[3, 2, 1, 0])
+        ret = mask_by_values(srs, {'A': 'ano', 'B': 'ne'}).astype('string')
+        self.assertEqual(list(ret.index), [3, 2, 1, 0])
+        self.assertEqual(ret.fillna('-').to_list(), ['ano', 'ne', 'X', '-'])
+
+    def test_klic_none(self):
+        srs = pd.Series([1, None, 1], dtype='Int64')
+        ret = mask_by_values(srs, {None: 'schválený pořad', 1: 'navržený pořad'})
+        self.assertEqual(ret.to_list(), ['navržený pořad', 'schválený pořad', 'navržený pořad'])
+
+class TestDowncastIntegers(unittest.TestCase):
+
+    def test_typy(self):
+        self.assertEqual(downcast_integers(pd.Series([1, 100], dtype='Int64')).dtype, 'int8')
+        self.assertEqual(downcast_integers(pd.Series([1, 70000], dtype='int64')).dtype, 'int32')
+        self.assertEqual(downcast_integers(pd.Series([-200, None], dtype='Int64')).dtype, 'Int16')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import tempfile
+
+import pandas as pd
+
+from snemovna.Vyhledavani import IndexStenotextu, tokenizuj
+
+class TestIndexStenotextu(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'schuze': [1, 1, 1, 2],
+            'turn': [1, 1, 2, 1],
+            'id_osoba': pd.array([5000, 5000, None, 5002], dtype='Int64'),
+            'date': pd.to_datetime(['2017-11-20'] * 3 + ['2017-12-05']).tz_localize('Europe/Prague'),
+            'text': pd.array(['Návrh zákona o státním rozpočtu.', 'Zákon nepodpoříme.', 'Děkuji.', 'Rozpočet na rok 2018.'], dtype='string'),
+        })
+        self.index = IndexStenotextu.z_tabulky(self.df)
+
+    def test_tokenizace(self):
+        self.assertEqual(tokenizuj(pd.Series(['Žluťoučký kůň, 2018!'])).to_list(), ['zlutoucky', 'kun', '2018'])
+
+    def test_hledani(self):
+        r = self.index.hledej('zákon')
+        self.assertEqual(r[['schuze', 'turn', 'poradi']].values.tolist(), [[1, 1, 1]])
+        self.assertEqual(list(r.columns), ['doc', 'schuze', 'turn', 'poradi', 'id_osoba', 'date'])
+
+        self.assertEqual(self.index.hledej('ZAKON*').doc.to_list(), [0, 1])
+        self.assertEqual(self.index.hledej('rozpoč* státním').doc.to_list(), [0])
+        self.assertEqual(self.index.hledej('rozpoč* státním', vse=False).doc.to_list(), [0, 3])
+        self.assertEqual(len(self.index.hledej('neexistuje')), 0)
+
+    def test_aktualizace_a_ulozeni(self):
+        zmena = self.df[self.df.turn == 1].copy()
+        zmena.loc[0, 'text'] = 'Návrh zákona byl stažen.'
+        self.index.aktualizuj(zmena, [(1, 1)])
+        self.assertEqual(len(self.index.hledej('státním')), 0)
+        self.assertEqual(self.index.hledej('stažen').schuze.to_list(), [1])
+        self.assertEqual(self.index.hledej('děkuji').doc.to_list(), [2])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            self.index.uloz(tmp)
+            index = IndexStenotextu.nacti(tmp)
+        pd.testing.assert_frame_equal(index.hledej('zákon*'), self.index.hledej('zákon*'))
+
+if __name__ == '__main__':
+    unittest.main()